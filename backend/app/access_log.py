@@ -0,0 +1,159 @@
+"""
+Structured, non-blocking request logging.
+
+AccessLogMiddleware builds one record per request (method, path, status,
+bytes sent, duration, client) and hands it to the "access" logger. Every
+handler sits behind a QueueHandler: the event loop only enqueues records,
+while a QueueListener thread formats them and does the I/O. Application
+logs configured by logging.basicConfig are moved behind a queue the same
+way.
+
+Static hits (the SPA shell, /assets, /uploads, media) are sampled at
+ACCESS_LOG_STATIC_SAMPLE; server errors and slow requests are always
+logged.
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+access_logger = logging.getLogger("access")
+
+# Prefixes of API paths that serve files rather than data
+STATIC_API_PREFIXES = ("/api/media/",)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line; access records are dicts, anything else gets wrapped."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        if isinstance(record.msg, dict):
+            return json.dumps(record.msg, ensure_ascii=False, separators=(",", ":"))
+        return json.dumps({
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }, ensure_ascii=False)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if isinstance(record.msg, dict):
+            return record
+        # Other records may carry arbitrary args and tracebacks: render the text now
+        return super().prepare(record)
+
+
+def _queue_logger(logger: logging.Logger, handlers: List[logging.Handler]) -> logging.handlers.QueueListener:
+    records = queue.SimpleQueue()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(_DeferredQueueHandler(records))
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def start_logging(access_log_file: Optional[str] = None) -> List[logging.handlers.QueueListener]:
+    """
+    Put the root and access loggers behind queues; returns the listeners to stop.
+
+    Access records go to access_log_file as JSON lines, or to stdout when
+    no file is configured.
+    """
+    root = logging.getLogger()
+    listeners = [_queue_logger(root, list(root.handlers))]
+
+    if access_log_file:
+        handler = logging.handlers.WatchedFileHandler(access_log_file, encoding="utf-8")
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonLinesFormatter())
+    access_logger.setLevel(logging.INFO)
+    access_logger.propagate = False
+    listeners.append(_queue_logger(access_logger, [handler]))
+    return listeners
+
+
+def stop_logging(listeners: List[logging.handlers.QueueListener]):
+    """Flush and stop the listeners, restoring direct handlers for late log lines."""
+    for listener, logger in zip(listeners, (logging.getLogger(), access_logger)):
+        listener.stop()
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        for handler in listener.handlers:
+            logger.addHandler(handler)
+
+
+class AccessLogMiddleware:
+    """ASGI middleware emitting one structured access record per HTTP request."""
+
+    def __init__(self, app: ASGIApp, static_sample_rate: float = 0.05, slow_ms: float = 1000):
+        self.app = app
+        self.static_sample_rate = static_sample_rate
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        sent = 0
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, sent
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            elif message["type"] == "http.response.zerocopysend":
+                sent += message.get("count") or 0
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._log(scope, status_code, sent, (time.perf_counter() - started) * 1000)
+
+    def _log(self, scope: Scope, status_code: int, sent: int, duration_ms: float):
+        path = scope["path"]
+        sample_rate = 1.0
+        if status_code < 500 and duration_ms < self.slow_ms and self._is_static(path):
+            sample_rate = self.static_sample_rate
+            if random.random() >= sample_rate:
+                return
+
+        headers = Headers(scope=scope)
+        client = scope.get("client")
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "method": scope["method"],
+            "path": path,
+            "query": scope.get("query_string", b"").decode("latin-1") or None,
+            "status": status_code,
+            "bytes": sent,
+            "duration_ms": round(duration_ms, 2),
+            "client": client[0] if client else None,
+            "user_agent": headers.get("user-agent"),
+        }
+        if sample_rate < 1.0:
+            record["sample_rate"] = sample_rate
+        access_logger.info(record)
+
+    @staticmethod
+    def _is_static(path: str) -> bool:
+        return not path.startswith("/api/") or path.startswith(STATIC_API_PREFIXES)
@@ -1,33 +1,705 @@
 """
-Cache module - Removed Redis dependency.
-Cache functions are now stubs that do nothing.
+Cache module - two-level cache.
+
+Every worker keeps an L1: a size-bounded LRU with a per-key TTL. The L1 is
+only touched from the event loop thread and none of its operations await,
+so reads need no locking: a lookup is a couple of dict operations that no
+other coroutine can interleave with.
+
+When CACHE_L2_URL is set, a shared L2 tier (a SQLite file or a
+Redis-protocol server) sits behind the L1. L1 misses fall through to it,
+and deletes/invalidations are broadcast so every worker drops its own L1
+copies.
+
+get_or_load() is the read-through entry point: concurrent misses for one
+key share a single loader call, and recently expired values are served
+stale while a background task refreshes them.
+
+Values leave the process (shared tier, snapshots) through encode_value(),
+never pickle, so bytes read back from a shared server cannot run code.
 """
-from typing import Optional, Any
+import abc
+import asyncio
+import fnmatch
+import logging
+import os
+import sqlite3
+import struct
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Any, Awaitable, Callable, Dict, List, Tuple
+from urllib.parse import quote
+
+import orjson
+
+from app.core.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the fresh value for key, or None on a miss."""
+        entry = self.get_entry(key)
+        if entry is None or not entry[1]:
+            return None
+        return entry[0]
+
+    def get_entry(self, key: str) -> Optional[tuple]:
+        """
+        Return ``(value, is_fresh)`` for key, or None on a miss.
+
+        An entry past its TTL but still inside its stale window is returned
+        with ``is_fresh=False`` so callers can serve it while refreshing.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, fresh_until, expires_at = entry
+        now = time.monotonic()
+        if expires_at <= now:
+            self._data.pop(key, None)
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        if fresh_until <= now:
+            self.stale_hits += 1
+            return value, False
+        self.hits += 1
+        return value, True
+
+    def set(self, key: str, value: Any, ttl: int, stale_ttl: int = 0):
+        """
+        Store value for ttl seconds, evicting the least recently used entries.
+
+        The entry stays available as stale for another stale_ttl seconds.
+        """
+        fresh_until = time.monotonic() + ttl
+        self._data[key] = (value, fresh_until, fresh_until + stale_ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> bool:
+        return self._data.pop(key, None) is not None
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Delete every key matching a glob pattern and return how many were removed."""
+        keys = [key for key in self._data if _matches(key, pattern)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+        }
+
+
+def _matches(key: str, pattern: str) -> bool:
+    """
+    Glob-match a cache key.
+
+    A pattern without wildcards names a namespace: it matches the key itself
+    and everything below it, so ``cache:projects`` also drops
+    ``cache:projects:category:BIM`` and ``cache:projects:7``.
+    """
+    if _GLOB_CHARS.isdisjoint(pattern):
+        return key == pattern or key.startswith(pattern + ":")
+    return fnmatch.fnmatchcase(key, pattern)
+
+
+# Encoded values are <codec id byte><payload>. JSON values (str, int, float,
+# bool, None, list, dict) use JSON_CODEC; other types need a registered codec
+JSON_CODEC = 0
+_encoders: Dict[type, Tuple[int, Callable[[Any], bytes]]] = {}
+_decoders: Dict[int, Callable[[bytes], Any]] = {JSON_CODEC: orjson.loads}
+
+
+def register_codec(codec_id: int, value_type: type, encode: Callable[[Any], bytes], decode: Callable[[bytes], Any]):
+    """Let values of value_type leave the process; codec_id must be unique."""
+    _encoders[value_type] = (codec_id, encode)
+    _decoders[codec_id] = decode
+
+
+def encode_value(value: Any) -> bytes:
+    """Serialize a cache value; raises TypeError for types without a codec."""
+    codec_id, encode = _encoders.get(type(value), (JSON_CODEC, orjson.dumps))
+    return bytes((codec_id,)) + encode(value)
+
+
+def decode_value(data: bytes) -> Any:
+    """Value serialized by encode_value; raises ValueError for unknown codecs or corrupt data."""
+    decode = _decoders.get(data[0]) if data else None
+    if decode is None:
+        raise ValueError("unknown cache value encoding")
+    return decode(data[1:])
+
+
+register_codec(1, frozenset, lambda value: orjson.dumps(sorted(value)), lambda data: frozenset(orjson.loads(data)))
+
+
+class SharedCacheBackend(abc.ABC):
+    """
+    Shared (L2) cache tier used by every worker process.
+
+    Values are opaque bytes. Besides storage, a backend carries the
+    invalidation broadcast: ``publish`` announces a deleted key or pattern
+    and ``start`` delivers announcements from other workers to a callback
+    on the event loop thread.
+    """
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+
+    @abc.abstractmethod
+    async def start(self, on_invalidate: Callable[[str, bool], None]):
+        """Start delivering other workers' invalidations to on_invalidate(pattern, exact)."""
+
+    @abc.abstractmethod
+    async def close(self):
+        """Stop the listener and release connections."""
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Stored bytes for key, or None when missing or expired."""
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int):
+        """Store value for ttl seconds."""
+
+    @abc.abstractmethod
+    async def delete(self, key: str):
+        """Remove key."""
+
+    @abc.abstractmethod
+    async def delete_pattern(self, pattern: str):
+        """Remove every key matching a glob pattern or namespace (see _matches)."""
+
+    @abc.abstractmethod
+    async def publish(self, pattern: str, exact: bool = False):
+        """Announce an invalidated key (exact) or pattern to the other workers."""
+
+
+class SQLiteCacheBackend(SharedCacheBackend):
+    """
+    Shared tier in a SQLite file, for several workers on one host.
+
+    Invalidations go into an append-only table that a listener thread in
+    each worker polls every ``poll_interval`` seconds.
+    """
+
+    INVALIDATION_RETENTION = 60  # seconds
+
+    def __init__(self, path: str, poll_interval: float = 0.05):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._listener: Optional[threading.Thread] = None
+        self._conn = self._connect()
+        with self._lock:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS cache_invalidations (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    origin TEXT NOT NULL,
+                    pattern TEXT NOT NULL,
+                    exact INTEGER NOT NULL,
+                    created_at REAL NOT NULL
+                );
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def start(self, on_invalidate: Callable[[str, bool], None]):
+        loop = asyncio.get_running_loop()
+        rows = await asyncio.to_thread(self._execute, "SELECT COALESCE(MAX(seq), 0) FROM cache_invalidations")
+        self._listener = threading.Thread(
+            target=self._listen,
+            args=(loop, on_invalidate, rows[0][0]),
+            name="cache-invalidation-listener",
+            daemon=True,
+        )
+        self._listener.start()
+
+    def _listen(self, loop, on_invalidate, last_seq: int):
+        conn = self._connect()
+        try:
+            while not self._stop.wait(self.poll_interval):
+                try:
+                    rows = conn.execute(
+                        "SELECT seq, origin, pattern, exact FROM cache_invalidations WHERE seq > ? ORDER BY seq",
+                        (last_seq,),
+                    ).fetchall()
+                except sqlite3.Error as e:
+                    logger.warning(f"Cache invalidation poll failed: {e}")
+                    continue
+                for seq, origin, pattern, exact in rows:
+                    last_seq = seq
+                    if origin != self.origin:
+                        loop.call_soon_threadsafe(on_invalidate, pattern, bool(exact))
+        finally:
+            conn.close()
+
+    async def close(self):
+        self._stop.set()
+        if self._listener is not None:
+            await asyncio.to_thread(self._listener.join, 1)
+        with self._lock:
+            self._conn.close()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        )
+        return rows[0][0] if rows else None
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, time.time() + ttl),
+        )
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self._execute, "DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    async def delete_pattern(self, pattern: str):
+        if _GLOB_CHARS.isdisjoint(pattern):
+            sql, params = "DELETE FROM cache_entries WHERE key = ? OR key GLOB ?", (pattern, pattern + ":*")
+        else:
+            sql, params = "DELETE FROM cache_entries WHERE key GLOB ?", (pattern,)
+        await asyncio.to_thread(self._execute, sql, params)
+
+    async def publish(self, pattern: str, exact: bool = False):
+        now = time.time()
+
+        def _publish():
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO cache_invalidations (origin, pattern, exact, created_at) VALUES (?, ?, ?, ?)",
+                    (self.origin, pattern, int(exact), now),
+                )
+                self._conn.execute(
+                    "DELETE FROM cache_invalidations WHERE created_at < ?",
+                    (now - self.INVALIDATION_RETENTION,),
+                )
+                self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+
+        await asyncio.to_thread(_publish)
+
+
+class RedisCacheBackend(SharedCacheBackend):
+    """
+    Shared tier on a Redis-protocol server (Redis, KeyDB, Dragonfly, ...).
+
+    Invalidations are broadcast over pub/sub. When the subscription drops,
+    the listener resubscribes with exponential backoff and then clears the
+    worker's L1, since announcements may have been missed meanwhile.
+    """
 
+    CHANNEL = "cache:invalidations"
+    # Reconnect delay after the subscription drops, doubled per failed attempt up to the cap
+    RECONNECT_DELAY = 0.5
+    MAX_RECONNECT_DELAY = 30.0
 
-def init_redis():
-    """Initialize Redis connection - removed, does nothing."""
-    print("✓ Cache initialization skipped (Redis removed)")
+    def __init__(self, url: str):
+        super().__init__()
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_L2_URL points at Redis but the 'redis' package is not installed") from e
+        self._client = redis.from_url(url)
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self, on_invalidate: Callable[[str, bool], None]):
+        pubsub = await self._subscribe()
+        self._listener = asyncio.create_task(self._listen(pubsub, on_invalidate))
+
+    async def _subscribe(self):
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.CHANNEL)
+        return pubsub
+
+    async def _listen(self, pubsub, on_invalidate):
+        """Deliver announcements until cancelled, resubscribing whenever the connection drops."""
+        delay = self.RECONNECT_DELAY
+        try:
+            while True:
+                try:
+                    if pubsub is None:
+                        pubsub = await self._subscribe()
+                        # Announcements sent while disconnected are lost: drop all of L1
+                        on_invalidate("*", False)
+                        logger.info("✓ Cache invalidation listener resubscribed")
+                    async for message in pubsub.listen():
+                        delay = self.RECONNECT_DELAY
+                        self._deliver(message, on_invalidate)
+                    error = "subscription ended"
+                except Exception as e:
+                    error = e
+                logger.warning(f"Cache invalidation listener lost its subscription ({error}); "
+                               f"retrying in {delay:.1f}s")
+                if pubsub is not None:
+                    await self._close_pubsub(pubsub)
+                    pubsub = None
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if pubsub is not None:
+                await self._close_pubsub(pubsub)
+
+    def _deliver(self, message: dict, on_invalidate):
+        try:
+            origin, exact, pattern = message["data"].decode().split("|", 2)
+        except (AttributeError, UnicodeDecodeError, ValueError):
+            logger.warning(f"Ignoring malformed cache invalidation: {message.get('data')!r}")
+            return
+        if origin != self.origin:
+            on_invalidate(pattern, exact == "1")
+
+    @staticmethod
+    async def _close_pubsub(pubsub):
+        try:
+            await pubsub.close()
+        except Exception as e:
+            logger.debug(f"Closing cache invalidation subscription failed: {e}")
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+        await self._client.close()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self._client.set(key, value, ex=ttl)
+
+    async def delete(self, key: str):
+        await self._client.unlink(key)
+
+    async def delete_pattern(self, pattern: str):
+        if _GLOB_CHARS.isdisjoint(pattern):
+            await self._client.unlink(pattern)
+            pattern = pattern + ":*"
+        keys = [key async for key in self._client.scan_iter(match=pattern, count=500)]
+        if keys:
+            await self._client.unlink(*keys)
+
+    async def publish(self, pattern: str, exact: bool = False):
+        await self._client.publish(self.CHANNEL, f"{self.origin}|{int(exact)}|{pattern}")
+
+
+def create_backend(url: str) -> SharedCacheBackend:
+    """Build the shared cache tier for a CACHE_L2_URL."""
+    settings = get_settings()
+    if url.startswith("sqlite:///"):
+        return SQLiteCacheBackend(
+            url.replace("sqlite:///", "", 1),
+            poll_interval=settings.CACHE_INVALIDATION_POLL_MS / 1000,
+        )
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(url)
+    raise ValueError(f"Unsupported CACHE_L2_URL: {url}")
+
+
+_cache = TTLCache()
+_l2: Optional[SharedCacheBackend] = None
+
+
+def _apply_remote_invalidation(pattern: str, exact: bool):
+    """Drop L1 entries invalidated by another worker."""
+    _bump_generation()
+    if exact:
+        _cache.delete(pattern)
+    else:
+        _cache.delete_pattern(pattern)
+
+
+async def init_cache():
+    """Initialize the per-worker L1 cache and, if configured, the shared L2 tier."""
+    global _cache, _l2
+    settings = get_settings()
+    _cache = TTLCache(max_entries=settings.CACHE_MAX_ENTRIES)
+    if not settings.CACHE_ENABLED:
+        logger.info("✓ Cache disabled by configuration")
+        return
+
+    if settings.CACHE_L2_URL:
+        _l2 = create_backend(settings.CACHE_L2_URL)
+        await _l2.start(_apply_remote_invalidation)
+        logger.info(f"✓ Two-level cache ready (L1 {settings.CACHE_MAX_ENTRIES} entries, L2 {type(_l2).__name__})")
+    else:
+        logger.info(f"✓ In-process cache ready (max {settings.CACHE_MAX_ENTRIES} entries)")
+
+
+async def close_cache():
+    """Stop the invalidation listener and release the shared tier."""
+    global _l2
+    if _l2 is not None:
+        await _l2.close()
+        _l2 = None
+
+
+def cache_stats() -> dict:
+    """Return hit/miss counters for the cache."""
+    stats = _cache.stats()
+    stats["l2"] = type(_l2).__name__ if _l2 is not None else None
+    return stats
 
 
 async def get_cached(key: str) -> Optional[Any]:
-    """Get cached value - removed, always returns None."""
-    return None
+    """Get the fresh cached value from L1, falling back to the shared tier."""
+    if not get_settings().CACHE_ENABLED:
+        return None
+    entry = await _lookup(key)
+    if entry is None or not entry[1]:
+        return None
+    return entry[0]
+
+
+async def _lookup(key: str) -> Optional[tuple]:
+    """Return ``(value, is_fresh)`` from L1 or L2, or None on a miss."""
+    entry = _cache.get_entry(key)
+    if entry is not None or _l2 is None:
+        return entry
+
+    try:
+        raw = await _l2.get(key)
+    except Exception as e:
+        logger.warning(f"Shared cache read failed for {key}: {e}")
+        return None
+    if raw is None:
+        return None
+
+    try:
+        (fresh_until,) = _FRESH_UNTIL.unpack_from(raw)
+        value = decode_value(raw[_FRESH_UNTIL.size:])
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable shared cache entry {key}: {e}")
+        return None
+    remaining = fresh_until - time.time()
+    if remaining > 0:
+        _cache.set(key, value, _l1_ttl(int(remaining) + 1))
+    return value, remaining > 0
+
+
+# Shared tier entries: wall-clock end of freshness, then the encoded value
+_FRESH_UNTIL = struct.Struct("!d")
+
+
+def _l2_payload(value: Any, ttl: int) -> bytes:
+    return _FRESH_UNTIL.pack(time.time() + ttl) + encode_value(value)
+
+
+async def set_cache(key: str, value: Any, ttl: Optional[int] = None, stale_ttl: int = 0):
+    """
+    Set cached value with TTL (defaults to the key's CACHE_TTL entry).
 
+    A positive stale_ttl keeps the value around as stale for that many extra
+    seconds, for get_or_load to serve while it refreshes.
+    """
+    if not get_settings().CACHE_ENABLED:
+        return
+    if ttl is None:
+        ttl = ttl_for_key(key)
+    _cache.set(key, value, _l1_ttl(ttl), stale_ttl)
+    if _l2 is None:
+        return
 
-async def set_cache(key: str, value: Any, ttl: int = 3600):
-    """Set cached value with TTL - removed, does nothing."""
-    pass
+    try:
+        await _l2.set(key, _l2_payload(value, ttl), ttl + stale_ttl)
+    except Exception as e:
+        logger.warning(f"Shared cache write failed for {key}: {e}")
+
+
+_inflight: Dict[str, asyncio.Task] = {}
+# Bumped by every delete/invalidation so loads that started before it are not stored
+_generation = 0
+
+
+async def get_or_load(
+    key: str,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: Optional[int] = None,
+    stale_ttl: Optional[int] = None,
+) -> Any:
+    """
+    Return the cached value for key, calling loader on a miss.
+
+    Concurrent misses for the same key share a single loader call. A value
+    that has outlived its TTL but not its stale window (CACHE_STALE_TTL by
+    default) is returned immediately while one background task reloads it.
+    """
+    settings = get_settings()
+    if not settings.CACHE_ENABLED:
+        return await loader()
+    if stale_ttl is None:
+        stale_ttl = settings.CACHE_STALE_TTL
+
+    entry = await _lookup(key)
+    if entry is not None:
+        value, is_fresh = entry
+        if not is_fresh:
+            _load_once(key, loader, ttl, stale_ttl).add_done_callback(_log_refresh_failure)
+        return value
+
+    # Shielded so a cancelled request does not cancel the load its peers await
+    return await asyncio.shield(_load_once(key, loader, ttl, stale_ttl))
+
+
+def _load_once(key: str, loader, ttl: Optional[int], stale_ttl: int) -> asyncio.Task:
+    """Return the in-flight load for key, starting one if there is none."""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_load_and_store(key, loader, ttl, stale_ttl))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return task
+
+
+async def _load_and_store(key: str, loader, ttl: Optional[int], stale_ttl: int) -> Any:
+    generation = _generation
+    value = await loader()
+    if generation == _generation:
+        await set_cache(key, value, ttl, stale_ttl)
+    return value
+
+
+def _log_refresh_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Background cache refresh failed: {task.exception()}")
+
+
+def export_entries() -> List[tuple]:
+    """Return ``(key, value, fresh_until, expires_at)`` in wall-clock time for live L1 entries."""
+    now, offset = time.monotonic(), time.time() - time.monotonic()
+    return [
+        (key, value, fresh_until + offset, expires_at + offset)
+        for key, (value, fresh_until, expires_at) in _cache._data.items()
+        if expires_at > now
+    ]
+
+
+def import_entries(entries: List[tuple]) -> int:
+    """Load entries produced by export_entries into L1; returns how many were still live."""
+    now = time.time()
+    loaded = 0
+    for key, value, fresh_until, expires_at in entries:
+        if expires_at <= now:
+            continue
+        _cache.set(key, value, max(fresh_until - now, 0), expires_at - max(fresh_until, now))
+        loaded += 1
+    return loaded
+
+
+def set_local(key: str, value: Any, ttl: int):
+    """Set a value in this worker's L1 only; safe to call from synchronous code."""
+    if get_settings().CACHE_ENABLED:
+        _cache.set(key, value, _l1_ttl(ttl))
+
+
+async def broadcast_cache(key: str, value: Any, ttl: int):
+    """Write value to the shared tier and make every other worker drop its L1 copy."""
+    if _l2 is None or not get_settings().CACHE_ENABLED:
+        return
+
+    try:
+        await _l2.set(key, _l2_payload(value, ttl), ttl)
+        await _l2.publish(key, exact=True)
+    except Exception as e:
+        logger.warning(f"Shared cache broadcast failed for {key}: {e}")
+
+
+def _bump_generation():
+    global _generation
+    _generation += 1
 
 
 async def delete_cache(key: str):
-    """Delete cached value - removed, does nothing."""
-    pass
+    """Delete cached value in every worker."""
+    _bump_generation()
+    _cache.delete(key)
+    if _l2 is None:
+        return
+
+    try:
+        await _l2.delete(key)
+        await _l2.publish(key, exact=True)
+    except Exception as e:
+        logger.warning(f"Shared cache delete failed for {key}: {e}")
 
 
 async def invalidate_pattern(pattern: str):
-    """Invalidate cache keys matching pattern - removed, does nothing."""
-    pass
+    """Invalidate cache keys matching a glob pattern in every worker."""
+    _bump_generation()
+    removed = _cache.delete_pattern(pattern)
+    logger.debug(f"Cache invalidated {removed} keys for {pattern}")
+    if _l2 is None:
+        return
+
+    try:
+        await _l2.delete_pattern(pattern)
+        await _l2.publish(pattern)
+    except Exception as e:
+        logger.warning(f"Shared cache invalidation failed for {pattern}: {e}")
+
+
+def _l1_ttl(ttl: int) -> int:
+    """L1 entries in front of a shared tier are capped at CACHE_L1_TTL."""
+    if _l2 is None:
+        return ttl
+    return min(ttl, get_settings().CACHE_L1_TTL)
 
 
 # Cache key prefixes
@@ -42,6 +714,9 @@ CACHE_KEYS = {
     "statistics": "cache:statistics",
     "projects": "cache:projects",
     "articles": "cache:articles",
+    "article_tags": "cache:articles:tags",
+    "article_tag_counts": "cache:articles:tag_counts",
+    "article_search": "cache:articles:search",
 }
 
 
@@ -55,4 +730,23 @@ CACHE_TTL = {
     "statistics": 7200,
     "projects": 3600,
     "articles": 1800,  # 30 minutes for articles (more frequent updates)
+    "article_search": 300,  # free-text queries rarely repeat for long
 }
+
+DEFAULT_TTL = 3600
+
+
+def ttl_for_key(key: str) -> int:
+    """Resolve the TTL for a key from the CACHE_KEYS namespace it belongs to."""
+    best_name, best_len = None, -1
+    for name, prefix in CACHE_KEYS.items():
+        if name not in CACHE_TTL:
+            continue
+        if _matches(key, prefix) and len(prefix) > best_len:
+            best_name, best_len = name, len(prefix)
+    return CACHE_TTL[best_name] if best_name else DEFAULT_TTL
+
+
+def key_part(value: Any) -> str:
+    """value percent-encoded for a cache key, so it cannot contain the key's separators or glob characters."""
+    return quote(str(value), safe="")
@@ -0,0 +1,180 @@
+"""
+Response compression middleware.
+
+Compresses textual responses (JSON, HTML, JS, CSS, SVG, ...) with brotli,
+zstd or gzip, whichever the client accepts first in that order. Bodies are
+compressed incrementally, so streaming responses stay streamed.
+
+Responses that already carry a Content-Encoding pass through untouched:
+cached routes (app.response_cache) and static files (app.static_files) send
+variants that were compressed once, and a hot response is never
+recompressed per request.
+"""
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.response_cache import negotiate_encoding
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional
+    zstandard = None
+
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/javascript", "application/xml",
+    "application/manifest+json", "image/svg+xml",
+)
+
+
+class _Compressor:
+    """Incremental encoder with a uniform compress/flush/finish interface."""
+
+    def __init__(self, coding: str, level: int):
+        self.coding = coding
+        if coding == "br":
+            encoder = brotli.Compressor(quality=min(level, 11))
+            self._compress = encoder.process
+            self._flush = encoder.flush
+            self._finish = encoder.finish
+        elif coding == "zstd":
+            encoder = zstandard.ZstdCompressor(level=level).compressobj()
+            self._compress = encoder.compress
+            self._flush = lambda: encoder.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            self._finish = encoder.flush
+        else:
+            encoder = zlib.compressobj(min(level, 9), zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress = encoder.compress
+            self._flush = lambda: encoder.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = encoder.flush
+
+    def compress(self, data: bytes, more: bool) -> bytes:
+        """Encode data; flushes so every streamed chunk reaches the client promptly."""
+        out = self._compress(data)
+        return out + (self._flush() if more else self._finish())
+
+
+def available_codings():
+    """Content-codings this process can produce, in order of preference."""
+    codings = []
+    if brotli is not None:
+        codings.append("br")
+    if zstandard is not None:
+        codings.append("zstd")
+    codings.append("gzip")
+    return codings
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing eligible responses of at least minimum_size bytes."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, level: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.codings = available_codings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.codings)
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(self, coding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Per-response state: decides on the first body chunk, then streams."""
+
+    def __init__(self, middleware: CompressionMiddleware, coding: str, send: Send):
+        self.middleware = middleware
+        self.coding = coding
+        self.downstream = send
+        self.start: Optional[Message] = None
+        self.buffer = b""
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.passthrough = not self._eligible(Headers(raw=message["headers"]))
+            if self.passthrough:
+                await self.downstream(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            if self.start is not None and not self.passthrough and self.compressor is None:
+                # The body comes another way (zerocopysend, pathsend): send it as-is, after the start
+                await self._pass_through()
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more = message.get("more_body", False)
+
+        if self.compressor is None:
+            self.buffer += body
+            if more and len(self.buffer) < self.middleware.minimum_size:
+                return
+            if not more and len(self.buffer) < self.middleware.minimum_size:
+                # Too small to be worth it: send as-is
+                await self._pass_through(more_body=False)
+                return
+            body, self.buffer = self.buffer, b""
+            self.compressor = _Compressor(self.coding, self.middleware.level)
+            if not more:
+                # Whole body at once: send it with its compressed length
+                data = self.compressor.compress(body, more=False)
+                await self.downstream(self._compressed_start(len(data)))
+                await self.downstream({"type": "http.response.body", "body": data})
+                return
+            await self.downstream(self._compressed_start(None))
+
+        await self.downstream({
+            "type": "http.response.body",
+            "body": self.compressor.compress(body, more),
+            "more_body": more,
+        })
+
+    async def _pass_through(self, more_body: bool = True):
+        """Give up on compressing: send the held start message and whatever body was buffered."""
+        self.passthrough = True
+        await self.downstream(self.start)
+        if self.buffer or not more_body:
+            await self.downstream({"type": "http.response.body", "body": self.buffer, "more_body": more_body})
+            self.buffer = b""
+
+    def _eligible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers or "content-range" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", ""):
+            return False
+        if self.start["status"] < 200 or self.start["status"] in (204, 304):
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _compressed_start(self, content_length: Optional[int]) -> Message:
+        headers = MutableHeaders(raw=list(self.start["headers"]))
+        headers["Content-Encoding"] = self.coding
+        headers.add_vary_header("Accept-Encoding")
+        if content_length is None:
+            del headers["content-length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # A strong validator must differ per encoding (same scheme as CachedResponse)
+            headers["ETag"] = f'{etag[:-1]}-{self.coding}"' if etag.endswith('"') else f"{etag}-{self.coding}"
+        return {**self.start, "headers": headers.raw}
@@ -12,6 +12,18 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite:///./geobiro.db"
+    WEB_CONCURRENCY: int = 1  # worker processes (uvicorn --workers reads the same variable)
+    DB_MAX_CONNECTIONS: int = 20  # connection budget shared by all workers
+    DB_POOL_SIZE: Optional[int] = None  # per worker; defaults to DB_MAX_CONNECTIONS / WEB_CONCURRENCY
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Postgres only
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # Postgres only
+    SQLITE_JOURNAL_MODE: str = "WAL"  # readers no longer block the writer
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # fsync at checkpoints, not on every commit
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # wait for a lock instead of failing with "database is locked"
+    SQLITE_CACHE_SIZE_MB: int = 64  # page cache per connection
+    SQLITE_MMAP_SIZE_MB: int = 256
 
     # JWT
     SECRET_KEY: str = "your-secret-key-change-in-production-min-32-chars"
@@ -29,6 +41,39 @@ class Settings(BaseSettings):
     # Frontend
     FRONTEND_URL: str = "http://localhost:5173"
 
+    # Cache
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 2048
+    CACHE_STALE_TTL: int = 300  # serve-stale window while a refresh runs
+    # Shared L2 tier: "sqlite:///./data/cache.db" or "redis://host:6379/0"
+    CACHE_L2_URL: Optional[str] = None
+    CACHE_L1_TTL: int = 300  # L1 lifetime cap when an L2 tier is configured
+    CACHE_INVALIDATION_POLL_MS: int = 50  # SQLite L2 only
+    CACHE_WARMUP: bool = True  # pre-render public list endpoints at startup
+    CACHE_SNAPSHOT_PATH: Optional[str] = None  # e.g. "./data/cache-snapshot.bin"
+
+    # Static files
+    STATIC_PRECOMPRESS: bool = True  # write .br/.gz siblings of static files at startup
+    STATIC_WATCH: bool = False  # re-index static/ when files change (needs watchfiles)
+    FILE_CACHE_MB: int = 64  # memory for small static/upload file bodies
+    FILE_CACHE_MAX_FILE_KB: int = 256  # larger files are streamed (sendfile when available)
+    FILE_STAT_TTL: float = 2.0  # seconds an upload's stat() result is reused
+
+    # Response compression (br/zstd/gzip) for responses not already encoded
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_LEVEL: int = 5
+
+    # Access log (JSON lines, written from a background thread)
+    ACCESS_LOG_ENABLED: bool = True
+    ACCESS_LOG_FILE: Optional[str] = None  # stdout when unset
+    ACCESS_LOG_STATIC_SAMPLE: float = 0.05  # share of static hits logged
+    ACCESS_LOG_SLOW_MS: float = 1000  # slower requests are always logged
+
+    # Event-loop monitor (debugging): reports code that blocks the loop
+    LOOP_MONITOR_ENABLED: bool = False
+    LOOP_MONITOR_THRESHOLD_MS: float = 100  # stalls longer than this are recorded with a stack
+
     # Environment
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
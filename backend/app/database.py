@@ -1,5 +1,10 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from typing import Any, AsyncIterator, Dict, List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import get_settings
 import os
 
@@ -10,12 +15,89 @@ db_dir = os.path.dirname(settings.DATABASE_URL.replace("sqlite:///", ""))
 if db_dir and not os.path.exists(db_dir):
     os.makedirs(db_dir, exist_ok=True)
 
-# Create database engine for SQLite
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    connect_args={"check_same_thread": False},  # SQLite specific
-)
+# Async drivers for the plain URLs used in .env / docker-compose.yml
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def async_url(url: str) -> str:
+    """DATABASE_URL with its async driver (sqlite -> aiosqlite, postgresql -> asyncpg)."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def pool_size() -> int:
+    """Connections per worker: the configured size, or the shared budget split across workers."""
+    if settings.DB_POOL_SIZE:
+        return settings.DB_POOL_SIZE
+    return max(1, settings.DB_MAX_CONNECTIONS // max(1, settings.WEB_CONCURRENCY))
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """create_engine/create_async_engine arguments for url: pool sizing, timeouts, driver options."""
+    parsed = make_url(url)
+    options: Dict[str, Any] = {"echo": settings.DEBUG}
+
+    if parsed.get_backend_name() == "sqlite":
+        options["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+        if parsed.database in (None, "", ":memory:"):
+            return options  # one shared in-memory connection, nothing to size
+        # aiosqlite defaults to NullPool: a new connection (and thread) per session
+        options["poolclass"] = AsyncAdaptedQueuePool if parsed.get_driver_name() == "aiosqlite" else QueuePool
+    elif parsed.get_backend_name() == "postgresql":
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if parsed.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+        options["pool_pre_ping"] = True
+        options["pool_recycle"] = settings.DB_POOL_RECYCLE
+
+    options.update(
+        pool_size=pool_size(),
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return options
+
+
+def sqlite_pragmas() -> List[str]:
+    """PRAGMA statements run on every new SQLite connection."""
+    return [
+        f"journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"cache_size=-{settings.SQLITE_CACHE_SIZE_MB * 1024}",  # negative: size in KiB
+        f"mmap_size={settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}",
+        "temp_store=MEMORY",
+    ]
+
+
+def apply_sqlite_pragmas(sync_engine: Engine):
+    """Run sqlite_pragmas() on each connection sync_engine opens (no-op for other databases)."""
+    if sync_engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in sqlite_pragmas():
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+
+# Sync engine: schema creation at startup and the maintenance scripts
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+apply_sqlite_pragmas(engine)
 
 # Create session factory
 SessionLocal = sessionmaker(
@@ -24,11 +106,19 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Async engine: everything that runs on the event loop (routers, cache loaders)
+_async_url = async_url(settings.DATABASE_URL)
+async_engine = create_async_engine(_async_url, **engine_options(_async_url))
+apply_sqlite_pragmas(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
-def get_db() -> Session:
+async def get_db() -> AsyncIterator[AsyncSession]:
     """Get database session dependency."""
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,54 @@
+"""
+Existence indexes - answer 404s for unknown ids and slugs without the database.
+
+An ExistenceIndex is the set of valid lookup values (ids, slugs) of one
+table. It is cached under the table's current version, so any committed
+create, update or delete loads a fresh set on the next lookup, in every
+worker. Detail routes check it before touching the cache or database:
+
+    article_index = ExistenceIndex("articles", Article.id, Article.slug)
+
+    @cached_route(..., guard=article_index.guard("article_id_or_slug", "Article not found"))
+"""
+from typing import Any, Awaitable, Callable, Dict, FrozenSet
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+
+from app.cache import get_or_load, CACHE_TTL
+from app.database import AsyncSessionLocal
+from app.table_versions import table_version
+
+
+EXISTS_KEY = "cache:exists:{table}:v:{version}"
+
+
+class ExistenceIndex:
+    """Set of valid lookup values for a table, reloaded whenever the table changes."""
+
+    def __init__(self, table: str, *columns):
+        self.table = table
+        self.columns = columns
+
+    async def members(self) -> FrozenSet[str]:
+        key = EXISTS_KEY.format(table=self.table, version=await table_version(self.table))
+        # No stale window: a stale set would turn newly created rows into 404s
+        return await get_or_load(key, self._load, ttl=CACHE_TTL.get(self.table), stale_ttl=0)
+
+    async def _load(self) -> FrozenSet[str]:
+        values = set()
+        async with AsyncSessionLocal() as db:
+            for row in await db.execute(select(*self.columns)):
+                values.update(str(value) for value in row if value is not None)
+        return frozenset(values)
+
+    async def contains(self, value: Any) -> bool:
+        return str(value) in await self.members()
+
+    def guard(self, param: str, detail: str) -> Callable[[Dict[str, Any]], Awaitable[None]]:
+        """Route guard raising 404 when the route argument param is not in the index."""
+        async def check(kwargs: Dict[str, Any]):
+            if not await self.contains(kwargs[param]):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+        return check
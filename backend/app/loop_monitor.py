@@ -0,0 +1,171 @@
+"""
+Event-loop lag monitor - finds code that blocks the event loop.
+
+A heartbeat task wakes every few milliseconds and records how late it
+woke up. A watchdog thread watches the heartbeat: once the loop has not
+come back for LOOP_MONITOR_THRESHOLD_MS it captures the event-loop
+thread's stack and the route of the task that is running, so sync I/O,
+password hashing or CPU-heavy loops inside async handlers show up with
+the line that blocked. Stalls outside any request (plain callbacks,
+background tasks) are reported as "(callback)".
+
+Stalls are logged as warnings and aggregated per route; admins read the
+aggregate at GET /api/admin/diagnostics/loop-lag.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+logger = logging.getLogger(__name__)
+
+STACK_LIMIT = 20  # innermost frames kept per stall
+
+
+class LoopMonitor:
+    """Measures event-loop lag and records a stack and route for every stall above threshold_ms."""
+
+    def __init__(self, threshold_ms: float = 100, max_events: int = 50):
+        self.threshold = threshold_ms / 1000
+        self.interval = max(self.threshold / 4, 0.005)
+        self.max_events = max_events
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog_thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._beat = 0.0
+        self._stall: Optional[Dict[str, Any]] = None  # captured by the watchdog during a stall
+        self._routes: Dict[asyncio.Task, Scope] = {}
+        self.reset()
+
+    def reset(self):
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.by_route: Dict[str, Dict[str, float]] = {}
+        self.events = deque(maxlen=self.max_events)
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        self._watchdog_thread = threading.Thread(target=self._watchdog, name="loop-monitor", daemon=True)
+        self._watchdog_thread.start()
+        logger.info(f"✓ Event-loop monitor started (threshold {self.threshold * 1000:.0f}ms)")
+
+    async def stop(self):
+        self._stopped.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+        if self._watchdog_thread is not None:
+            self._watchdog_thread.join(timeout=1)
+
+    def track(self, task: asyncio.Task, scope: Scope):
+        self._routes[task] = scope
+
+    def untrack(self, task: asyncio.Task):
+        self._routes.pop(task, None)
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            with self._lock:
+                self._beat = now
+                stall, self._stall = self._stall, None
+            self._record(max(0.0, now - expected), stall)
+
+    def _watchdog(self):
+        while not self._stopped.wait(self.interval):
+            with self._lock:
+                if self._stall is None and time.monotonic() - self._beat >= self.threshold:
+                    self._stall = self._capture()
+
+    def _capture(self) -> Dict[str, Any]:
+        """Stack and route of whatever is running on the loop thread right now (watchdog thread)."""
+        # Task first: the loop may move on while the stack is being formatted
+        task = asyncio.current_task(self._loop)
+        scope = self._routes.get(task) if task is not None else None
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame)[-STACK_LIMIT:] if frame is not None else []
+        return {"route": route_name(scope) if scope is not None else "(callback)", "stack": stack}
+
+    def _record(self, lag: float, stall: Optional[Dict[str, Any]]):
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        if lag < self.threshold:
+            return
+
+        route = stall["route"] if stall else "(unknown)"
+        stack = stall["stack"] if stall else []
+        lag_ms = lag * 1000
+        self.stalls += 1
+        stats = self.by_route.setdefault(route, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stats["count"] += 1
+        stats["total_ms"] += lag_ms
+        stats["max_ms"] = max(stats["max_ms"], lag_ms)
+        self.events.append({
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "route": route,
+            "lag_ms": round(lag_ms, 1),
+            "stack": stack,
+        })
+        logger.warning(f"Event loop blocked for {lag_ms:.0f}ms in {route}\n{''.join(stack)}")
+
+    def stats(self) -> Dict[str, Any]:
+        routes: List[Dict[str, Any]] = [
+            {"route": route, "count": int(s["count"]), "total_ms": round(s["total_ms"], 1),
+             "max_ms": round(s["max_ms"], 1)}
+            for route, s in self.by_route.items()
+        ]
+        routes.sort(key=lambda s: s["total_ms"], reverse=True)
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "samples": self.samples,
+            "avg_lag_ms": round(self.total_lag / self.samples * 1000, 2) if self.samples else 0.0,
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "stalls": self.stalls,
+            "routes": routes,
+            "recent": list(self.events),
+        }
+
+
+def route_name(scope: Scope) -> str:
+    """Label such as GET /api/articles/{article_id_or_slug}; the raw path until the request is routed."""
+    route = scope.get("route")
+    return f"{scope.get('method', '')} {getattr(route, 'path', scope['path'])}"
+
+
+class LoopMonitorMiddleware:
+    """ASGI middleware telling the monitor which request each task is serving."""
+
+    def __init__(self, app: ASGIApp, monitor: LoopMonitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        task = asyncio.current_task()
+        self.monitor.track(task, scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor.untrack(task)
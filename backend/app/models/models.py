@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, Index, Table
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -168,7 +168,7 @@ class Article(Base):
     content_en = Column(Text, nullable=False)
     content_fa = Column(Text, nullable=True)
     image_url = Column(String(500), nullable=True)
-    tags = Column(String(500), nullable=True)  # Comma-separated tags
+    tags = Column(String(500), nullable=True)  # Comma-separated tags (mirrored into tags/article_tags)
     category = Column(String(100), nullable=True, index=True)
     author = Column(String(255), nullable=True)
     is_published = Column(Boolean, default=True, index=True)
@@ -176,8 +176,9 @@ class Article(Base):
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Relationship to article images
-    images = relationship("ArticleImage", back_populates="article", cascade="all, delete-orphan")
+    # Relationship to article images; never lazy-loaded, each query picks its
+    # loader (see app/routers/articles.py)
+    images = relationship("ArticleImage", back_populates="article", cascade="all, delete-orphan", lazy="raise")
 
 
 class ArticleImage(Base):
@@ -196,4 +197,26 @@ class ArticleImage(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationship back to article
-    article = relationship("Article", back_populates="images")
+    article = relationship("Article", back_populates="images", lazy="raise")
+
+
+class Tag(Base):
+    """Article tag, derived from Article.tags (see app/tags.py)."""
+    __tablename__ = "tags"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False)  # As first written, e.g. "BIM"
+    key = Column(String(100), unique=True, nullable=False, index=True)  # Case-folded name for lookups
+    article_count = Column(Integer, default=0, nullable=False)  # Published articles with this tag
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# Article <-> tag links; the primary key serves per-article lookups and the
+# (tag_id, article_id) index serves tag filters without touching the table
+article_tags = Table(
+    "article_tags",
+    Base.metadata,
+    Column("article_id", Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_article_tags_tag_id_article_id", "tag_id", "article_id"),
+)
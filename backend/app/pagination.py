@@ -0,0 +1,156 @@
+"""
+Keyset (cursor) pagination for list routes.
+
+A Keyset is the sort order of a list, ending in a unique column:
+
+    ARTICLE_KEYSET = Keyset(Article.publish_date.desc(), Article.id.desc())
+
+Instead of OFFSET, the next page starts right after the last row of the
+previous one. That row's sort values travel as an opaque cursor: routes
+return it in the X-Next-Cursor header and clients pass it back as
+?cursor=. Every page is an index range scan, however deep it is.
+
+X-Total-Count comes from cached_count(): a COUNT(*) computed once per
+table version (any committed write retires it) instead of once per page.
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import orjson
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import operators
+
+from app.cache import get_or_load, key_part, CACHE_TTL
+from app.table_versions import table_version
+
+
+COUNT_KEY = "cache:count:{table}:{params}:v:{version}"
+
+
+class Page:
+    """One page of a list route: the items plus the headers describing the rest."""
+
+    __slots__ = ("items", "next_cursor", "total")
+
+    def __init__(self, items: List[Any], next_cursor: Optional[str] = None, total: Optional[int] = None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.total = total
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.total is not None:
+            headers["X-Total-Count"] = str(self.total)
+        if self.next_cursor is not None:
+            headers["X-Next-Cursor"] = self.next_cursor
+        return headers
+
+    def respond(self, response: Response) -> List[Any]:
+        """Copy the page headers onto an uncached route's response and return the items."""
+        response.headers.update(self.headers)
+        return self.items
+
+
+class Keyset:
+    """Sort order of a list route and the cursor arithmetic on top of it."""
+
+    def __init__(self, *order_by):
+        self.order_by = []
+        self.columns = []  # (column, descending)
+        for clause in order_by:
+            column = getattr(clause, "element", clause)
+            descending = getattr(clause, "modifier", None) is operators.desc_op
+            if _is_nullable(column):
+                # NULLs last in either direction and on every database, as after() assumes
+                clause = (column.desc() if descending else column.asc()).nulls_last()
+            self.order_by.append(clause)
+            self.columns.append((column, descending))
+
+    def select(self, *columns) -> Select:
+        """select() of columns plus the sort columns they lack, which cursors are built from."""
+        selected = {column.key for column in columns}
+        return select(*columns, *(column for column, _ in self.columns if column.key not in selected))
+
+    def apply(self, stmt: Select, cursor: Optional[str] = None, limit: Optional[int] = None) -> Select:
+        """Order stmt, start it after cursor and fetch one extra row to detect a next page."""
+        stmt = stmt.order_by(*self.order_by)
+        if cursor:
+            stmt = stmt.where(self.after(self.decode(cursor)))
+        if limit:
+            stmt = stmt.limit(limit + 1)
+        return stmt
+
+    def after(self, values: Sequence[Any]):
+        """Rows strictly after values in this order (expanded, so mixed directions work)."""
+        clauses = []
+        for i, (column, descending) in enumerate(self.columns):
+            if values[i] is None:
+                continue  # NULLs sort last: no value of this column comes after one
+            ties = [c == v for (c, _), v in zip(self.columns[:i], values)]  # "== None" is IS NULL
+            step = column < values[i] if descending else column > values[i]
+            if _is_nullable(column):
+                step = or_(step, column.is_(None))
+            clauses.append(and_(*ties, step))
+        return or_(*clauses)
+
+    def page(self, rows: Sequence[Any], limit: Optional[int] = None, total: Optional[int] = None) -> Page:
+        """Page of rows fetched with apply(); the extra row, if present, becomes the next cursor."""
+        rows = list(rows)
+        next_cursor = None
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode(rows[-1])
+        return Page(rows, next_cursor, total)
+
+    def encode(self, row: Any) -> str:
+        values = [getattr(row, column.key) for column, _ in self.columns]
+        return base64.urlsafe_b64encode(orjson.dumps(values)).rstrip(b"=").decode()
+
+    def decode(self, cursor: str) -> List[Any]:
+        try:
+            values = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            if not isinstance(values, list) or len(values) != len(self.columns):
+                raise ValueError(cursor)
+            return [
+                datetime.fromisoformat(value) if value is not None and _is_datetime(column) else value
+                for (column, _), value in zip(self.columns, values)
+            ]
+        except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _is_nullable(column) -> bool:
+    return bool(getattr(column, "nullable", False)) and not getattr(column, "primary_key", False)
+
+
+def _is_datetime(column) -> bool:
+    try:
+        return column.type.python_type is datetime
+    except NotImplementedError:
+        return False
+
+
+async def cached_count(db: AsyncSession, model, criteria: Sequence = (), **params) -> int:
+    """
+    Number of model rows matching criteria, counted once per table version.
+
+    params are the filter values behind criteria; they only name the cache key.
+    """
+    table = model.__tablename__
+    key = COUNT_KEY.format(
+        table=table,
+        params=",".join(
+            f"{key_part(name)}={key_part(value)}" for name, value in sorted(params.items()) if value is not None
+        ),
+        version=await table_version(table),
+    )
+
+    async def load() -> int:
+        return await db.scalar(select(func.count()).select_from(model).where(*criteria))
+
+    return await get_or_load(key, load, ttl=CACHE_TTL.get(table), stale_ttl=0)
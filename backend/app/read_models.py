@@ -0,0 +1,82 @@
+"""
+Read models for public list endpoints.
+
+Instead of loading ORM entities (identity map, change tracking, lazy
+loaders) these run Core selects of exactly the columns a response schema
+declares. Rows come back as SQLAlchemy Row tuples with attribute access and
+go straight to the serializer (app.serialization). Bilingual fallbacks are
+resolved in SQL with COALESCE, so no per-row dicts are built in Python.
+
+Lists come back as a Page (app.pagination): keyset-paginated rows plus
+the cached total.
+
+List routes with named projections (fields=card|full) select the columns
+of the projection's schema only; cards skip long text and relationships.
+"""
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import Article, Project, Service, TeamMember
+from app.pagination import Keyset, Page, cached_count
+from app.schemas.schemas import (
+    ArticleCard, ArticleResponse, ProjectCard, ProjectResponse, ServiceResponse, TeamMemberResponse,
+)
+
+
+def columns_for(model, schema, overrides: Optional[Dict[str, Any]] = None) -> list:
+    """Select list for every field of schema: model columns or labelled override expressions."""
+    overrides = overrides or {}
+    return [
+        overrides[name].label(name) if name in overrides else getattr(model, name)
+        for name in schema.model_fields
+    ]
+
+
+SERVICE_COLUMNS = columns_for(Service, ServiceResponse, {
+    # Legacy rows only have the untranslated title/description
+    "title_en": func.coalesce(Service.title_en, Service.title),
+    "description_en": func.coalesce(Service.description_en, Service.description),
+})
+PROJECT_COLUMNS = columns_for(Project, ProjectResponse)
+TEAM_MEMBER_COLUMNS = columns_for(TeamMember, TeamMemberResponse)
+ARTICLE_CARD_COLUMNS = columns_for(Article, ArticleCard)
+
+# Named projections of list routes: fields value -> response schema
+PROJECT_FIELDS = {"card": ProjectCard, "full": ProjectResponse}
+ARTICLE_FIELDS = {"card": ArticleCard, "full": ArticleResponse}  # full: Article entities with images
+PROJECT_FIELD_COLUMNS = {"card": columns_for(Project, ProjectCard), "full": PROJECT_COLUMNS}
+
+SERVICE_KEYSET = Keyset(Service.created_at.desc(), Service.id.desc())
+PROJECT_KEYSET = Keyset(Project.order, Project.created_at.desc(), Project.id.desc())
+TEAM_MEMBER_KEYSET = Keyset(TeamMember.created_at.desc(), TeamMember.id.desc())
+
+
+async def service_rows(
+    db: AsyncSession, category: Optional[str] = None, cursor: Optional[str] = None, limit: Optional[int] = None
+) -> Page:
+    criteria = [Service.category == category] if category else []
+    stmt = SERVICE_KEYSET.apply(select(*SERVICE_COLUMNS).where(*criteria), cursor, limit)
+    total = await cached_count(db, Service, criteria, category=category)
+    return SERVICE_KEYSET.page((await db.execute(stmt)).all(), limit, total)
+
+
+async def project_rows(
+    db: AsyncSession, category: Optional[str] = None, featured: Optional[bool] = None,
+    cursor: Optional[str] = None, limit: Optional[int] = None, fields: str = "full",
+) -> Page:
+    criteria = []
+    if category:
+        criteria.append(Project.category == category)
+    if featured is not None:
+        criteria.append(Project.is_featured == featured)
+    stmt = PROJECT_KEYSET.apply(PROJECT_KEYSET.select(*PROJECT_FIELD_COLUMNS[fields]).where(*criteria), cursor, limit)
+    total = await cached_count(db, Project, criteria, category=category, featured=featured)
+    return PROJECT_KEYSET.page((await db.execute(stmt)).all(), limit, total)
+
+
+async def team_member_rows(db: AsyncSession, cursor: Optional[str] = None, limit: Optional[int] = None) -> Page:
+    stmt = TEAM_MEMBER_KEYSET.apply(select(*TEAM_MEMBER_COLUMNS), cursor, limit)
+    total = await cached_count(db, TeamMember)
+    return TEAM_MEMBER_KEYSET.page((await db.execute(stmt)).all(), limit, total)
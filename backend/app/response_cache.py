@@ -0,0 +1,378 @@
+"""
+Response cache - caches final encoded JSON bodies.
+
+A CachedResponse holds the serialized body, its ETag and precompressed
+content-encoding variants. On a hit the route returns it as a raw
+Response, skipping response_model validation and JSON encoding entirely.
+
+Cached routes derive their ETag from the versioned cache key and their
+Last-Modified from the table versions, so conditional requests
+(If-None-Match / If-Modified-Since) are answered with 304 before the cache
+or the database is consulted.
+
+Routes opt in declaratively:
+
+    @router.get("", response_model=List[ProjectResponse])
+    @cached_route("projects", List[ProjectResponse], key_params=("category",), tables=("projects",))
+    async def get_projects(category: str = Query(None), db: AsyncSession = Depends(get_db)):
+        ...
+
+Writes need no counterpart: committing a session bumps the version of
+every table it touched (see app.table_versions).
+"""
+import functools
+import gzip
+import hashlib
+import inspect
+import struct
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import orjson
+from fastapi import Request, Response
+from pydantic.fields import FieldInfo
+
+from app.cache import get_or_load, key_part, register_codec, CACHE_KEYS
+from app.database import AsyncSessionLocal
+from app.pagination import Page
+from app.serialization import render
+from app.table_versions import table_versions, version_time
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+
+class CachedResponse:
+    """Pre-serialized response body with its ETag and encoded variants."""
+
+    __slots__ = ("body", "etag", "variants", "media_type", "status_code", "headers")
+
+    def __init__(
+        self, body: bytes, media_type: str = "application/json", status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.body = body
+        self.media_type = media_type
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self.variants: Dict[str, bytes] = {}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(body, quality=5)
+            self.variants["gzip"] = gzip.compress(body, compresslevel=6)
+
+    def to_response(
+        self, request: Request, etag: Optional[str] = None, last_modified: Optional[float] = None
+    ) -> Response:
+        """
+        Build the response for request, honouring Accept-Encoding and If-None-Match.
+
+        etag replaces the content hash when the caller has a cheaper strong
+        validator (see cached_route); last_modified adds a Last-Modified header.
+        """
+        base = etag or self.etag
+        coding = negotiate_encoding(request.headers.get("accept-encoding", ""), self.variants)
+        etag = base if coding is None else f'{base[:-1]}-{coding}"'
+        headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+        if last_modified is not None:
+            headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+        if etag_matches(request.headers.get("if-none-match"), base):
+            return Response(status_code=304, headers=headers)
+
+        headers.update(self.headers)
+        body = self.body
+        if coding is not None:
+            body = self.variants[coding]
+            headers["Content-Encoding"] = coding
+        return Response(body, status_code=self.status_code, headers=headers, media_type=self.media_type)
+
+
+# Shared-tier form of a CachedResponse: metadata length, JSON metadata, then
+# the body and the encoded variants back to back (sizes in the metadata)
+_METADATA_SIZE = struct.Struct("!I")
+
+
+def _dump_response(entry: CachedResponse) -> bytes:
+    metadata = orjson.dumps({
+        "media_type": entry.media_type,
+        "status_code": entry.status_code,
+        "headers": entry.headers,
+        "etag": entry.etag,
+        "size": len(entry.body),
+        "variants": [[coding, len(body)] for coding, body in entry.variants.items()],
+    })
+    return b"".join([_METADATA_SIZE.pack(len(metadata)), metadata, entry.body, *entry.variants.values()])
+
+
+def _load_response(data: bytes) -> CachedResponse:
+    (length,) = _METADATA_SIZE.unpack_from(data)
+    offset = _METADATA_SIZE.size + length
+    metadata = orjson.loads(data[_METADATA_SIZE.size:offset])
+    # Built without __init__: the variants were compressed when the entry was first rendered
+    entry = CachedResponse.__new__(CachedResponse)
+    entry.media_type = metadata["media_type"]
+    entry.status_code = metadata["status_code"]
+    entry.headers = metadata["headers"]
+    entry.etag = metadata["etag"]
+    entry.body = data[offset:offset + metadata["size"]]
+    offset += metadata["size"]
+    entry.variants = {}
+    for coding, size in metadata["variants"]:
+        entry.variants[coding] = data[offset:offset + size]
+        offset += size
+    if offset != len(data):
+        raise ValueError("truncated cached response")
+    return entry
+
+
+register_codec(2, CachedResponse, _dump_response, _load_response)
+
+
+def negotiate_encoding(accept_encoding: str, available) -> Optional[str]:
+    """Pick the best available content-coding allowed by an Accept-Encoding header."""
+    if not available or not accept_encoding:
+        return None
+
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for coding in available:
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """
+    Match an If-None-Match header against etag and its encoded variants.
+
+    Returns the matching tag (the one the client holds), or None.
+    """
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    base = etag[:-1]
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag or candidate.startswith(base + "-"):
+            return candidate
+    return None
+
+
+def key_etag(key: str) -> str:
+    """Strong ETag for the response stored under a versioned cache key."""
+    return '"' + hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + '"'
+
+
+def last_modified_of(versions: Sequence[str]) -> Optional[float]:
+    """
+    Newest modification time (whole seconds) among table version tokens.
+
+    None while that second is still the current one: a later write in the
+    same second would carry the same Last-Modified, so such responses rely
+    on their ETag alone and If-Modified-Since is not answered with a 304.
+    """
+    times = [version_time(version) for version in versions]
+    if not times or None in times:
+        return None
+    newest = int(max(times))
+    if newest >= int(time.time()):
+        return None
+    return float(newest)
+
+
+def not_modified(request: Request, etag: str, last_modified: Optional[float]) -> Optional[Response]:
+    """
+    304 response when the request's validators are still current, else None.
+
+    If-None-Match wins over If-Modified-Since when both are sent (RFC 9110).
+    """
+    headers = {"Vary": "Accept-Encoding"}
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        matched = etag_matches(if_none_match, etag)
+        if matched is None:
+            return None
+        headers["ETag"] = matched
+        return Response(status_code=304, headers=headers)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or last_modified is None:
+        return None
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return None
+    if last_modified > since:
+        return None
+    headers["ETag"] = etag
+    return Response(status_code=304, headers=headers)
+
+
+def render_json(schema, data: Any) -> CachedResponse:
+    """Validate data (ORM objects or dicts, or a Page of them) against schema and encode it once."""
+    if isinstance(data, Page):
+        return CachedResponse(render(schema, data.items), headers=data.headers)
+    return CachedResponse(render(schema, data))
+
+
+async def cached_json(
+    request: Request,
+    key: str,
+    loader: Callable[[], Awaitable[CachedResponse]],
+    ttl: Optional[int] = None,
+) -> Response:
+    """Serve a CachedResponse from the cache, rendering it with loader on a miss."""
+    entry = await get_or_load(key, loader, ttl=ttl)
+    return entry.to_response(request)
+
+
+def build_key(namespace: str, params: Dict[str, Any]) -> str:
+    """Cache key for a namespace and the route parameters that vary its response."""
+    parts = [CACHE_KEYS[namespace]]
+    for name, value in params.items():
+        if value is not None:
+            parts.append(f"{key_part(name)}:{key_part(value)}")
+    return ":".join(parts)
+
+
+def cached_route(
+    namespace: str,
+    response_model,
+    key_params: Sequence[str] = (),
+    tables: Sequence[str] = (),
+    ttl: Optional[int] = None,
+    warm: Sequence[Dict[str, Any]] = (),
+    guard: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    fields: Optional[Dict[str, Any]] = None,
+):
+    """
+    Cache a GET route's encoded response.
+
+    namespace is a CACHE_KEYS entry, key_params the arguments that vary the
+    response and tables the database tables it reads. The current versions
+    of those tables are part of the cache key, so any committed write to
+    them retires the cached response. The endpoint may declare a ``db``
+    argument as usual; it is removed from the route's dependencies and a
+    session is opened only when the cache misses.
+
+    With tables, the ETag is derived from the versioned key and
+    Last-Modified from the versions, so conditional requests get a 304
+    without a cache lookup or a database query.
+
+    Each dict in warm is a set of argument overrides (on top of the route's
+    defaults) that app.warmup pre-renders at startup. guard, if given, runs
+    first with the route arguments and may raise (e.g. an ExistenceIndex
+    guard answering 404 for unknown ids).
+
+    fields maps each value of the route's ``fields`` argument (a named
+    projection such as "card" or "full") to the schema rendered for it;
+    the argument is then part of the cache key.
+    """
+    if fields is not None and "fields" not in key_params:
+        key_params = (*key_params, "fields")
+
+    def decorator(endpoint):
+        signature = inspect.signature(endpoint)
+        wants_db = "db" in signature.parameters
+        wants_request = "request" in signature.parameters
+        parameters = [p for name, p in signature.parameters.items() if name != "db"]
+        if not wants_request:
+            parameters.insert(0, inspect.Parameter(
+                "request", inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=Request
+            ))
+
+        async def resolve(kwargs: Dict[str, Any]) -> Tuple[str, List[str]]:
+            """Versioned cache key and table versions for the route arguments."""
+            if guard is not None:
+                await guard(kwargs)
+            key = build_key(namespace, {name: kwargs[name] for name in key_params})
+            versions = await table_versions(tables)
+            if versions:
+                key += ":v:" + ".".join(versions)
+            return key, versions
+
+        async def fill(kwargs: Dict[str, Any], key: Optional[str] = None) -> CachedResponse:
+            if key is None:
+                key, _ = await resolve(kwargs)
+
+            schema = fields[kwargs["fields"]] if fields is not None else response_model
+
+            async def load():
+                if not wants_db:
+                    return render_json(schema, await endpoint(**kwargs))
+                async with AsyncSessionLocal() as db:
+                    return render_json(schema, await endpoint(db=db, **kwargs))
+
+            return await get_or_load(key, load, ttl=ttl)
+
+        @functools.wraps(endpoint)
+        async def wrapper(**kwargs):
+            request = kwargs["request"] if wants_request else kwargs.pop("request")
+            key, versions = await resolve(kwargs)
+            etag = last_modified = None
+            if versions:
+                etag = key_etag(key)
+                last_modified = last_modified_of(versions)
+                response = not_modified(request, etag, last_modified)
+                if response is not None:
+                    return response
+            entry = await fill(kwargs, key)
+            return entry.to_response(request, etag, last_modified)
+
+        defaults = {
+            name: _default_value(p)
+            for name, p in signature.parameters.items()
+            if name not in ("db", "request")
+        }
+        if wants_request:
+            defaults["request"] = None
+        for overrides in warm:
+            _warm_targets.append((endpoint.__name__, functools.partial(fill, {**defaults, **overrides})))
+
+        wrapper.__signature__ = signature.replace(parameters=parameters)
+        return wrapper
+
+    return decorator
+
+
+# (route name, coroutine factory) pairs registered through cached_route(warm=...)
+_warm_targets: List[Tuple[str, Callable[[], Awaitable[CachedResponse]]]] = []
+
+
+def warm_targets() -> List[Tuple[str, Callable[[], Awaitable[CachedResponse]]]]:
+    return list(_warm_targets)
+
+
+def _default_value(parameter: inspect.Parameter) -> Any:
+    """Plain default of a route parameter, unwrapping Query(...)/Path(...) markers."""
+    default = parameter.default
+    if default is inspect.Parameter.empty:
+        return None
+    if isinstance(default, FieldInfo):
+        return default.default
+    return default
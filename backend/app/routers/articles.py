@@ -1,54 +1,150 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from typing import List, Union
 
 from app.database import get_db
-from app.models.models import Article, ArticleImage
+from app.models.models import Article, ArticleImage, Tag
 from app.schemas.schemas import (
-    ArticleCreate, ArticleUpdate, ArticleResponse,
+    ArticleCreate, ArticleUpdate, ArticleResponse, ArticleCard, ArticleSearchResult, TagCount,
     ArticleImageCreate, ArticleImageUpdate, ArticleImageResponse
 )
 from app.core.security import require_admin
+from app.response_cache import cached_route
+from app.existence import ExistenceIndex
+from app.pagination import Keyset, Page, cached_count
+from app.read_models import ARTICLE_CARD_COLUMNS, ARTICLE_FIELDS
+from app.search import canonical_query, search_articles
+from app.tags import tagged
 
 router = APIRouter(prefix="/articles", tags=["Articles"])
 
+article_index = ExistenceIndex("articles", Article.id, Article.slug)
 
-@router.get("", response_model=List[ArticleResponse])
+ARTICLE_KEYSET = Keyset(Article.publish_date.desc(), Article.id.desc())
+
+
+# How each endpoint loads Article.images (the relationship itself is lazy="raise"):
+# lists fetch the images of a whole page in one extra IN query, single articles
+# join them into the article query, and card projections load none
+LIST_LOADING = (selectinload(Article.images),)
+DETAIL_LOADING = (joinedload(Article.images),)
+
+
+def select_articles(loading=LIST_LOADING):
+    """Article select with images loaded by the given loader options."""
+    return select(Article).options(*loading)
+
+
+async def first_article(db: AsyncSession, stmt) -> Article:
+    """First article of a DETAIL_LOADING select (joined rows repeat the article once per image)."""
+    return (await db.scalars(stmt)).unique().first()
+
+
+async def load_article(db: AsyncSession, article_id: int) -> Article:
+    """Re-read an article after a write, including server defaults and images."""
+    return await first_article(db, select_articles(DETAIL_LOADING).where(
+        Article.id == article_id
+    ).execution_options(populate_existing=True))
+
+
+@router.get("", response_model=Union[List[ArticleResponse], List[ArticleCard]])
+@cached_route("articles", List[ArticleResponse], key_params=("skip", "limit", "cursor", "tag", "category"),
+              tables=("articles", "article_images"),
+              warm=({"limit": 3, "fields": "card"}, {"limit": 100, "fields": "card"}),  # featured articles, archive
+              fields={name: List[schema] for name, schema in ARTICLE_FIELDS.items()})
 async def get_articles(
-    skip: int = Query(0, ge=0),
+    skip: int = Query(0, ge=0, description="Deprecated: pass cursor instead"),
     limit: int = Query(10, ge=1, le=100),
-    tag: str = Query(None, description="Filter by tag"),
+    cursor: str = Query(None, description="X-Next-Cursor header of the previous page"),
+    tag: str = Query(None, description="Filter by tag (exact, case-insensitive)"),
     category: str = Query(None, description="Filter by category"),
-    db: Session = Depends(get_db)
+    fields: str = Query("full", pattern="^(card|full)$", description="card: list-card fields, no content or images"),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get articles with pagination and optional filtering."""
-    # Query database
-    query = db.query(Article).filter(Article.is_published == True).order_by(Article.publish_date.desc())
-    
+    """Get articles with cursor pagination and optional filtering."""
+    criteria = [Article.is_published == True]
     if tag:
-        query = query.filter(Article.tags.contains(tag))
+        criteria.append(tagged(tag))
     if category:
-        query = query.filter(Article.category == category)
+        criteria.append(Article.category == category)
     
-    articles = query.offset(skip).limit(limit).all()
+    base = ARTICLE_KEYSET.select(*ARTICLE_CARD_COLUMNS) if fields == "card" else select_articles(LIST_LOADING)
+    query = ARTICLE_KEYSET.apply(base.where(*criteria), cursor, limit)
+    if skip and not cursor:
+        query = query.offset(skip)
     
-    return articles
+    total = await cached_count(db, Article, criteria, published=True, tag=tag, category=category)
+    rows = (await db.execute(query)).all() if fields == "card" else (await db.scalars(query)).all()
+    return ARTICLE_KEYSET.page(rows, limit, total)
+
+
+# Search results are ranked, so a cursor is simply the next offset; deep pages are not served
+MAX_SEARCH_OFFSET = 500
+
+
+def search_terms(
+    q: str = Query(..., min_length=1, max_length=100, description="Search terms (English or Persian)"),
+) -> str:
+    # Canonical before the cache key is built: "BIM", " bim " and "Bim!" share an entry
+    return canonical_query(q)
+
+
+def search_offset(cursor: str = Query(None, description="X-Next-Cursor header of the previous page")) -> int:
+    if cursor is None:
+        return 0
+    if not cursor.isdigit() or int(cursor) > MAX_SEARCH_OFFSET:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return int(cursor)
+
+
+@router.get("/search", response_model=List[ArticleSearchResult])
+@cached_route("article_search", List[ArticleSearchResult], key_params=("q", "cursor", "limit"),
+              tables=("articles",))
+async def search(
+    q: str = Depends(search_terms),
+    limit: int = Query(10, ge=1, le=50),
+    cursor: int = Depends(search_offset),
+    db: AsyncSession = Depends(get_db)
+):
+    """Full-text search over published articles, best match first."""
+    results, total = await search_articles(db, q, limit, cursor)
+    next_offset = cursor + limit
+    next_cursor = str(next_offset) if next_offset < total and next_offset <= MAX_SEARCH_OFFSET else None
+    return Page(results, next_cursor, total)
+
+
+@router.get("/tags", response_model=List[TagCount])
+@cached_route("article_tag_counts", List[TagCount], tables=("articles",), warm=({},))  # tags derive from articles
+async def get_tag_counts(db: AsyncSession = Depends(get_db)):
+    """Get tags of published articles with their article counts, most used first."""
+    rows = await db.execute(
+        select(Tag.name, Tag.article_count)
+        .where(Tag.article_count > 0)
+        .order_by(Tag.article_count.desc(), Tag.name)
+    )
+    return [TagCount(name=name, count=count) for name, count in rows]
 
 
 @router.get("/{article_id_or_slug}", response_model=ArticleResponse)
+@cached_route("articles", ArticleResponse, key_params=("article_id_or_slug",),
+              tables=("articles", "article_images"),
+              guard=article_index.guard("article_id_or_slug", "Article not found"))
 async def get_article(
     article_id_or_slug: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific article by ID or slug."""
-    # Try to get by ID first (if numeric)
-    article = None
+    # Match ID or slug in one query, preferring the ID match (if numeric)
     if article_id_or_slug.isdigit():
-        article = db.query(Article).filter(Article.id == int(article_id_or_slug)).first()
-    
-    # If not found by ID, try by slug
-    if not article:
-        article = db.query(Article).filter(Article.slug == article_id_or_slug).first()
+        matches = list((await db.scalars(select_articles(DETAIL_LOADING).where(
+            or_(Article.id == int(article_id_or_slug), Article.slug == article_id_or_slug)
+        ))).unique().all())
+        matches.sort(key=lambda a: a.id != int(article_id_or_slug))
+        article = matches[0] if matches else None
+    else:
+        article = await first_article(db, select_articles(DETAIL_LOADING).where(Article.slug == article_id_or_slug))
     
     if not article:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Article not found")
@@ -59,11 +155,11 @@ async def get_article(
 @router.post("", response_model=ArticleResponse, dependencies=[Depends(require_admin)])
 async def create_article(
     article: ArticleCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new article (admin only)."""
     # Check for duplicate slug
-    existing = db.query(Article).filter(Article.slug == article.slug).first()
+    existing = await db.scalar(select(Article.id).where(Article.slug == article.slug))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -72,20 +168,19 @@ async def create_article(
     
     db_article = Article(**article.dict())
     db.add(db_article)
-    db.commit()
-    db.refresh(db_article)
+    await db.commit()
     
-    return db_article
+    return await load_article(db, db_article.id)
 
 
 @router.put("/{article_id}", response_model=ArticleResponse, dependencies=[Depends(require_admin)])
 async def update_article(
     article_id: int,
     article: ArticleUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an article (admin only)."""
-    db_article = db.query(Article).filter(Article.id == article_id).first()
+    db_article = await db.get(Article, article_id)
     if not db_article:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Article not found")
     
@@ -93,10 +188,10 @@ async def update_article(
     
     # Check for duplicate slug if slug is being updated
     if 'slug' in update_data and update_data['slug'] != db_article.slug:
-        existing = db.query(Article).filter(
+        existing = await db.scalar(select(Article.id).where(
             Article.slug == update_data['slug'],
             Article.id != article_id
-        ).first()
+        ))
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -107,49 +202,42 @@ async def update_article(
         setattr(db_article, field, value)
     
     db.add(db_article)
-    db.commit()
-    db.refresh(db_article)
+    await db.commit()
     
-    return db_article
+    return await load_article(db, article_id)
 
 
 @router.delete("/{article_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_admin)])
 async def delete_article(
     article_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete an article (admin only)."""
-    db_article = db.query(Article).filter(Article.id == article_id).first()
+    # Images are loaded up front so the delete-orphan cascade can remove them
+    db_article = await first_article(db, select_articles(DETAIL_LOADING).where(Article.id == article_id))
     if not db_article:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Article not found")
     
-    db.delete(db_article)
-    db.commit()
+    await db.delete(db_article)
+    await db.commit()
     
     return None
 
 
 @router.get("/tags/all", response_model=List[str])
-async def get_all_tags(db: Session = Depends(get_db)):
+@cached_route("article_tags", List[str], tables=("articles",), warm=({},))
+async def get_all_tags(db: AsyncSession = Depends(get_db)):
     """Get all unique tags from published articles."""
-    articles = db.query(Article).filter(Article.is_published == True).all()
-    tags_set = set()
-    
-    for article in articles:
-        if article.tags:
-            tags = [tag.strip() for tag in article.tags.split(',')]
-            tags_set.update(tags)
-    
-    return sorted(list(tags_set))
+    return list(await db.scalars(select(Tag.name).where(Tag.article_count > 0).order_by(Tag.name)))
 
 
 @router.post("/seed-demo", response_model=dict)
-async def seed_demo_articles(db: Session = Depends(get_db)):
+async def seed_demo_articles(db: AsyncSession = Depends(get_db)):
     """Seed demo articles for development. (Development only)"""
     from datetime import datetime, timedelta
     
     # Check if articles already exist
-    existing = db.query(Article).count()
+    existing = await db.scalar(select(func.count()).select_from(Article))
     if existing > 0:
         return {"message": f"Articles already exist: {existing} articles found"}
     
@@ -227,7 +315,7 @@ async def seed_demo_articles(db: Session = Depends(get_db)):
     ]
     
     db.add_all(sample_articles)
-    db.commit()
+    await db.commit()
     
     return {
         "message": f"Successfully seeded {len(sample_articles)} demo articles",
@@ -241,11 +329,11 @@ async def seed_demo_articles(db: Session = Depends(get_db)):
 async def add_article_image(
     article_id: int,
     image: ArticleImageCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Add an image to an article (admin only)."""
     # Check if article exists
-    article = db.query(Article).filter(Article.id == article_id).first()
+    article = await db.get(Article, article_id)
     if not article:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -255,32 +343,32 @@ async def add_article_image(
     # Create image record
     db_image = ArticleImage(article_id=article_id, **image.dict())
     db.add(db_image)
-    db.commit()
-    db.refresh(db_image)
-    
-    # Invalidate cache
-    await invalidate_pattern(CACHE_KEYS['articles'])
+    await db.commit()
+    await db.refresh(db_image)
     
     return db_image
 
 
 @router.get("/{article_id}/images", response_model=List[ArticleImageResponse])
+@cached_route("articles", List[ArticleImageResponse], key_params=("article_id",),
+              tables=("articles", "article_images"),
+              guard=article_index.guard("article_id", "Article not found"))
 async def get_article_images(
     article_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all images for an article."""
     # Check if article exists
-    article = db.query(Article).filter(Article.id == article_id).first()
+    article = await db.get(Article, article_id)
     if not article:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Article not found"
         )
     
-    images = db.query(ArticleImage).filter(
+    images = (await db.scalars(select(ArticleImage).where(
         ArticleImage.article_id == article_id
-    ).order_by(ArticleImage.order).all()
+    ).order_by(ArticleImage.order))).all()
     
     return images
 
@@ -290,14 +378,14 @@ async def update_article_image(
     article_id: int,
     image_id: int,
     image: ArticleImageUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an article image (admin only)."""
     # Check if image exists and belongs to article
-    db_image = db.query(ArticleImage).filter(
+    db_image = await db.scalar(select(ArticleImage).where(
         ArticleImage.id == image_id,
         ArticleImage.article_id == article_id
-    ).first()
+    ))
     
     if not db_image:
         raise HTTPException(
@@ -311,11 +399,8 @@ async def update_article_image(
         setattr(db_image, field, value)
     
     db.add(db_image)
-    db.commit()
-    db.refresh(db_image)
-    
-    # Invalidate cache
-    await invalidate_pattern(CACHE_KEYS['articles'])
+    await db.commit()
+    await db.refresh(db_image)
     
     return db_image
 
@@ -324,14 +409,14 @@ async def update_article_image(
 async def delete_article_image(
     article_id: int,
     image_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete an article image (admin only)."""
     # Check if image exists and belongs to article
-    db_image = db.query(ArticleImage).filter(
+    db_image = await db.scalar(select(ArticleImage).where(
         ArticleImage.id == image_id,
         ArticleImage.article_id == article_id
-    ).first()
+    ))
     
     if not db_image:
         raise HTTPException(
@@ -339,10 +424,7 @@ async def delete_article_image(
             detail="Image not found or does not belong to this article"
         )
     
-    db.delete(db_image)
-    db.commit()
-    
-    # Invalidate cache
-    await invalidate_pattern(CACHE_KEYS['articles'])
+    await db.delete(db_image)
+    await db.commit()
     
     return None
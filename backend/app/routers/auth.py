@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
 from app.database import get_db
@@ -17,13 +18,13 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Register a new admin user."""
     # Check if user exists
-    existing_user = db.query(User).filter(
+    existing_user = await db.scalar(select(User).where(
         (User.username == user_data.username) | (User.email == user_data.email)
-    ).first()
+    ))
     
     if existing_user:
         raise HTTPException(
@@ -32,7 +33,7 @@ async def register(
         )
     
     # Create new user (first user is admin)
-    is_first_user = db.query(User).count() == 0
+    is_first_user = await db.scalar(select(func.count()).select_from(User)) == 0
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -42,8 +43,8 @@ async def register(
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     # Create access token
     access_token = create_access_token(
@@ -60,10 +61,10 @@ async def register(
 @router.post("/login", response_model=TokenResponse)
 async def login(
     credentials: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Login with username and password."""
-    user = db.query(User).filter(User.username == credentials.username).first()
+    user = await db.scalar(select(User).where(User.username == credentials.username))
     
     if not user or not verify_password(credentials.password, user.hashed_password):
         raise HTTPException(
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import os
 import shutil
@@ -11,47 +12,39 @@ from app.schemas.schemas import (
     CertificateCreate, CertificateUpdate, CertificateResponse
 )
 from app.core.security import require_admin
-from app.cache import (
-    get_cached, set_cache, delete_cache, invalidate_pattern,
-    CACHE_KEYS, CACHE_TTL
-)
+from app.response_cache import cached_route
+from app.pagination import Keyset, cached_count
 
 router = APIRouter(prefix="/certificates", tags=["Certificates"])
 
+CERTIFICATE_KEYSET = Keyset(Certificate.created_at.desc(), Certificate.id.desc())
+
 UPLOAD_DIR = "/home/unique/projects/geobiro/backend/uploads/certificates"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
 @router.get("", response_model=List[CertificateResponse])
+@cached_route("certificates", List[CertificateResponse], key_params=("cursor", "limit"), tables=("certificates",),
+              warm=({},))
 async def get_certificates(
-    db: Session = Depends(get_db)
+    cursor: str = Query(None, description="X-Next-Cursor header of the previous page"),
+    limit: int = Query(None, ge=1, le=100, description="Page size (default: all)"),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all certificates."""
-    # Try to get from cache
-    cache_key = CACHE_KEYS['certificates']
-    cached_data = await get_cached(cache_key)
-    if cached_data:
-        return cached_data
-    
-    certificates = db.query(Certificate).order_by(Certificate.created_at.desc()).all()
-    
-    # Cache result
-    await set_cache(
-        cache_key,
-        [CertificateResponse.from_orm(c).dict() for c in certificates],
-        ttl=CACHE_TTL['certificates']
-    )
-    
-    return certificates
+    """Get certificates with cursor pagination."""
+    stmt = CERTIFICATE_KEYSET.apply(select(Certificate), cursor, limit)
+    total = await cached_count(db, Certificate)
+    return CERTIFICATE_KEYSET.page((await db.scalars(stmt)).all(), limit, total)
 
 
 @router.get("/{cert_id}", response_model=CertificateResponse)
+@cached_route("certificates", CertificateResponse, key_params=("cert_id",), tables=("certificates",))
 async def get_certificate(
     cert_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific certificate."""
-    certificate = db.query(Certificate).filter(Certificate.id == cert_id).first()
+    certificate = await db.get(Certificate, cert_id)
     if not certificate:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -63,17 +56,14 @@ async def get_certificate(
 @router.post("", response_model=CertificateResponse, status_code=status.HTTP_201_CREATED)
 async def create_certificate(
     cert_data: CertificateCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Create a new certificate (admin only)."""
     new_cert = Certificate(**cert_data.dict())
     db.add(new_cert)
-    db.commit()
-    db.refresh(new_cert)
-    
-    # Invalidate cache
-    await delete_cache(CACHE_KEYS['certificates'])
+    await db.commit()
+    await db.refresh(new_cert)
     
     return new_cert
 
@@ -82,11 +72,11 @@ async def create_certificate(
 async def upload_certificate_image(
     cert_id: int,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Upload image for certificate."""
-    certificate = db.query(Certificate).filter(Certificate.id == cert_id).first()
+    certificate = await db.get(Certificate, cert_id)
     if not certificate:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -113,11 +103,8 @@ async def upload_certificate_image(
     # Update certificate with image URL
     image_url = f"/uploads/certificates/{filename}"
     certificate.image_url = image_url
-    db.commit()
-    db.refresh(certificate)
-    
-    # Invalidate cache
-    await delete_cache(CACHE_KEYS['certificates'])
+    await db.commit()
+    await db.refresh(certificate)
     
     return {
         "success": True,
@@ -130,11 +117,11 @@ async def upload_certificate_image(
 async def update_certificate(
     cert_id: int,
     cert_data: CertificateUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Update a certificate (admin only)."""
-    certificate = db.query(Certificate).filter(Certificate.id == cert_id).first()
+    certificate = await db.get(Certificate, cert_id)
     if not certificate:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -145,11 +132,8 @@ async def update_certificate(
     for field, value in update_data.items():
         setattr(certificate, field, value)
     
-    db.commit()
-    db.refresh(certificate)
-    
-    # Invalidate cache
-    await delete_cache(CACHE_KEYS['certificates'])
+    await db.commit()
+    await db.refresh(certificate)
     
     return certificate
 
@@ -157,19 +141,16 @@ async def update_certificate(
 @router.delete("/{cert_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_certificate(
     cert_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Delete a certificate (admin only)."""
-    certificate = db.query(Certificate).filter(Certificate.id == cert_id).first()
+    certificate = await db.get(Certificate, cert_id)
     if not certificate:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Certificate not found"
         )
     
-    db.delete(certificate)
-    db.commit()
-    
-    # Invalidate cache
-    await delete_cache(CACHE_KEYS['certificates'])
+    await db.delete(certificate)
+    await db.commit()
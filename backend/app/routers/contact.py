@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.database import get_db
@@ -12,13 +13,13 @@ from app.schemas.schemas import (
 )
 from app.core.security import require_admin
 from app.services.email_service import send_contact_notification, send_contact_confirmation
-from app.cache import (
-    get_cached, set_cache, delete_cache,
-    CACHE_KEYS, CACHE_TTL
-)
+from app.response_cache import cached_route
+from app.pagination import Keyset, cached_count
 
 router = APIRouter(tags=["Contact & Company"])
 
+SUBMISSION_KEYSET = Keyset(ContactSubmission.submitted_at.desc(), ContactSubmission.id.desc())
+
 
 # ============ Contact Form Endpoints ============
 
@@ -26,7 +27,7 @@ router = APIRouter(tags=["Contact & Company"])
 async def submit_contact_form(
     contact_data: ContactSubmissionCreate,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Submit a contact form (public endpoint)."""
     # Get client IP and user agent
@@ -45,8 +46,8 @@ async def submit_contact_form(
     )
     
     db.add(submission)
-    db.commit()
-    db.refresh(submission)
+    await db.commit()
+    await db.refresh(submission)
     
     # Send emails asynchronously
     try:
@@ -69,35 +70,32 @@ async def submit_contact_form(
 
 @router.get("/admin/contact-submissions", response_model=List[ContactSubmissionDetail])
 async def get_contact_submissions(
+    response: Response,
     status_filter: str = None,
-    limit: int = 50,
-    offset: int = 0,
-    db: Session = Depends(get_db),
+    limit: int = Query(50, ge=1, le=100),
+    offset: int = Query(0, ge=0, description="Deprecated: pass cursor instead"),
+    cursor: str = Query(None, description="X-Next-Cursor header of the previous page"),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
-    """Get all contact submissions (admin only)."""
-    query = db.query(ContactSubmission)
-    
-    if status_filter:
-        query = query.filter(ContactSubmission.status == status_filter)
+    """Get contact submissions with cursor pagination (admin only)."""
+    criteria = [ContactSubmission.status == status_filter] if status_filter else []
+    query = SUBMISSION_KEYSET.apply(select(ContactSubmission).where(*criteria), cursor, limit)
+    if offset and not cursor:
+        query = query.offset(offset)
     
-    submissions = query.order_by(
-        ContactSubmission.submitted_at.desc()
-    ).offset(offset).limit(limit).all()
-    
-    return submissions
+    total = await cached_count(db, ContactSubmission, criteria, status=status_filter)
+    return SUBMISSION_KEYSET.page((await db.scalars(query)).all(), limit, total).respond(response)
 
 
 @router.get("/admin/contact-submissions/{submission_id}", response_model=ContactSubmissionDetail)
 async def get_contact_submission(
     submission_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Get a specific contact submission (admin only)."""
-    submission = db.query(ContactSubmission).filter(
-        ContactSubmission.id == submission_id
-    ).first()
+    submission = await db.get(ContactSubmission, submission_id)
     
     if not submission:
         raise HTTPException(
@@ -108,7 +106,7 @@ async def get_contact_submission(
     # Mark as read if status is new
     if submission.status == "new":
         submission.status = "read"
-        db.commit()
+        await db.commit()
     
     return submission
 
@@ -117,13 +115,11 @@ async def get_contact_submission(
 async def update_submission_status(
     submission_id: int,
     status_update: ContactSubmissionStatusUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Update contact submission status (admin only)."""
-    submission = db.query(ContactSubmission).filter(
-        ContactSubmission.id == submission_id
-    ).first()
+    submission = await db.get(ContactSubmission, submission_id)
     
     if not submission:
         raise HTTPException(
@@ -132,8 +128,8 @@ async def update_submission_status(
         )
     
     submission.status = status_update.status
-    db.commit()
-    db.refresh(submission)
+    await db.commit()
+    await db.refresh(submission)
     
     return {"success": True, "submission": ContactSubmissionDetail.from_orm(submission)}
 
@@ -141,13 +137,11 @@ async def update_submission_status(
 @router.delete("/admin/contact-submissions/{submission_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_contact_submission(
     submission_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Delete a contact submission (admin only)."""
-    submission = db.query(ContactSubmission).filter(
-        ContactSubmission.id == submission_id
-    ).first()
+    submission = await db.get(ContactSubmission, submission_id)
     
     if not submission:
         raise HTTPException(
@@ -155,48 +149,36 @@ async def delete_contact_submission(
             detail="Contact submission not found"
         )
     
-    db.delete(submission)
-    db.commit()
+    await db.delete(submission)
+    await db.commit()
 
 
 # ============ Company Info Endpoints ============
 
 @router.get("/company-info", response_model=CompanyInfoResponse)
+@cached_route("company_info", CompanyInfoResponse, tables=("company_info",), warm=({},))
 async def get_company_info(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get company information."""
-    # Try to get from cache
-    cache_key = CACHE_KEYS['company_info']
-    cached_data = await get_cached(cache_key)
-    if cached_data:
-        return cached_data
-    
-    company = db.query(CompanyInfo).first()
+    company = await db.scalar(select(CompanyInfo).limit(1))
     if not company:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Company info not configured"
         )
     
-    # Cache result
-    await set_cache(
-        cache_key,
-        CompanyInfoResponse.from_orm(company).dict(),
-        ttl=CACHE_TTL['company_info']
-    )
-    
     return company
 
 
 @router.put("/admin/company-info", response_model=CompanyInfoResponse)
 async def update_company_info(
     company_data: CompanyInfoUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Update company information (admin only)."""
-    company = db.query(CompanyInfo).first()
+    company = await db.scalar(select(CompanyInfo).limit(1))
     
     if not company:
         # Create if doesn't exist
@@ -207,11 +189,8 @@ async def update_company_info(
     for field, value in update_data.items():
         setattr(company, field, value)
     
-    db.commit()
-    db.refresh(company)
-    
-    # Invalidate cache
-    await delete_cache(CACHE_KEYS['company_info'])
+    await db.commit()
+    await db.refresh(company)
     
     return company
 
@@ -219,17 +198,12 @@ async def update_company_info(
 # ============ Statistics Endpoints ============
 
 @router.get("/statistics", response_model=StatisticsResponse)
+@cached_route("statistics", StatisticsResponse, tables=("statistics",), warm=({},))
 async def get_statistics(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get statistics."""
-    # Try to get from cache
-    cache_key = CACHE_KEYS['statistics']
-    cached_data = await get_cached(cache_key)
-    if cached_data:
-        return cached_data
-    
-    stats = db.query(Statistics).first()
+    stats = await db.scalar(select(Statistics).limit(1))
     if not stats:
         # Create default stats if don't exist
         stats = Statistics(
@@ -239,15 +213,8 @@ async def get_statistics(
             satisfied_clients=100
         )
         db.add(stats)
-        db.commit()
-        db.refresh(stats)
-    
-    # Cache result
-    await set_cache(
-        cache_key,
-        StatisticsResponse.from_orm(stats).dict(),
-        ttl=CACHE_TTL['statistics']
-    )
+        await db.commit()
+        await db.refresh(stats)
     
     return stats
 
@@ -255,11 +222,11 @@ async def get_statistics(
 @router.put("/admin/statistics", response_model=StatisticsResponse)
 async def update_statistics(
     stats_data: StatisticsUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Update statistics (admin only)."""
-    stats = db.query(Statistics).first()
+    stats = await db.scalar(select(Statistics).limit(1))
     
     if not stats:
         stats = Statistics()
@@ -269,10 +236,7 @@ async def update_statistics(
     for field, value in update_data.items():
         setattr(stats, field, value)
     
-    db.commit()
-    db.refresh(stats)
-    
-    # Invalidate cache
-    await delete_cache(CACHE_KEYS['statistics'])
+    await db.commit()
+    await db.refresh(stats)
     
     return stats
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from app.core.security import require_admin
+from app.loop_monitor import LoopMonitor
+
+router = APIRouter(prefix="/admin/diagnostics", tags=["Diagnostics"], dependencies=[Depends(require_admin)])
+
+
+def _loop_monitor(request: Request) -> LoopMonitor:
+    monitor = getattr(request.app.state, "loop_monitor", None)
+    if monitor is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event-loop monitor is disabled (set LOOP_MONITOR_ENABLED=True)"
+        )
+    return monitor
+
+
+@router.get("/loop-lag")
+async def get_loop_lag(request: Request):
+    """Event-loop lag and stalls per route, with recent stacks (admin only)."""
+    return _loop_monitor(request).stats()
+
+
+@router.delete("/loop-lag", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_loop_lag(request: Request):
+    """Clear the collected loop-lag statistics (admin only)."""
+    _loop_monitor(request).reset()
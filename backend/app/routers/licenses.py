@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import os
 import shutil
@@ -11,47 +12,39 @@ from app.schemas.schemas import (
     LicenseCreate, LicenseUpdate, LicenseResponse
 )
 from app.core.security import require_admin
-from app.cache import (
-    get_cached, set_cache, delete_cache,
-    CACHE_KEYS, CACHE_TTL
-)
+from app.response_cache import cached_route
+from app.pagination import Keyset, cached_count
 
 router = APIRouter(prefix="/licenses", tags=["Licenses"])
 
+LICENSE_KEYSET = Keyset(License.created_at.desc(), License.id.desc())
+
 UPLOAD_DIR = "/home/unique/projects/geobiro/backend/uploads/licenses"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
 @router.get("", response_model=List[LicenseResponse])
+@cached_route("licenses", List[LicenseResponse], key_params=("cursor", "limit"), tables=("licenses",),
+              warm=({},))
 async def get_licenses(
-    db: Session = Depends(get_db)
+    cursor: str = Query(None, description="X-Next-Cursor header of the previous page"),
+    limit: int = Query(None, ge=1, le=100, description="Page size (default: all)"),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all licenses."""
-    # Try to get from cache
-    cache_key = CACHE_KEYS['licenses']
-    cached_data = await get_cached(cache_key)
-    if cached_data:
-        return cached_data
-    
-    licenses = db.query(License).order_by(License.created_at.desc()).all()
-    
-    # Cache result
-    await set_cache(
-        cache_key,
-        [LicenseResponse.from_orm(l).dict() for l in licenses],
-        ttl=CACHE_TTL['licenses']
-    )
-    
-    return licenses
+    """Get licenses with cursor pagination."""
+    stmt = LICENSE_KEYSET.apply(select(License), cursor, limit)
+    total = await cached_count(db, License)
+    return LICENSE_KEYSET.page((await db.scalars(stmt)).all(), limit, total)
 
 
 @router.get("/{license_id}", response_model=LicenseResponse)
+@cached_route("licenses", LicenseResponse, key_params=("license_id",), tables=("licenses",))
 async def get_license(
     license_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific license."""
-    license = db.query(License).filter(License.id == license_id).first()
+    license = await db.get(License, license_id)
     if not license:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -63,17 +56,14 @@ async def get_license(
 @router.post("", response_model=LicenseResponse, status_code=status.HTTP_201_CREATED)
 async def create_license(
     license_data: LicenseCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Create a new license (admin only)."""
     new_license = License(**license_data.dict())
     db.add(new_license)
-    db.commit()
-    db.refresh(new_license)
-    
-    # Invalidate cache
-    await delete_cache(CACHE_KEYS['licenses'])
+    await db.commit()
+    await db.refresh(new_license)
     
     return new_license
 
@@ -82,11 +72,11 @@ async def create_license(
 async def upload_license_image(
     license_id: int,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Upload image for license."""
-    license = db.query(License).filter(License.id == license_id).first()
+    license = await db.get(License, license_id)
     if not license:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -113,11 +103,8 @@ async def upload_license_image(
     # Update license with image URL
     image_url = f"/uploads/licenses/{filename}"
     license.image_url = image_url
-    db.commit()
-    db.refresh(license)
-    
-    # Invalidate cache
-    await delete_cache(CACHE_KEYS['licenses'])
+    await db.commit()
+    await db.refresh(license)
     
     return {
         "success": True,
@@ -130,11 +117,11 @@ async def upload_license_image(
 async def update_license(
     license_id: int,
     license_data: LicenseUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Update a license (admin only)."""
-    license = db.query(License).filter(License.id == license_id).first()
+    license = await db.get(License, license_id)
     if not license:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -145,11 +132,8 @@ async def update_license(
     for field, value in update_data.items():
         setattr(license, field, value)
     
-    db.commit()
-    db.refresh(license)
-    
-    # Invalidate cache
-    await delete_cache(CACHE_KEYS['licenses'])
+    await db.commit()
+    await db.refresh(license)
     
     return license
 
@@ -157,19 +141,16 @@ async def update_license(
 @router.delete("/{license_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_license(
     license_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Delete a license (admin only)."""
-    license = db.query(License).filter(License.id == license_id).first()
+    license = await db.get(License, license_id)
     if not license:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="License not found"
         )
     
-    db.delete(license)
-    db.commit()
-    
-    # Invalidate cache
-    await delete_cache(CACHE_KEYS['licenses'])
+    await db.delete(license)
+    await db.commit()
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, HTTPException, Request, status
+from pathlib import Path
+
+from app.static_files import IMMUTABLE, REVALIDATE, safe_join, serve_file
+
+router = APIRouter(prefix="/media", tags=["Media"])
+
+# HLS renditions written by transcode_hls.py: <name>/master.m3u8 plus
+# <name>/v<hash>/<height>p/{index.m3u8,seg_0000.ts}
+HLS_DIR = Path(__file__).parent.parent.parent / "media" / "hls"
+
+HLS_MEDIA_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+    ".m4s": "video/iso.segment",
+    ".mp4": "video/mp4",
+}
+
+
+@router.get("/hls/{name}/{path:path}")
+async def get_hls_file(request: Request, name: str, path: str):
+    """Serve an HLS master playlist, rendition playlist or segment."""
+    full_path = safe_join(str(HLS_DIR), f"{name}/{path}")
+    media_type = HLS_MEDIA_TYPES.get(Path(path).suffix.lower())
+    file_cache = request.app.state.file_cache
+    stat_result = file_cache.stat(full_path) if full_path and media_type else None
+    if stat_result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+
+    # master.m3u8 is replaced by every transcode; files under a version
+    # directory are named after the source's hash and never change
+    cache_control = REVALIDATE if path == "master.m3u8" else IMMUTABLE
+    return await serve_file(request, full_path, stat_result, file_cache, media_type,
+                            {"Cache-Control": cache_control})
@@ -1,99 +1,61 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Union
 
 from app.database import get_db
 from app.models.models import Project
-from app.schemas.schemas import ProjectCreate, ProjectUpdate, ProjectResponse
+from app.schemas.schemas import ProjectCreate, ProjectUpdate, ProjectResponse, ProjectCard
 from app.core.security import require_admin
-from app.cache import (
-    get_cached, set_cache, delete_cache, invalidate_pattern,
-    CACHE_KEYS, CACHE_TTL
-)
+from app.response_cache import cached_route
+from app.existence import ExistenceIndex
+from app.read_models import PROJECT_FIELDS, project_rows
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
+project_index = ExistenceIndex("projects", Project.id)
 
-@router.get("", response_model=List[ProjectResponse])
+
+@router.get("", response_model=Union[List[ProjectResponse], List[ProjectCard]])
+@cached_route("projects", List[ProjectResponse], key_params=("category", "featured", "cursor", "limit"),
+              tables=("projects",), warm=({}, {"fields": "card"}),
+              fields={name: List[schema] for name, schema in PROJECT_FIELDS.items()})
 async def get_projects(
     category: str = Query(None, description="Filter by category"),
     featured: bool = Query(None, description="Filter by featured status"),
-    db: Session = Depends(get_db)
+    cursor: str = Query(None, description="X-Next-Cursor header of the previous page"),
+    limit: int = Query(None, ge=1, le=100, description="Page size (default: all)"),
+    fields: str = Query("full", pattern="^(card|full)$", description="card: list-card fields only"),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all projects with optional filtering."""
-    # Build cache key
-    cache_key_parts = [CACHE_KEYS['projects']]
-    if category:
-        cache_key_parts.append(f"category:{category}")
-    if featured is not None:
-        cache_key_parts.append(f"featured:{featured}")
-    
-    cache_key = ":".join(cache_key_parts) if len(cache_key_parts) > 1 else CACHE_KEYS['projects']
-    
-    # Try to get from cache
-    cached_data = await get_cached(cache_key)
-    if cached_data:
-        return cached_data
-    
-    # Query database
-    query = db.query(Project).order_by(Project.order, Project.created_at.desc())
-    
-    if category:
-        query = query.filter(Project.category == category)
-    if featured is not None:
-        query = query.filter(Project.is_featured == featured)
-    
-    projects = query.all()
-    
-    # Cache result
-    await set_cache(
-        cache_key,
-        [ProjectResponse.from_orm(p).dict() for p in projects],
-        ttl=CACHE_TTL['projects']
-    )
-    
-    return projects
+    """Get projects with optional filtering and cursor pagination."""
+    return await project_rows(db, category, featured, cursor, limit, fields)
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
+@cached_route("projects", ProjectResponse, key_params=("project_id",), tables=("projects",),
+              guard=project_index.guard("project_id", "Project not found"))
 async def get_project(
     project_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific project by ID."""
-    # Try cache
-    cache_key = f"{CACHE_KEYS['projects']}:{project_id}"
-    cached_data = await get_cached(cache_key)
-    if cached_data:
-        return cached_data
-    
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     
-    # Cache result
-    await set_cache(
-        cache_key,
-        ProjectResponse.from_orm(project).dict(),
-        ttl=CACHE_TTL['projects']
-    )
-    
     return project
 
 
 @router.post("", response_model=ProjectResponse, dependencies=[Depends(require_admin)])
 async def create_project(
     project: ProjectCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new project (admin only)."""
     db_project = Project(**project.dict())
     db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
-    
-    # Invalidate cache
-    await invalidate_pattern(CACHE_KEYS['projects'])
+    await db.commit()
+    await db.refresh(db_project)
     
     return db_project
 
@@ -102,10 +64,10 @@ async def create_project(
 async def update_project(
     project_id: int,
     project: ProjectUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a project (admin only)."""
-    db_project = db.query(Project).filter(Project.id == project_id).first()
+    db_project = await db.get(Project, project_id)
     if not db_project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     
@@ -114,11 +76,8 @@ async def update_project(
         setattr(db_project, field, value)
     
     db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
-    
-    # Invalidate cache
-    await invalidate_pattern(CACHE_KEYS['projects'])
+    await db.commit()
+    await db.refresh(db_project)
     
     return db_project
 
@@ -126,17 +85,14 @@ async def update_project(
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_admin)])
 async def delete_project(
     project_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a project (admin only)."""
-    db_project = db.query(Project).filter(Project.id == project_id).first()
+    db_project = await db.get(Project, project_id)
     if not db_project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
     
-    db.delete(db_project)
-    db.commit()
-    
-    # Invalidate cache
-    await invalidate_pattern(CACHE_KEYS['projects'])
+    await db.delete(db_project)
+    await db.commit()
     
     return None
@@ -1,57 +1,38 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.database import get_db
 from app.models.models import Service
 from app.schemas.schemas import ServiceCreate, ServiceUpdate, ServiceResponse
 from app.core.security import require_admin
+from app.response_cache import cached_route
+from app.read_models import service_rows
 
 router = APIRouter(prefix="/services", tags=["Services"])
 
 
 @router.get("", response_model=List[ServiceResponse])
+@cached_route("services", List[ServiceResponse], key_params=("category", "cursor", "limit"), tables=("services",),
+              warm=({}, {"category": "BIM"}, {"category": "Surveying"}))
 async def get_services(
     category: str = Query(None, description="Filter by category: BIM or Surveying"),
-    db: Session = Depends(get_db)
+    cursor: str = Query(None, description="X-Next-Cursor header of the previous page"),
+    limit: int = Query(None, ge=1, le=100, description="Page size (default: all)"),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all services with optional category filter."""
-    # Query database
-    query = db.query(Service)
-    if category:
-        query = query.filter(Service.category == category)
-    
-    services = query.order_by(Service.created_at.desc()).all()
-    
-    # Convert services to response format with proper field mapping
-    response_list = []
-    for s in services:
-        service_dict = {
-            'id': s.id,
-            'title': s.title,
-            'title_en': s.title_en or s.title,
-            'title_fa': s.title_fa,
-            'description': s.description,
-            'description_en': s.description_en or s.description,
-            'description_fa': s.description_fa,
-            'category': s.category,
-            'image_url': s.image_url,
-            'software_tools': s.software_tools,
-            'created_at': s.created_at,
-            'updated_at': s.updated_at,
-        }
-        response_list.append(service_dict)
-    
-    return response_list
+    """Get services with optional category filter and cursor pagination."""
+    return await service_rows(db, category, cursor, limit)
 
 
 @router.get("/{service_id}", response_model=ServiceResponse)
+@cached_route("services", ServiceResponse, key_params=("service_id",), tables=("services",))
 async def get_service(
     service_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific service by ID."""
-    service = db.query(Service).filter(Service.id == service_id).first()
+    service = await db.get(Service, service_id)
     if not service:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -80,7 +61,7 @@ async def get_service(
 @router.post("", response_model=ServiceResponse, status_code=status.HTTP_201_CREATED)
 async def create_service(
     service_data: ServiceCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Create a new service (admin only)."""
@@ -107,8 +88,8 @@ async def create_service(
     
     new_service = Service(**data)
     db.add(new_service)
-    db.commit()
-    db.refresh(new_service)
+    await db.commit()
+    await db.refresh(new_service)
     
     return new_service
 
@@ -117,11 +98,11 @@ async def create_service(
 async def update_service(
     service_id: int,
     service_data: ServiceUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Update a service (admin only)."""
-    service = db.query(Service).filter(Service.id == service_id).first()
+    service = await db.get(Service, service_id)
     if not service:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -132,8 +113,8 @@ async def update_service(
     for field, value in update_data.items():
         setattr(service, field, value)
     
-    db.commit()
-    db.refresh(service)
+    await db.commit()
+    await db.refresh(service)
     
     return service
 
@@ -141,16 +122,16 @@ async def update_service(
 @router.delete("/{service_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_service(
     service_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Delete a service (admin only)."""
-    service = db.query(Service).filter(Service.id == service_id).first()
+    service = await db.get(Service, service_id)
     if not service:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Service not found"
         )
     
-    db.delete(service)
-    db.commit()
+    await db.delete(service)
+    await db.commit()
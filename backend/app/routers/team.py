@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import os
 import shutil
@@ -11,10 +11,8 @@ from app.schemas.schemas import (
     TeamMemberCreate, TeamMemberUpdate, TeamMemberResponse
 )
 from app.core.security import require_admin
-from app.cache import (
-    get_cached, set_cache, delete_cache, invalidate_pattern,
-    CACHE_KEYS, CACHE_TTL
-)
+from app.response_cache import cached_route
+from app.read_models import team_member_rows
 
 router = APIRouter(prefix="/team", tags=["Team"])
 
@@ -23,71 +21,45 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
 @router.get("", response_model=List[TeamMemberResponse])
+@cached_route("team", List[TeamMemberResponse], key_params=("cursor", "limit"), tables=("team_members",),
+              warm=({},))
 async def get_team_members(
-    db: Session = Depends(get_db)
+    cursor: str = Query(None, description="X-Next-Cursor header of the previous page"),
+    limit: int = Query(None, ge=1, le=100, description="Page size (default: all)"),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all team members."""
-    # Try to get from cache
-    cache_key = CACHE_KEYS['team']
-    cached_data = await get_cached(cache_key)
-    if cached_data:
-        return cached_data
-    
-    members = db.query(TeamMember).order_by(TeamMember.created_at.desc()).all()
-    
-    # Cache result
-    await set_cache(
-        cache_key,
-        [TeamMemberResponse.from_orm(m).dict() for m in members],
-        ttl=CACHE_TTL['team']
-    )
-    
-    return members
+    """Get team members with cursor pagination."""
+    return await team_member_rows(db, cursor, limit)
 
 
 @router.get("/{member_id}", response_model=TeamMemberResponse)
+@cached_route("team", TeamMemberResponse, key_params=("member_id",), tables=("team_members",))
 async def get_team_member(
     member_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific team member."""
-    # Try to get from cache
-    cache_key = CACHE_KEYS['team_member'].format(id=member_id)
-    cached_data = await get_cached(cache_key)
-    if cached_data:
-        return cached_data
-    
-    member = db.query(TeamMember).filter(TeamMember.id == member_id).first()
+    member = await db.get(TeamMember, member_id)
     if not member:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Team member not found"
         )
     
-    # Cache result
-    await set_cache(
-        cache_key,
-        TeamMemberResponse.from_orm(member).dict(),
-        ttl=CACHE_TTL['team']
-    )
-    
     return member
 
 
 @router.post("", response_model=TeamMemberResponse, status_code=status.HTTP_201_CREATED)
 async def create_team_member(
     member_data: TeamMemberCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Create a new team member (admin only)."""
     new_member = TeamMember(**member_data.dict())
     db.add(new_member)
-    db.commit()
-    db.refresh(new_member)
-    
-    # Invalidate cache
-    await invalidate_pattern(CACHE_KEYS['team'] + "*")
+    await db.commit()
+    await db.refresh(new_member)
     
     return new_member
 
@@ -96,11 +68,11 @@ async def create_team_member(
 async def upload_team_member_image(
     member_id: int,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Upload image for team member."""
-    member = db.query(TeamMember).filter(TeamMember.id == member_id).first()
+    member = await db.get(TeamMember, member_id)
     if not member:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -127,13 +99,8 @@ async def upload_team_member_image(
     # Update member with image URL
     image_url = f"/uploads/team/{filename}"
     member.image_url = image_url
-    db.commit()
-    db.refresh(member)
-    
-    # Invalidate cache
-    await invalidate_pattern(CACHE_KEYS['team'] + "*")
-    cache_key = CACHE_KEYS['team_member'].format(id=member_id)
-    await delete_cache(cache_key)
+    await db.commit()
+    await db.refresh(member)
     
     return {
         "success": True,
@@ -146,11 +113,11 @@ async def upload_team_member_image(
 async def update_team_member(
     member_id: int,
     member_data: TeamMemberUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Update a team member (admin only)."""
-    member = db.query(TeamMember).filter(TeamMember.id == member_id).first()
+    member = await db.get(TeamMember, member_id)
     if not member:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -161,13 +128,8 @@ async def update_team_member(
     for field, value in update_data.items():
         setattr(member, field, value)
     
-    db.commit()
-    db.refresh(member)
-    
-    # Invalidate cache
-    await invalidate_pattern(CACHE_KEYS['team'] + "*")
-    cache_key = CACHE_KEYS['team_member'].format(id=member_id)
-    await delete_cache(cache_key)
+    await db.commit()
+    await db.refresh(member)
     
     return member
 
@@ -175,21 +137,16 @@ async def update_team_member(
 @router.delete("/{member_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_team_member(
     member_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin: object = Depends(require_admin)
 ):
     """Delete a team member (admin only)."""
-    member = db.query(TeamMember).filter(TeamMember.id == member_id).first()
+    member = await db.get(TeamMember, member_id)
     if not member:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Team member not found"
         )
     
-    db.delete(member)
-    db.commit()
-    
-    # Invalidate cache
-    await invalidate_pattern(CACHE_KEYS['team'] + "*")
-    cache_key = CACHE_KEYS['team_member'].format(id=member_id)
-    await delete_cache(cache_key)
+    await db.delete(member)
+    await db.commit()
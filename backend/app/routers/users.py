@@ -1,32 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.database import get_db
 from app.models.models import User
 from app.schemas.schemas import UserCreate, UserUpdate, UserResponse, PasswordChange
 from app.core.security import require_admin, hash_password, verify_password
+from app.pagination import Keyset, cached_count
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+USER_KEYSET = Keyset(User.created_at.desc(), User.id.desc())
+
 
 @router.get("", response_model=List[UserResponse], dependencies=[Depends(require_admin)])
-async def get_users(db: Session = Depends(get_db)):
-    """Get all users (admin only)."""
-    users = db.query(User).order_by(User.created_at.desc()).all()
-    return users
+async def get_users(
+    response: Response,
+    cursor: str = Query(None, description="X-Next-Cursor header of the previous page"),
+    limit: int = Query(None, ge=1, le=100, description="Page size (default: all)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get users with cursor pagination (admin only)."""
+    stmt = USER_KEYSET.apply(select(User), cursor, limit)
+    total = await cached_count(db, User)
+    return USER_KEYSET.page((await db.scalars(stmt)).all(), limit, total).respond(response)
 
 
 @router.post("", response_model=UserResponse, dependencies=[Depends(require_admin)])
 async def create_user(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new user (admin only)."""
     # Check if user exists
-    existing_user = db.query(User).filter(
+    existing_user = await db.scalar(select(User).where(
         (User.username == user_data.username) | (User.email == user_data.email)
-    ).first()
+    ))
 
     if existing_user:
         raise HTTPException(
@@ -44,8 +54,8 @@ async def create_user(
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return new_user
 
@@ -54,10 +64,10 @@ async def create_user(
 async def update_user(
     user_id: int,
     user_data: UserUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a user (admin only)."""
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = await db.get(User, user_id)
     if not db_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -65,10 +75,10 @@ async def update_user(
 
     # Check for duplicate username/email if being updated
     if 'username' in update_data and update_data['username'] != db_user.username:
-        existing = db.query(User).filter(
+        existing = await db.scalar(select(User).where(
             User.username == update_data['username'],
             User.id != user_id
-        ).first()
+        ))
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -76,10 +86,10 @@ async def update_user(
             )
 
     if 'email' in update_data and update_data['email'] != db_user.email:
-        existing = db.query(User).filter(
+        existing = await db.scalar(select(User).where(
             User.email == update_data['email'],
             User.id != user_id
-        ).first()
+        ))
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -90,8 +100,8 @@ async def update_user(
         setattr(db_user, field, value)
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     return db_user
 
@@ -99,15 +109,15 @@ async def update_user(
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_admin)])
 async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a user (admin only)."""
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = await db.get(User, user_id)
     if not db_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    db.delete(db_user)
-    db.commit()
+    await db.delete(db_user)
+    await db.commit()
 
     return None
 
@@ -116,10 +126,10 @@ async def delete_user(
 async def change_user_password(
     user_id: int,
     password_data: PasswordChange,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Change a user's password (admin only)."""
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = await db.get(User, user_id)
     if not db_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -133,7 +143,7 @@ async def change_user_password(
     # Update password
     db_user.hashed_password = hash_password(password_data.new_password)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     return db_user
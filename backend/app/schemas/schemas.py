@@ -401,6 +401,22 @@ class ProjectResponse(ProjectBase):
         from_attributes = True
 
 
+class ProjectCard(BaseModel):
+    """Project as shown on list cards (fields=card)."""
+    id: int
+    title_en: str
+    title_fa: Optional[str] = None
+    description_en: str
+    description_fa: Optional[str] = None
+    image_url: Optional[str] = None
+    archive_url: Optional[str] = None
+    category: Optional[str] = None
+    is_featured: bool = False
+    
+    class Config:
+        from_attributes = True
+
+
 # ============ Article Schemas ============
 
 class ArticleBase(BaseModel):
@@ -482,6 +498,45 @@ class ArticleResponse(ArticleBase):
         from_attributes = True
 
 
+class ArticleCard(BaseModel):
+    """Article as shown on list cards (fields=card): no content, no images."""
+    id: int
+    slug: str
+    title_en: str
+    title_fa: Optional[str] = None
+    summary_en: str
+    summary_fa: Optional[str] = None
+    image_url: Optional[str] = None
+    tags: Optional[str] = None
+    category: Optional[str] = None
+    publish_date: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class TagCount(BaseModel):
+    name: str
+    count: int
+
+
+class ArticleSearchResult(BaseModel):
+    """Search hit; highlights and snippet are HTML-escaped with matches in <mark>."""
+    id: int
+    slug: str
+    title_en: str
+    title_fa: Optional[str] = None
+    summary_en: Optional[str] = None
+    summary_fa: Optional[str] = None
+    image_url: Optional[str] = None
+    category: Optional[str] = None
+    publish_date: datetime
+    title_en_highlight: Optional[str] = None
+    title_fa_highlight: Optional[str] = None
+    snippet: Optional[str] = None
+    rank: float
+
+
 # ============ Article Image Schemas ============
 
 class ArticleImageBase(BaseModel):
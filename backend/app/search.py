@@ -0,0 +1,262 @@
+"""
+Full-text article search (SQLite FTS5).
+
+articles_fts is an FTS5 table keyed by article id holding normalized
+copies of the bilingual title, summary and content (HTML stripped) of
+published articles. It is kept in step with the articles table by an ORM event, inside the same
+transaction as the article write, and (re)built at startup when its row
+count drifts (e.g. after scripts wrote articles through a bare engine).
+
+Text goes through normalize() both when indexed and when queried, so
+Arabic and Persian spellings meet: Arabic ye/kaf become Persian ye/kaf,
+hamza-carrying alefs become plain alef, ZWNJ and tatweel are dropped and
+diacritics are removed. unicode61 then tokenizes and case-folds.
+
+Results are ranked with bm25 (titles weigh most, then summaries) and come
+with highlighted titles and a content snippet. On databases without FTS5
+(Postgres) search falls back to unranked LIKE matching.
+"""
+import html
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Connection, bindparam, event, func, inspect, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.models import Article
+
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "articles_fts"
+FTS_COLUMNS = ("title_en", "title_fa", "summary_en", "summary_fa", "content_en", "content_fa")
+# bm25 weights, in FTS_COLUMNS order
+FTS_WEIGHTS = (10.0, 10.0, 4.0, 4.0, 1.0, 1.0)
+
+# Highlight markers: control characters cannot come from article text, so the
+# highlighted text is HTML-escaped first and the markers turned into <mark> after
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+_CHAR_MAP = str.maketrans({
+    "ي": "ی",  # Arabic ye -> Persian ye
+    "ى": "ی",  # alef maksura -> Persian ye
+    "ك": "ک",  # Arabic kaf -> Persian kaf
+    "أ": "ا",  # alef with hamza above -> alef
+    "إ": "ا",  # alef with hamza below -> alef
+    "ٱ": "ا",  # alef wasla -> alef
+    "ة": "ه",  # teh marbuta -> heh
+    "\u200c": None,  # ZWNJ: "می‌خواهم" and "میخواهم" index alike
+    "\u200d": None,  # ZWJ
+    "\u0640": None,  # tatweel
+})
+_DIACRITICS = re.compile("[\u064b-\u065f\u0670\u06d6-\u06ed]")
+_TAGS = re.compile(r"<[^>]+>")
+_TERMS = re.compile(r"\w+")
+
+# The page is ranked inside FTS5 first; highlight() and snippet() then run
+# for that page only instead of for every match
+_RANK_SQL = text(f"""
+    SELECT rowid, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match
+    ORDER BY rank LIMIT :limit OFFSET :offset
+""")
+_PAGE_SQL = text(f"""
+    SELECT a.id, a.slug, a.title_en, a.title_fa, a.summary_en, a.summary_fa,
+           a.image_url, a.category, a.publish_date,
+           highlight({FTS_TABLE}, 0, :start, :end) AS title_en_highlight,
+           highlight({FTS_TABLE}, 1, :start, :end) AS title_fa_highlight,
+           snippet({FTS_TABLE}, -1, :start, :end, '…', 24) AS snippet
+    FROM {FTS_TABLE}
+    JOIN articles a ON a.id = {FTS_TABLE}.rowid
+    WHERE {FTS_TABLE} MATCH :match AND {FTS_TABLE}.rowid IN :ids
+""").bindparams(bindparam("ids", expanding=True))
+_COUNT_SQL = text(f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match")
+
+
+def normalize(value: Optional[str]) -> str:
+    """Search form of text: Persian/Arabic letters unified, ZWNJ/tatweel/diacritics removed."""
+    if not value:
+        return ""
+    return _DIACRITICS.sub("", value.translate(_CHAR_MAP))
+
+
+def strip_html(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    return " ".join(html.unescape(_TAGS.sub(" ", value)).split())
+
+
+def document(article: Any) -> Dict[str, str]:
+    """FTS column values for an article (ORM object or row)."""
+    return {
+        column: normalize(strip_html(getattr(article, column)) if column.startswith("content") else getattr(article, column))
+        for column in FTS_COLUMNS
+    }
+
+
+def canonical_query(query: str) -> str:
+    """
+    Query reduced to what matching depends on: normalized, case-folded terms.
+
+    Spellings that search alike share one form (and so one cache entry).
+    """
+    return " ".join(_TERMS.findall(normalize(query).casefold()))
+
+
+def match_expression(query: str) -> Optional[str]:
+    """FTS5 MATCH expression for user input: every term required, the last one as a prefix."""
+    terms = _TERMS.findall(normalize(query))
+    if not terms:
+        return None
+    quoted = ['"' + term.replace('"', '""') + '"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def render_highlight(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    return html.escape(value, quote=False).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+# ---------------------------------------------------------------- index upkeep
+
+# Databases known to have the FTS table; sync and async engines on the same
+# file share an entry (see ensure_search_index)
+_indexed_databases = set()
+
+
+def _database(conn: Connection):
+    return conn.dialect.name, conn.engine.url.database
+
+
+def ensure_search_index(conn: Connection):
+    """Create articles_fts if needed and rebuild it when it is out of step with articles."""
+    if conn.dialect.name != "sqlite":
+        return
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).scalar()
+    if not exists:
+        columns = ", ".join(FTS_COLUMNS)
+        conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({columns}, "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"  # prefix indexes for search-as-you-type
+        )
+        # Persistent default for the rank column, so ORDER BY rank is bm25 with our weights
+        conn.exec_driver_sql(
+            f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rank) VALUES ('rank', ?)",
+            (f"bm25({', '.join(map(str, FTS_WEIGHTS))})",),
+        )
+    _indexed_databases.add(_database(conn))
+
+    indexed = conn.exec_driver_sql(f"SELECT count(*) FROM {FTS_TABLE}").scalar()
+    published = conn.execute(select(func.count()).select_from(Article).where(Article.is_published == True)).scalar()
+    if indexed != published:
+        rebuild_search_index(conn)
+
+
+def rebuild_search_index(conn: Connection):
+    conn.exec_driver_sql(f"DELETE FROM {FTS_TABLE}")
+    rows = conn.execute(
+        select(Article.id, *(getattr(Article, c) for c in FTS_COLUMNS)).where(Article.is_published == True)
+    ).all()
+    _write(conn, [(row.id, document(row)) for row in rows])
+    logger.info(f"✓ Search index rebuilt: {len(rows)} articles")
+
+
+def _write(conn: Connection, documents: List[Tuple[int, Dict[str, str]]]):
+    if not documents:
+        return
+    columns = ", ".join(FTS_COLUMNS)
+    placeholders = ", ".join(f":{c}" for c in FTS_COLUMNS)
+    conn.execute(
+        text(f"INSERT INTO {FTS_TABLE} (rowid, {columns}) VALUES (:rowid, {placeholders})"),
+        [{"rowid": rowid, **doc} for rowid, doc in documents],
+    )
+
+
+def _delete(conn: Connection, ids: List[int]):
+    if ids:
+        conn.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :rowid"), [{"rowid": i} for i in ids])
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_search_index(session, flush_context):
+    changed, removed = [], []
+    for obj in session.new:
+        if isinstance(obj, Article):
+            changed.append(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Article) and _indexed_fields_changed(obj):
+            changed.append(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Article):
+            removed.append(obj.id)
+    if not (changed or removed):
+        return
+
+    conn = session.connection()
+    if _database(conn) not in _indexed_databases:
+        return  # no index on this database (yet); ensure_search_index catches up at startup
+    _delete(conn, removed + [a.id for a in changed])
+    _write(conn, [(a.id, document(a)) for a in changed if a.is_published])
+
+
+def _indexed_fields_changed(article: Article) -> bool:
+    state = inspect(article)
+    return any(state.attrs[column].history.has_changes() for column in FTS_COLUMNS + ("is_published",))
+
+
+# ---------------------------------------------------------------- queries
+
+async def search_articles(db: AsyncSession, query: str, limit: int, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+    """Published articles matching query, best first, and the total number of matches."""
+    if db.bind.dialect.name != "sqlite":
+        return await _search_like(db, query, limit, offset)
+
+    match = match_expression(query)
+    if match is None:
+        return [], 0
+    total = (await db.execute(_COUNT_SQL, {"match": match})).scalar()
+    ranks = dict((await db.execute(_RANK_SQL, {"match": match, "limit": limit, "offset": offset})).all())
+    if not ranks:
+        return [], total
+    rows = (await db.execute(_PAGE_SQL, {
+        "match": match, "ids": list(ranks), "start": _MARK_START, "end": _MARK_END,
+    })).mappings().all()
+
+    results = []
+    for row in rows:
+        result = dict(row, rank=ranks[row["id"]])
+        for name in ("title_en_highlight", "title_fa_highlight", "snippet"):
+            result[name] = render_highlight(result[name])
+        results.append(result)
+    results.sort(key=lambda result: result["rank"])
+    return results, total
+
+
+async def _search_like(db: AsyncSession, query: str, limit: int, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+    """Unranked fallback: every term must appear in a title, summary or content column."""
+    terms = _TERMS.findall(query)
+    if not terms:
+        return [], 0
+    criteria = [Article.is_published == True]
+    for term in terms:
+        pattern = f"%{term}%"
+        criteria.append(or_(*(getattr(Article, c).ilike(pattern) for c in FTS_COLUMNS)))
+
+    total = await db.scalar(select(func.count()).select_from(Article).where(*criteria))
+    articles = (await db.scalars(
+        select(Article).where(*criteria).order_by(Article.publish_date.desc()).limit(limit).offset(offset)
+    )).all()
+    return [
+        {
+            "id": a.id, "slug": a.slug, "title_en": a.title_en, "title_fa": a.title_fa,
+            "summary_en": a.summary_en, "summary_fa": a.summary_fa, "image_url": a.image_url,
+            "category": a.category, "publish_date": a.publish_date,
+            "title_en_highlight": None, "title_fa_highlight": None, "snippet": None, "rank": 0.0,
+        }
+        for a in articles
+    ], total
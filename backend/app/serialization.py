@@ -0,0 +1,50 @@
+"""
+Fast JSON serialization.
+
+ORJSONResponse is the application's default response class, so responses
+that FastAPI validates against a response_model are encoded by orjson
+instead of json.dumps.
+
+Cached routes skip FastAPI's encoding entirely: render() validates ORM
+objects (or rows, or dicts) with a precompiled pydantic TypeAdapter and
+dumps them straight to JSON bytes in pydantic-core.
+"""
+from functools import lru_cache
+from typing import Any, List
+
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.schemas.schemas import (
+    ArticleCard, ArticleImageResponse, ArticleResponse, CertificateResponse, CompanyInfoResponse,
+    LicenseResponse, ProjectCard, ProjectResponse, ServiceResponse, StatisticsResponse, TeamMemberResponse,
+)
+
+
+__all__ = ["ORJSONResponse", "serializer", "render"]
+
+# Schemas of the public routes, compiled at import rather than on the first request
+PUBLIC_SCHEMAS = (
+    ArticleCard, ArticleResponse, ArticleImageResponse, CertificateResponse, LicenseResponse,
+    ProjectCard, ProjectResponse, ServiceResponse, TeamMemberResponse,
+)
+PUBLIC_SINGLETONS = (CompanyInfoResponse, StatisticsResponse)
+
+
+@lru_cache(maxsize=None)
+def serializer(schema) -> TypeAdapter:
+    """TypeAdapter for a schema or typing construct (e.g. List[ProjectResponse]), built once."""
+    return TypeAdapter(schema)
+
+
+def render(schema, data: Any) -> bytes:
+    """Validate data (ORM objects, rows or dicts) against schema and encode it as JSON bytes."""
+    adapter = serializer(schema)
+    return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+
+for _schema in PUBLIC_SCHEMAS:
+    serializer(_schema)
+    serializer(List[_schema])
+for _schema in PUBLIC_SINGLETONS:
+    serializer(_schema)
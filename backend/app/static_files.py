@@ -0,0 +1,508 @@
+"""
+Static file serving with precompressed variants and cache headers.
+
+Compressible files (JS, CSS, HTML, SVG, ...) get .br and .gz siblings,
+written once by precompress_directory at build time
+(``python -m app.static_files static``) or at startup. Responses pick the
+best variant for the request's Accept-Encoding, so nothing is compressed
+per request.
+
+The directory is indexed once (StaticIndex), so serving a file costs a
+dict lookup rather than filesystem probes, and index.html is held in
+memory. With STATIC_WATCH the index is rebuilt when files change.
+Uploads (UploadFiles) use a stat cache revalidated every few seconds
+instead. Small files of both are served from a bounded in-memory cache
+(FileCache), large ones through sendfile where the server supports it.
+
+Fingerprinted Vite bundles (assets/name-[hash].js) are cached by browsers
+forever; everything else, index.html included, is revalidated with its ETag
+on every use.
+"""
+import asyncio
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+import sys
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+from stat import S_ISREG
+from typing import Dict, Optional, Tuple
+
+import anyio
+from fastapi import Request
+from fastapi.responses import FileResponse, PlainTextResponse, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.response_cache import etag_matches, negotiate_encoding
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+try:
+    from watchfiles import awatch
+except ImportError:  # only needed for STATIC_WATCH
+    awatch = None
+
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_EXTENSIONS = {
+    ".js", ".mjs", ".css", ".html", ".svg", ".json", ".map", ".txt", ".xml",
+    ".webmanifest", ".ico", ".wasm", ".ttf", ".otf", ".eot",
+}
+# Files smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+# Suffix of the precompressed sibling for each content-coding, best first
+ENCODED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# Vite names bundles [name]-[hash].[ext] with an 8 character base64url hash.
+# A hash has an uppercase letter, digit, "_" or "-" in it (all but ~0.1% do),
+# which keeps plain names like hero-backdrop.png out: they must revalidate
+FINGERPRINTED_NAME = re.compile(r"-(?=[a-z]{0,7}[A-Z0-9_-])[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+
+# ASGI extension for zero-copy (sendfile) responses
+ZEROCOPY = "http.response.zerocopysend"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+def _is_compressible(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def _is_stale(source: str, target: str) -> bool:
+    try:
+        return os.path.getmtime(target) < os.path.getmtime(source)
+    except OSError:
+        return True
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def precompress_file(path: str) -> int:
+    """Write missing or outdated .br/.gz siblings of path; returns how many were written."""
+    if not _is_compressible(path) or os.path.getsize(path) < MIN_COMPRESS_SIZE:
+        return 0
+
+    encoders = {"gzip": lambda data: gzip.compress(data, compresslevel=9)}
+    if brotli is not None:
+        encoders["br"] = lambda data: brotli.compress(data, quality=11)
+
+    written = 0
+    data = None
+    for coding, encode in encoders.items():
+        target = path + ENCODED_SUFFIXES[coding]
+        if not _is_stale(path, target):
+            continue
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        encoded = encode(data)
+        # Keep the variant only if it actually saves bytes
+        if len(encoded) < len(data):
+            _write_atomic(target, encoded)
+            written += 1
+    return written
+
+
+def precompress_directory(directory: str) -> int:
+    """Precompress every compressible file under directory."""
+    started = time.perf_counter()
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(tuple(ENCODED_SUFFIXES.values())):
+                continue
+            try:
+                written += precompress_file(os.path.join(root, name))
+            except OSError as e:
+                logger.warning(f"Could not precompress {name}: {e}")
+    logger.info(f"✓ Static files precompressed: {written} variants written in "
+                f"{(time.perf_counter() - started) * 1000:.0f}ms")
+    return written
+
+
+def cache_control_for(path: str) -> str:
+    """Cache-Control for a static file: immutable for fingerprinted Vite assets."""
+    parent = os.path.basename(os.path.dirname(path))
+    if parent == "assets" and FINGERPRINTED_NAME.search(os.path.basename(path)):
+        return IMMUTABLE
+    return REVALIDATE
+
+
+class FileCache:
+    """
+    Bounded in-memory cache of small file bodies plus a revalidated stat cache.
+
+    Bodies are keyed on (mtime, size), so a file replaced on disk is read
+    again once its stat has been revalidated (at most stat_ttl seconds later).
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_file_size: int = 256 * 1024,
+                 stat_ttl: float = 2.0, max_stats: int = 10000):
+        self.max_bytes = max_bytes
+        self.max_file_size = max_file_size
+        self.stat_ttl = stat_ttl
+        self.max_stats = max_stats
+        self.size = 0
+        self._stats: Dict[str, Tuple[float, os.stat_result]] = {}
+        self._bodies: "OrderedDict[str, Tuple[Tuple[int, int], bytes]]" = OrderedDict()
+
+    def stat(self, path: str) -> Optional[os.stat_result]:
+        """stat() of a regular file, served from the cache for stat_ttl seconds."""
+        now = time.monotonic()
+        cached = self._stats.get(path)
+        if cached is not None and now - cached[0] < self.stat_ttl:
+            return cached[1]
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            self._stats.pop(path, None)
+            self._drop(path)
+            return None
+        if not S_ISREG(stat_result.st_mode):
+            return None
+        if len(self._stats) >= self.max_stats:
+            self._stats.clear()
+        self._stats[path] = (now, stat_result)
+        return stat_result
+
+    async def read(self, path: str, stat_result: os.stat_result) -> Optional[bytes]:
+        """Body of a small file (from memory when hot), None for files too big to cache."""
+        if stat_result.st_size > self.max_file_size:
+            return None
+        version = (stat_result.st_mtime_ns, stat_result.st_size)
+        cached = self._bodies.get(path)
+        if cached is not None and cached[0] == version:
+            self._bodies.move_to_end(path)
+            return cached[1]
+
+        body = await asyncio.to_thread(_read_file, path)
+        if len(body) == stat_result.st_size:  # not rewritten while reading
+            self._drop(path)
+            self._bodies[path] = (version, body)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._bodies.popitem(last=False)
+                self.size -= len(evicted)
+        return body
+
+    def _drop(self, path: str):
+        cached = self._bodies.pop(path, None)
+        if cached is not None:
+            self.size -= len(cached[1])
+
+    def stats(self) -> dict:
+        return {"files": len(self._bodies), "bytes": self.size, "stats": len(self._stats)}
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class RangeNotSatisfiable(Exception):
+    """The requested byte range lies outside the file."""
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) of a single "bytes=" range.
+
+    Returns None for headers to ignore (malformed, other units or several
+    ranges, which are then answered with the whole file) and raises
+    RangeNotSatisfiable when the range starts past the end of the file.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable()
+            return max(size - suffix, 0), size - 1
+        start = int(first)
+        end = int(last) if last else None
+    except ValueError:
+        return None
+    if start < 0 or (end is not None and end < start):
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+class LargeFileResponse(FileResponse):
+    """
+    FileResponse for files too big for the memory cache, optionally a byte range.
+
+    Uses the ASGI zero-copy send extension (sendfile on the server side)
+    when the server offers it, otherwise streams in large chunks to keep
+    thread pool round trips down.
+    """
+
+    chunk_size = 1024 * 1024
+
+    def __init__(self, *args, byte_range: Optional[Tuple[int, int]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.byte_range = byte_range
+        if byte_range is not None:
+            self.headers["Content-Length"] = str(byte_range[1] - byte_range[0] + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        start, end = self.byte_range or (0, self.stat_result.st_size - 1)
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method") == "HEAD" or end < start:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if ZEROCOPY in scope.get("extensions", {}):
+            with open(self.path, "rb") as f:
+                await send({"type": ZEROCOPY, "file": f, "offset": start, "count": end - start + 1})
+            return
+
+        remaining = end - start + 1
+        async with await anyio.open_file(self.path, mode="rb") as f:
+            await f.seek(start)
+            while remaining > 0:
+                chunk = await f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break  # file shrank while streaming
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b""})
+
+
+def _if_range_matches(if_range: Optional[str], headers: Dict[str, str]) -> bool:
+    """True when there is no If-Range or it names the current ETag or Last-Modified."""
+    return if_range is None or if_range in (headers["ETag"], headers["Last-Modified"])
+
+
+async def serve_file(
+    request: Request,
+    path: str,
+    stat_result: os.stat_result,
+    file_cache: FileCache,
+    media_type: str,
+    headers: Optional[Dict[str, str]] = None,
+    body: Optional[bytes] = None,
+) -> Response:
+    """
+    Serve a file with ETag/Last-Modified, 304 and Range (206/416) handling.
+
+    Small files come from file_cache (or body, when the caller holds it),
+    large ones go out through LargeFileResponse. Ranges apply to unencoded
+    responses only; If-Range falls back to the whole file when the client's
+    copy is outdated.
+    """
+    headers = dict(headers or {})
+    headers["ETag"] = _etag(stat_result)
+    headers["Last-Modified"] = formatdate(stat_result.st_mtime, usegmt=True)
+    matched = etag_matches(request.headers.get("if-none-match"), headers["ETag"])
+    if matched is not None:
+        # Echo the tag the client holds: CompressionMiddleware suffixes the ETag of
+        # responses it encodes, and that is what comes back in If-None-Match
+        headers["ETag"] = matched
+        return Response(status_code=304, headers={
+            name: value for name, value in headers.items() if name != "Last-Modified"
+        })
+
+    size = stat_result.st_size
+    byte_range = None
+    if "Content-Encoding" not in headers:
+        headers["Accept-Ranges"] = "bytes"
+        range_header = request.headers.get("range")
+        if range_header and request.method == "GET" and _if_range_matches(request.headers.get("if-range"), headers):
+            try:
+                byte_range = parse_range(range_header, size)
+            except RangeNotSatisfiable:
+                return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    status_code = 200
+    if byte_range is not None:
+        status_code = 206
+        headers["Content-Range"] = f"bytes {byte_range[0]}-{byte_range[1]}/{size}"
+
+    if body is None:
+        body = await file_cache.read(path, stat_result)
+    if body is None:
+        return LargeFileResponse(
+            path, status_code=status_code, headers=headers, media_type=media_type,
+            stat_result=stat_result, method=request.method, byte_range=byte_range,
+        )
+    if byte_range is not None:
+        body = body[byte_range[0]:byte_range[1] + 1]
+    if request.method == "HEAD":
+        response = Response(headers=headers, media_type=media_type)
+        response.headers["Content-Length"] = str(len(body))
+        return response
+    return Response(body, status_code=status_code, headers=headers, media_type=media_type)
+
+
+def safe_join(directory: str, path: str) -> Optional[str]:
+    """Resolve path under directory; None if it escapes it (.., symlinks, NUL bytes)."""
+    if "\0" in path:
+        return None
+    directory = os.path.realpath(directory)
+    full_path = os.path.realpath(os.path.join(directory, path.lstrip("/")))
+    if os.path.commonpath([full_path, directory]) != directory:
+        return None
+    return full_path
+
+
+class UploadFiles:
+    """
+    ASGI app serving a directory whose files change at runtime (uploads).
+
+    Lookups go through the FileCache stat cache; paths are resolved and must
+    stay inside the directory.
+    """
+
+    def __init__(self, directory: str, file_cache: FileCache):
+        self.directory = os.path.realpath(directory)
+        self.file_cache = file_cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        request = Request(scope, receive)
+        full_path = safe_join(self.directory, scope["path"]) if request.method in ("GET", "HEAD") else None
+        stat_result = self.file_cache.stat(full_path) if full_path else None
+        if stat_result is None:
+            response = PlainTextResponse("Not Found", status_code=404)
+        else:
+            media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+            response = await serve_file(request, full_path, stat_result, self.file_cache, media_type)
+        await response(scope, receive, send)
+
+
+class StaticEntry:
+    """One indexed file: its variants (coding -> path, stat) and headers."""
+
+    __slots__ = ("path", "variants", "media_type", "cache_control", "body")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.media_type = mimetypes.guess_type(path)[0] or "text/plain"
+        self.cache_control = cache_control_for(path)
+        self.variants: Dict[Optional[str], Tuple[str, os.stat_result]] = {None: (path, os.stat(path))}
+        if _is_compressible(path):
+            for coding, suffix in ENCODED_SUFFIXES.items():
+                if os.path.isfile(path + suffix):
+                    self.variants[coding] = (path + suffix, os.stat(path + suffix))
+        # Bodies of files held in memory, per coding
+        self.body: Optional[Dict[Optional[str], bytes]] = None
+
+    def load(self):
+        """Hold the file and its variants in memory."""
+        self.body = {}
+        for coding, (path, _) in self.variants.items():
+            with open(path, "rb") as f:
+                self.body[coding] = f.read()
+
+
+class StaticIndex:
+    """
+    Index of a static directory built once, so requests never probe the filesystem.
+
+    Lookups are dict hits on the normalized relative path; only files found
+    under the directory are keys, so "../" tricks cannot reach anything else.
+    Files named in in_memory (index.html by default) are always held in
+    memory; other small files go through the shared FileCache.
+    """
+
+    def __init__(self, directory: str, file_cache: FileCache, in_memory: Tuple[str, ...] = ("index.html",)):
+        self.directory = directory
+        self.file_cache = file_cache
+        self.in_memory = set(in_memory)
+        self.entries: Dict[str, StaticEntry] = {}
+        self.rebuild()
+
+    def rebuild(self):
+        entries = {}
+        if os.path.isdir(self.directory):
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith(tuple(ENCODED_SUFFIXES.values())) or name.endswith(".tmp"):
+                        continue
+                    path = os.path.join(root, name)
+                    key = os.path.relpath(path, self.directory).replace(os.sep, "/")
+                    try:
+                        entry = StaticEntry(path)
+                        if key in self.in_memory:
+                            entry.load()
+                    except OSError:
+                        continue  # removed while indexing
+                    entries[key] = entry
+        self.entries = entries
+        logger.info(f"✓ Static index built: {len(entries)} files")
+
+    def get(self, path: str) -> Optional[StaticEntry]:
+        if "\0" in path:
+            return None
+        key = posixpath.normpath("/" + path).lstrip("/")
+        return self.entries.get(key)
+
+    async def response(self, request: Request, entry: StaticEntry) -> Response:
+        """Serve entry with its best precompressed variant, cache headers and 304 handling."""
+        available = [coding for coding in ENCODED_SUFFIXES if coding in entry.variants]
+        coding = negotiate_encoding(request.headers.get("accept-encoding", ""), available)
+        served, stat_result = entry.variants[coding]
+
+        headers = {"Cache-Control": entry.cache_control}
+        if available:
+            headers["Vary"] = "Accept-Encoding"
+        if coding is not None:
+            headers["Content-Encoding"] = coding
+        body = entry.body[coding] if entry.body is not None else None
+        return await serve_file(request, served, stat_result, self.file_cache, entry.media_type, headers, body)
+
+    def mount(self, prefix: str) -> ASGIApp:
+        """ASGI app serving the files under prefix/, for app.mount()."""
+        async def app(scope: Scope, receive: Receive, send: Send):
+            request = Request(scope, receive)
+            entry = self.get(f"{prefix}/{scope['path']}")
+            if entry is None or request.method not in ("GET", "HEAD"):
+                response = PlainTextResponse("Not Found", status_code=404)
+            else:
+                response = await self.response(request, entry)
+            await response(scope, receive, send)
+
+        return app
+
+    async def watch(self):
+        """Rebuild the index (precompressing first) whenever the directory changes."""
+        if awatch is None:
+            logger.warning("STATIC_WATCH needs the watchfiles package; static index will not reload")
+            return
+        async for _ in awatch(self.directory, watch_filter=lambda change, path: not path.endswith(
+                tuple(ENCODED_SUFFIXES.values()) + (".tmp",))):
+            await asyncio.to_thread(precompress_directory, self.directory)
+            await asyncio.to_thread(self.rebuild)
+
+
+def _etag(stat_result: os.stat_result) -> str:
+    # Starlette's FileResponse hash, quoted as RFC 9110 requires so that etag_matches
+    # also recognizes the per-encoding tags CompressionMiddleware derives from it
+    digest = hashlib.md5(f"{stat_result.st_mtime}-{stat_result.st_size}".encode(), usedforsecurity=False)
+    return f'"{digest.hexdigest()}"'
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    for directory in sys.argv[1:] or ["static"]:
+        precompress_directory(directory)
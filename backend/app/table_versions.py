@@ -0,0 +1,145 @@
+"""
+Table versions - automatic cache invalidation driven by SQLAlchemy events.
+
+Every table has a version token kept in the cache. Committing a session
+that inserted, updated or deleted rows gives each touched table a new
+token. Cached routes embed the tokens of the tables they read in their
+cache keys, so a commit makes every dependent entry unreachable at once
+and no route has to invalidate anything by hand.
+
+Tokens start with the creation time in milliseconds (hex), which gives
+cached routes their Last-Modified date without another lookup.
+
+Tokens only move with commits made through this app. For what happens
+while it is down (cache snapshots, see app.warmup), SQLite databases also
+keep a per-table change counter in table_changes, bumped by triggers on
+every insert, update and delete whoever makes it.
+"""
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import Connection, event
+from sqlalchemy.orm import Session
+
+from app.cache import get_cached, set_cache, set_local, broadcast_cache
+from app.models.models import Base
+
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "cache:version:{table}"
+VERSION_TTL = 7 * 24 * 3600  # a lost version only costs one round of cache misses
+
+# session.info key collecting the tables flushed since the last commit
+_TOUCHED = "touched_tables"
+
+_background: Set[asyncio.Task] = set()
+
+
+def _new_version() -> str:
+    return f"{int(time.time() * 1000):x}-{uuid.uuid4().hex[:6]}"
+
+
+def version_time(version: str) -> Optional[float]:
+    """Unix time at which a version token was created, None if it carries none."""
+    millis, _, _ = version.partition("-")
+    try:
+        return int(millis, 16) / 1000
+    except ValueError:
+        return None
+
+
+async def table_version(table: str) -> str:
+    """Return the current version token of table."""
+    key = VERSION_KEY.format(table=table)
+    version = await get_cached(key)
+    if version is None:
+        version = _new_version()
+        await set_cache(key, version, ttl=VERSION_TTL)
+    return version
+
+
+async def table_versions(tables: Iterable[str]) -> List[str]:
+    return [await table_version(table) for table in tables]
+
+
+def bump_tables(tables: Iterable[str]):
+    """
+    Give tables new version tokens.
+
+    Synchronous so it can run inside SQLAlchemy events: this worker's L1 is
+    updated immediately, and the shared tier write plus the broadcast to
+    other workers is scheduled on the running event loop.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    for table in tables:
+        key = VERSION_KEY.format(table=table)
+        version = _new_version()
+        set_local(key, version, VERSION_TTL)
+        if loop is not None:
+            task = loop.create_task(broadcast_cache(key, version, VERSION_TTL))
+            _background.add(task)
+            task.add_done_callback(_background.discard)
+        logger.debug(f"Table {table} is now at version {version}")
+
+
+CHANGES_TABLE = "table_changes"
+
+
+def ensure_change_counters(conn: Connection):
+    """Create table_changes and the triggers that count writes to every model table (SQLite only)."""
+    if conn.dialect.name != "sqlite":
+        return
+    conn.exec_driver_sql(
+        f"CREATE TABLE IF NOT EXISTS {CHANGES_TABLE} "
+        f"(table_name TEXT PRIMARY KEY, changes INTEGER NOT NULL DEFAULT 0)"
+    )
+    for table in Base.metadata.sorted_tables:
+        conn.exec_driver_sql(f"INSERT OR IGNORE INTO {CHANGES_TABLE} (table_name) VALUES (?)", (table.name,))
+        for operation in ("INSERT", "UPDATE", "DELETE"):
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {table.name}_count_{operation.lower()} "
+                f"AFTER {operation} ON {table.name} BEGIN "
+                f"UPDATE {CHANGES_TABLE} SET changes = changes + 1 WHERE table_name = '{table.name}'; END"
+            )
+
+
+def change_counters(conn: Connection) -> Dict[str, int]:
+    """Write counter of every model table; empty when the database keeps none."""
+    if conn.dialect.name != "sqlite":
+        return {}
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (CHANGES_TABLE,)
+    ).scalar()
+    if not exists:
+        return {}
+    return dict(conn.exec_driver_sql(f"SELECT table_name, changes FROM {CHANGES_TABLE}").all())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_touched_tables(session, flush_context):
+    touched = session.info.setdefault(_TOUCHED, set())
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            touched.add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_tables(session):
+    touched = session.info.pop(_TOUCHED, None)
+    if touched:
+        bump_tables(touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_tables(session):
+    session.info.pop(_TOUCHED, None)
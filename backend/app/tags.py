@@ -0,0 +1,165 @@
+"""
+Normalized article tags.
+
+Article.tags stays the comma-separated string the API reads and writes;
+the tags and article_tags tables mirror it so that a tag filter is an
+index join and the tag list with counts is a plain read:
+
+- an ORM event rewrites an article's links, in the same transaction, when
+  its tags or publish state change or it is deleted, and refreshes
+  Tag.article_count for the tags involved (and only those);
+- rebuild_tags() derives everything from Article.tags again: the backfill
+  used by migrate_article_tags.py, and at startup when the mirror has
+  fallen behind (e.g. articles written by a script that never imported
+  this module).
+
+Tags match case-insensitively on Tag.key; Tag.name keeps the spelling the
+tag was first written with.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import Connection, delete, event, exists, func, insert, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.models import Article, Tag, article_tags
+
+
+logger = logging.getLogger(__name__)
+
+MAX_TAG_LENGTH = 100
+
+
+def tag_key(name: str) -> str:
+    return name.strip().casefold()
+
+
+def parse_tags(value: Optional[str]) -> List[str]:
+    """Tag names in a comma-separated string, trimmed and de-duplicated case-insensitively."""
+    names, seen = [], set()
+    for name in (value or "").split(","):
+        name = name.strip()[:MAX_TAG_LENGTH]
+        if name and tag_key(name) not in seen:
+            seen.add(tag_key(name))
+            names.append(name)
+    return names
+
+
+def tagged(tag: str):
+    """Criterion for articles carrying exactly tag (case-insensitive)."""
+    return Article.id.in_(
+        select(article_tags.c.article_id)
+        .join(Tag, Tag.id == article_tags.c.tag_id)
+        .where(Tag.key == tag_key(tag))
+    )
+
+
+# ---------------------------------------------------------------- upkeep
+
+def sync_article_tags(conn: Connection, articles: Iterable[Article], removed_ids: Iterable[int] = ()):
+    """Rewrite the links of articles (and drop those of removed_ids), then recount the tags involved."""
+    wanted = {article.id: parse_tags(article.tags) for article in articles}
+    ids = list(wanted) + list(removed_ids)
+    if not ids:
+        return
+    previous = set(conn.execute(
+        select(article_tags.c.tag_id).where(article_tags.c.article_id.in_(ids))
+    ).scalars())
+    conn.execute(delete(article_tags).where(article_tags.c.article_id.in_(ids)))
+    _recount(conn, previous | _link(conn, wanted))
+
+
+def rebuild_tags(conn: Connection) -> int:
+    """Derive tags and article_tags from Article.tags from scratch; returns the number of tags."""
+    rows = conn.execute(select(Article.id, Article.tags).order_by(Article.id))
+    wanted = {row.id: parse_tags(row.tags) for row in rows}
+    conn.execute(delete(article_tags))
+    conn.execute(delete(Tag))
+    tag_ids = _link(conn, wanted)
+    _recount(conn, tag_ids)
+    logger.info(f"✓ Tags rebuilt: {len(tag_ids)} tags on {sum(1 for names in wanted.values() if names)} articles")
+    return len(tag_ids)
+
+
+def ensure_tags(conn: Connection):
+    """Rebuild the tag tables when some tagged article has no links (e.g. right after the upgrade)."""
+    unlinked = select(Article.id).where(
+        Article.tags.is_not(None),
+        func.trim(Article.tags, ", ") != "",
+        ~exists().where(article_tags.c.article_id == Article.id),
+    ).limit(1)
+    if conn.execute(unlinked).first() is not None:
+        rebuild_tags(conn)
+
+
+def _link(conn: Connection, wanted: Dict[int, List[str]]) -> Set[int]:
+    """Insert article_tags rows for wanted (article id -> tag names), creating tags; returns the tag ids."""
+    names = {}
+    for article_names in wanted.values():
+        for name in article_names:
+            names.setdefault(tag_key(name), name)
+    if not names:
+        return set()
+
+    ids = dict(conn.execute(select(Tag.key, Tag.id).where(Tag.key.in_(names))).all())
+    missing = [{"name": name, "key": key, "article_count": 0} for key, name in names.items() if key not in ids]
+    if missing:
+        # Another transaction may create the same tag between the select and the
+        # insert: skip those rows and read every id back
+        conn.execute(_insert_missing(conn.dialect.name), missing)
+        ids.update(conn.execute(select(Tag.key, Tag.id).where(Tag.key.in_([m["key"] for m in missing]))).all())
+
+    links = [
+        {"article_id": article_id, "tag_id": ids[tag_key(name)]}
+        for article_id, article_names in wanted.items()
+        for name in article_names
+    ]
+    if links:
+        conn.execute(insert(article_tags), links)
+    return set(ids.values())
+
+
+def _insert_missing(dialect: str):
+    """INSERT into tags that leaves keys which already exist alone."""
+    if dialect == "postgresql":
+        return postgresql.insert(Tag).on_conflict_do_nothing(index_elements=[Tag.key])
+    if dialect == "sqlite":
+        return sqlite.insert(Tag).on_conflict_do_nothing(index_elements=[Tag.key])
+    return insert(Tag)
+
+
+def _recount(conn: Connection, tag_ids: Set[int]):
+    """Refresh article_count of tag_ids from their links and delete tags no article uses any more."""
+    if not tag_ids:
+        return
+    published = (
+        select(func.count())
+        .select_from(article_tags.join(Article, Article.id == article_tags.c.article_id))
+        .where(article_tags.c.tag_id == Tag.id, Article.is_published == True)
+        .scalar_subquery()
+    )
+    ids = list(tag_ids)
+    conn.execute(update(Tag).where(Tag.id.in_(ids)).values(article_count=published))
+    conn.execute(delete(Tag).where(Tag.id.in_(ids), ~exists().where(article_tags.c.tag_id == Tag.id)))
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_tags(session, flush_context):
+    changed, removed = [], []
+    for obj in session.new:
+        if isinstance(obj, Article):
+            changed.append(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Article) and _tag_fields_changed(obj):
+            changed.append(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Article):
+            removed.append(obj.id)
+    if changed or removed:
+        sync_article_tags(session.connection(), changed, removed)
+
+
+def _tag_fields_changed(article: Article) -> bool:
+    state = inspect(article)
+    return state.attrs.tags.history.has_changes() or state.attrs.is_published.history.has_changes()
@@ -0,0 +1,152 @@
+"""
+Cache warm-up and snapshots for fast cold starts.
+
+At startup the lifespan restores the snapshot written at the previous
+shutdown (if CACHE_SNAPSHOT_PATH is set) and then pre-renders every route
+registered through cached_route(warm=...), so the first visitors after a
+deploy hit a warm cache.
+
+Cached keys embed table versions, so the snapshot also records the
+database's per-table change counters (see app.table_versions). Tables
+written while the app was down get fresh versions on restore, which
+retires their restored entries; without counters nothing is restored.
+Values are stored with app.cache.encode_value, never pickled.
+
+With several workers, only the one that claimed the snapshot at startup
+writes it at shutdown, through a temporary file and an atomic rename.
+"""
+import logging
+import os
+import struct
+import time
+from typing import Any, List, Optional, Tuple
+
+import orjson
+from fastapi import HTTPException
+
+from app.cache import decode_value, encode_value, export_entries, import_entries
+from app.database import engine
+from app.response_cache import warm_targets
+from app.table_versions import bump_tables, change_counters
+
+try:
+    import fcntl
+except ImportError:  # not on Windows, where a single worker always writes
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 2
+# Snapshot file: header length, JSON header (counters and entry index), then the encoded values
+_HEADER_SIZE = struct.Struct("!I")
+
+# Lock file descriptor of the worker that claimed the snapshot, held until exit
+_writer_lock: Optional[int] = None
+
+
+async def warm_cache():
+    """Pre-render every route registered for warm-up; failures are logged, not raised."""
+    started = time.perf_counter()
+    warmed = 0
+    for name, fill in warm_targets():
+        try:
+            await fill()
+            warmed += 1
+        except HTTPException as e:
+            logger.debug(f"Warm-up of {name} skipped: {e.detail}")
+        except Exception as e:
+            logger.warning(f"Warm-up of {name} failed: {e}")
+    logger.info(f"✓ Cache warmed: {warmed} responses in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+def claim_snapshot(path: str) -> bool:
+    """Make this worker the one that saves the snapshot at shutdown; False if another one is."""
+    global _writer_lock
+    if fcntl is None or _writer_lock is not None:
+        return True
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    _writer_lock = fd
+    return True
+
+
+def save_snapshot(path: str):
+    """Write the live L1 entries and the table change counters to path."""
+    with engine.connect() as conn:
+        counters = change_counters(conn)
+
+    index, values, skipped = [], [], 0
+    for key, value, fresh_until, expires_at in export_entries():
+        try:
+            data = encode_value(value)
+        except TypeError:
+            skipped += 1  # no codec for this type
+            continue
+        index.append([key, fresh_until, expires_at, len(data)])
+        values.append(data)
+    header = orjson.dumps({"format": SNAPSHOT_FORMAT, "changes": counters, "entries": index})
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER_SIZE.pack(len(header)))
+        f.write(header)
+        for data in values:
+            f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    logger.info(f"✓ Cache snapshot saved: {len(index)} entries" + (f" ({skipped} not serializable)" if skipped else ""))
+
+
+def _read_snapshot(path: str) -> Tuple[dict, List[Tuple[str, Any, float, float]]]:
+    with open(path, "rb") as f:
+        data = f.read()
+    (length,) = _HEADER_SIZE.unpack_from(data)
+    offset = _HEADER_SIZE.size + length
+    header = orjson.loads(data[_HEADER_SIZE.size:offset])
+    if header.get("format") != SNAPSHOT_FORMAT:
+        return header, []
+    entries = []
+    for key, fresh_until, expires_at, size in header["entries"]:
+        entries.append((key, decode_value(data[offset:offset + size]), fresh_until, expires_at))
+        offset += size
+    if offset != len(data):
+        raise ValueError("truncated snapshot")
+    return header, entries
+
+
+def restore_snapshot(path: str) -> Optional[int]:
+    """Load a snapshot written by save_snapshot; returns the number of entries restored."""
+    if not os.path.exists(path):
+        return None
+    try:
+        header, entries = _read_snapshot(path)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable cache snapshot {path}: {e}")
+        return None
+    if header.get("format") != SNAPSHOT_FORMAT:
+        return None
+
+    with engine.connect() as conn:
+        current = change_counters(conn)
+    if not current or not header["changes"]:
+        logger.info("Cache snapshot not restored: the database keeps no change counters")
+        return None
+
+    restored = import_entries(entries)
+    # Written while the app was down: new versions here and in the shared tier
+    changed = [table for table, changes in current.items() if header["changes"].get(table) != changes]
+    bump_tables(changed)
+    logger.info(f"✓ Cache snapshot restored: {restored} entries ({len(changed)} tables changed since)")
+    return restored
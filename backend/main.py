@@ -1,18 +1,27 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status, HTTPException
-from fastapi.responses import JSONResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 from app.core.config import get_settings
-from app.database import engine
+from app.database import engine, async_engine
+from app.serialization import ORJSONResponse
 from app.models.models import Base
-from app.cache import init_redis
-from app.routers import auth, services, team, certificates, licenses, contact, projects, articles, users, upload
+from app.search import ensure_search_index
+from app.tags import ensure_tags
+from app.table_versions import ensure_change_counters
+from app.cache import init_cache, close_cache
+from app.warmup import warm_cache, claim_snapshot, restore_snapshot, save_snapshot
+from app.access_log import AccessLogMiddleware, start_logging, stop_logging
+from app.compression import CompressionMiddleware
+from app.loop_monitor import LoopMonitor, LoopMonitorMiddleware
+from app.static_files import FileCache, StaticIndex, UploadFiles, precompress_directory
+from app.routers import auth, services, team, certificates, licenses, contact, projects, articles, users, upload, media, diagnostics
 
 # Configure logging
 logging.basicConfig(
@@ -26,6 +35,10 @@ settings = get_settings()
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+with engine.begin() as connection:
+    ensure_search_index(connection)
+    ensure_tags(connection)
+    ensure_change_counters(connection)
 
 # Rate limiter
 limiter = Limiter(key_func=get_remote_address)
@@ -35,13 +48,44 @@ limiter = Limiter(key_func=get_remote_address)
 async def lifespan(app: FastAPI):
     """Manage application startup and shutdown."""
     # Startup
+    log_listeners = None
+    if settings.ACCESS_LOG_ENABLED:
+        log_listeners = start_logging(settings.ACCESS_LOG_FILE)
+        # AccessLogMiddleware replaces uvicorn's plain-text access lines
+        logging.getLogger("uvicorn.access").disabled = True
     logger.info("🚀 Starting GeoBiro FastAPI Backend (SQLite + No Redis)")
-    init_redis()
+    await init_cache()
+    snapshot_writer = False
+    if settings.CACHE_ENABLED:
+        if settings.CACHE_SNAPSHOT_PATH:
+            snapshot_writer = claim_snapshot(settings.CACHE_SNAPSHOT_PATH)
+            restore_snapshot(settings.CACHE_SNAPSHOT_PATH)
+        if settings.CACHE_WARMUP:
+            await warm_cache()
+    if settings.STATIC_PRECOMPRESS and os.path.isdir(static_dir):
+        if await asyncio.to_thread(precompress_directory, static_dir):
+            await asyncio.to_thread(static_index.rebuild)
+    watcher = asyncio.create_task(static_index.watch()) if settings.STATIC_WATCH else None
+    if loop_monitor is not None:
+        await loop_monitor.start()
     
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down GeoBiro FastAPI Backend")
+    if watcher is not None:
+        watcher.cancel()
+    if loop_monitor is not None:
+        await loop_monitor.stop()
+    if snapshot_writer:
+        try:
+            save_snapshot(settings.CACHE_SNAPSHOT_PATH)
+        except Exception as e:
+            logger.warning(f"Could not save cache snapshot: {e}")
+    await close_cache()
+    await async_engine.dispose()
+    if log_listeners is not None:
+        stop_logging(log_listeners)
 
 
 # Exception handlers (define before using in app initialization)
@@ -60,6 +104,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs",
     openapi_url="/api/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -67,15 +112,6 @@ app = FastAPI(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    logger.info(f"Incoming request: {request.method} {request.url}")
-    response = await call_next(request)
-    logger.info(f"Response: {response.status_code} for {request.method} {request.url}")
-    return response
-
-
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -92,8 +128,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor"],
 )
 
+# Event-loop lag monitor (attributes stalls to the route being served)
+loop_monitor = LoopMonitor(settings.LOOP_MONITOR_THRESHOLD_MS) if settings.LOOP_MONITOR_ENABLED else None
+app.state.loop_monitor = loop_monitor
+if loop_monitor is not None:
+    app.add_middleware(LoopMonitorMiddleware, monitor=loop_monitor)
+
+# Compress responses that are not already encoded
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        level=settings.COMPRESSION_LEVEL,
+    )
+
+# Structured access log (outermost, so timings and sizes cover everything)
+if settings.ACCESS_LOG_ENABLED:
+    app.add_middleware(
+        AccessLogMiddleware,
+        static_sample_rate=settings.ACCESS_LOG_STATIC_SAMPLE,
+        slow_ms=settings.ACCESS_LOG_SLOW_MS,
+    )
+
 
 # General exception handler
 @app.exception_handler(Exception)
@@ -110,15 +169,18 @@ async def general_exception_handler(request: Request, exc: Exception):
 import os
 uploads_dir = os.path.join(os.path.dirname(__file__), "uploads")
 os.makedirs(uploads_dir, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=uploads_dir), name="uploads")
+file_cache = FileCache(
+    max_bytes=settings.FILE_CACHE_MB * 1024 * 1024,
+    max_file_size=settings.FILE_CACHE_MAX_FILE_KB * 1024,
+    stat_ttl=settings.FILE_STAT_TTL,
+)
+app.state.file_cache = file_cache
+app.mount("/uploads", UploadFiles(uploads_dir, file_cache), name="uploads")
 
-# Mount static files for frontend
+# Static files for frontend, indexed once at startup
 static_dir = os.path.join(os.path.dirname(__file__), "static")
-if os.path.exists(static_dir):
-    # Mount assets separately
-    assets_dir = os.path.join(static_dir, "assets")
-    if os.path.exists(assets_dir):
-        app.mount("/assets", StaticFiles(directory=assets_dir), name="assets")
+static_index = StaticIndex(static_dir, file_cache)
+app.mount("/assets", static_index.mount("assets"), name="assets")
 
 
 # Include routers
@@ -132,6 +194,8 @@ app.include_router(certificates.router, prefix="/api")
 app.include_router(licenses.router, prefix="/api")
 app.include_router(contact.router, prefix="/api/contact")
 app.include_router(users.router, prefix="/api")
+app.include_router(media.router, prefix="/api")
+app.include_router(diagnostics.router, prefix="/api")
 
 
 # Health check endpoint
@@ -162,35 +226,25 @@ async def check_video():
 
 # SPA fallback: serve index.html for non-API routes
 @app.get("/{path:path}")
-async def serve_spa(path: str):
+async def serve_spa(request: Request, path: str):
     """Serve the Vue.js SPA for client-side routing."""
-    logger.info(f"Serving path: {path}")
     if path.startswith(("api/", "uploads/", "assets/")):
-        logger.info(f"Path starts with excluded prefix: {path}")
         raise HTTPException(status_code=404, detail="Not found")
 
-    # Check if it's a static file
-    static_file_path = os.path.join(static_dir, path)
-    logger.info(f"Checking static file: {static_file_path}, exists: {os.path.exists(static_file_path)}, isfile: {os.path.isfile(static_file_path)}")
-    if os.path.exists(static_file_path) and os.path.isfile(static_file_path):
-        logger.info(f"Serving static file: {static_file_path}")
-        return FileResponse(static_file_path)
-
-    # Otherwise, serve SPA
-    index_path = os.path.join(static_dir, "index.html")
-    logger.info(f"Serving SPA index: {index_path}, exists: {os.path.exists(index_path)}")
-    if os.path.exists(index_path):
-        return FileResponse(index_path)
+    # A static file, otherwise the SPA
+    entry = static_index.get(path) or static_index.get("index.html")
+    if entry is not None:
+        return await static_index.response(request, entry)
     raise HTTPException(status_code=404, detail="Not found")
 
 
 # Root endpoint
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Serve the Vue.js SPA."""
-    index_path = os.path.join(static_dir, "index.html")
-    if os.path.exists(index_path):
-        return FileResponse(index_path)
+    entry = static_index.get("index.html")
+    if entry is not None:
+        return await static_index.response(request, entry)
     return {
         "message": "Welcome to GeoBiro API",
         "docs": "/api/docs",
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Migration script to move article tags into the normalized tags/article_tags
+tables, backfilled from the comma-separated articles.tags column.
+
+Safe to run more than once: the tag tables are rebuilt from articles.tags
+every time (the column stays the source of truth).
+
+Usage:
+    python backend/migrate_article_tags.py
+"""
+
+from sqlalchemy import inspect, select, func
+
+from app.database import engine
+from app.models.models import Base, Tag, article_tags
+from app.tags import rebuild_tags
+
+
+def migrate_article_tags():
+    """Create the tag tables if needed and backfill them from articles.tags."""
+    existing_tables = inspect(engine).get_table_names()
+    if "articles" not in existing_tables:
+        print("✗ No articles table yet; start the app once to create the schema.")
+        return False
+
+    for table in (Tag.__table__, article_tags):
+        if table.name in existing_tables:
+            print(f"✓ Table '{table.name}' already exists")
+        else:
+            print(f"Creating table '{table.name}'...")
+    Base.metadata.create_all(bind=engine, tables=[Tag.__table__, article_tags])
+
+    with engine.begin() as conn:
+        tags = rebuild_tags(conn)
+        links = conn.execute(select(func.count()).select_from(article_tags)).scalar()
+
+    print(f"✓ Backfilled {tags} tags and {links} article links")
+    return True
+
+
+if __name__ == "__main__":
+    print("🔄 Running migration: Normalize article tags...")
+    print("-" * 50)
+
+    if migrate_article_tags():
+        print("-" * 50)
+        print("✅ Migration completed successfully!")
+    else:
+        print("-" * 50)
+        print("❌ Migration failed!")
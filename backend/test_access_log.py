@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for structured access logging (app/access_log.py).
+
+Run with: python -m pytest -q test_access_log.py
+"""
+import asyncio
+import json
+import logging
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.access_log import AccessLogMiddleware, access_logger, start_logging, stop_logging
+
+
+def make_app(sample_rate):
+    app = FastAPI()
+    app.add_middleware(AccessLogMiddleware, static_sample_rate=sample_rate, slow_ms=1000)
+
+    @app.get("/api/items")
+    async def items():
+        return [1, 2]
+
+    @app.get("/assets/app.js")
+    async def asset():
+        return PlainTextResponse("console.log(1)")
+
+    @app.get("/assets/broken.js")
+    async def broken():
+        raise HTTPException(status_code=503)
+
+    return app
+
+
+def logged_requests(tmp_path, app, *paths):
+    """Records written for paths with logging behind queues, read after stop_logging."""
+    log_file = tmp_path / "access.log"
+    listeners = start_logging(str(log_file))
+
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            for path in paths:
+                await client.get(path)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        stop_logging(listeners)
+        for handler in list(access_logger.handlers):
+            handler.close()
+            access_logger.removeHandler(handler)
+
+    with open(log_file, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_stop_logging_flushes_queued_records(tmp_path):
+    root_handlers = list(logging.getLogger().handlers)
+    records = logged_requests(tmp_path, make_app(1.0), *["/api/items"] * 50)
+
+    assert len(records) == 50
+    assert records[0]["path"] == "/api/items" and records[0]["status"] == 200
+    assert records[0]["bytes"] == len(b"[1,2]")
+    # Direct handlers are back for log lines after shutdown
+    assert logging.getLogger().handlers == root_handlers
+
+
+def test_static_hits_are_sampled_but_errors_always_logged(tmp_path):
+    records = logged_requests(
+        tmp_path, make_app(0.0), "/assets/app.js", "/api/items", "/assets/broken.js", "/assets/app.js"
+    )
+    assert [(r["path"], r["status"]) for r in records] == [("/api/items", 200), ("/assets/broken.js", 503)]
+    assert "sample_rate" not in records[0]
+
+
+def test_sampled_records_carry_their_rate(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.access_log.random.random", lambda: 0.1)
+    records = logged_requests(tmp_path, make_app(0.25), "/assets/app.js", "/api/media/7/stream")
+    assert [r["path"] for r in records] == ["/assets/app.js", "/api/media/7/stream"]
+    assert all(r["sample_rate"] == 0.25 for r in records)
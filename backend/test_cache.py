@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the two-level cache (app/cache.py).
+
+Run with: python -m pytest -q test_cache.py
+"""
+import asyncio
+import pickle
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import cache, response_cache
+from app.cache import (
+    TTLCache, SQLiteCacheBackend, RedisCacheBackend, get_cached, get_or_load, set_cache, ttl_for_key,
+    decode_value, encode_value, CACHE_TTL, DEFAULT_TTL,
+)
+from app.models.models import Base, Project
+from app.response_cache import CachedResponse, key_etag, last_modified_of, not_modified
+from app.table_versions import table_version, version_time, _new_version
+
+
+def test_get_returns_stored_value():
+    cache = TTLCache(max_entries=4)
+    cache.set("cache:projects", [1, 2], ttl=60)
+    assert cache.get("cache:projects") == [1, 2]
+    assert cache.get("cache:team") is None
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    cache = TTLCache(max_entries=4)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.set("cache:team", "value", ttl=10)
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert cache.get("cache:team") is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_delete_pattern_glob_and_namespace():
+    cache = TTLCache()
+    for key in ("cache:projects", "cache:projects:7", "cache:projects:category:BIM",
+                "cache:projectsx", "cache:team", "cache:team:3"):
+        cache.set(key, key, ttl=60)
+
+    assert cache.delete_pattern("cache:projects") == 3
+    assert cache.get("cache:projectsx") == "cache:projectsx"
+
+    assert cache.delete_pattern("cache:team*") == 2
+    assert len(cache) == 1
+
+
+def test_ttl_for_key_uses_namespace():
+    assert ttl_for_key("cache:company_info") == CACHE_TTL["company_info"]
+    assert ttl_for_key("cache:articles:slug:intro") == CACHE_TTL["articles"]
+    assert ttl_for_key("cache:unknown") == DEFAULT_TTL
+
+
+def test_sqlite_backend_shares_entries_and_broadcasts(tmp_path):
+    path = str(tmp_path / "cache.db")
+
+    async def scenario():
+        worker_a = SQLiteCacheBackend(path, poll_interval=0.01)
+        worker_b = SQLiteCacheBackend(path, poll_interval=0.01)
+        received = []
+        await worker_a.start(lambda pattern, exact: received.append(("a", pattern, exact)))
+        await worker_b.start(lambda pattern, exact: received.append(("b", pattern, exact)))
+        try:
+            await worker_a.set("cache:projects", b"payload", ttl=60)
+            assert await worker_b.get("cache:projects") == b"payload"
+
+            await worker_a.delete_pattern("cache:projects")
+            await worker_a.publish("cache:projects")
+            assert await worker_b.get("cache:projects") is None
+
+            for _ in range(100):
+                if received:
+                    break
+                await asyncio.sleep(0.01)
+            assert received == [("b", "cache:projects", False)]
+        finally:
+            await worker_a.close()
+            await worker_b.close()
+
+    asyncio.run(scenario())
+
+
+class FakePubSub:
+    """Stands in for a redis pub/sub: yields the given messages, then fails or idles."""
+
+    def __init__(self, payloads, then_fail=True):
+        self.payloads = payloads
+        self.then_fail = then_fail
+        self.closed = False
+
+    async def listen(self):
+        for payload in self.payloads:
+            yield {"type": "message", "data": payload}
+        if self.then_fail:
+            raise ConnectionError("connection reset")
+        await asyncio.Event().wait()
+
+    async def close(self):
+        self.closed = True
+
+
+def test_redis_listener_resubscribes_after_failures():
+    backend = RedisCacheBackend("redis://localhost:1")
+    backend.RECONNECT_DELAY = 0.01
+    first = FakePubSub([b"other|1|cache:team", b"garbage", backend.origin.encode() + b"|0|cache:own"])
+    last = FakePubSub([b"other|0|cache:projects"], then_fail=False)
+    attempts = [ConnectionError("refused"), last]
+
+    async def subscribe():
+        result = attempts.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    backend._subscribe = subscribe
+    received = []
+
+    async def scenario():
+        listener = asyncio.create_task(backend._listen(first, lambda *args: received.append(args)))
+        for _ in range(100):
+            if ("cache:projects", False) in received:
+                break
+            await asyncio.sleep(0.01)
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+
+    asyncio.run(scenario())
+    # Own and malformed announcements are skipped; L1 is cleared after resubscribing
+    assert received == [("cache:team", True), ("*", False), ("cache:projects", False)]
+    assert first.closed and last.closed
+
+
+def test_shared_tier_stores_encoded_values_not_pickles(tmp_path, monkeypatch):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.db"))
+    monkeypatch.setattr(cache, "_l2", backend)
+    response = CachedResponse(b'{"title":"Tower"}' * 100, headers={"X-Total-Count": "100"})
+
+    async def scenario():
+        await set_cache("test:l2:response", response, ttl=60)
+        await set_cache("test:l2:ids", frozenset({"1", "tower"}), ttl=60)
+        await backend.set("test:l2:pickled", pickle.dumps((time.time() + 60, "value")), ttl=60)
+        cache._cache.clear()  # read back from the shared tier
+        return [await get_cached(key) for key in ("test:l2:response", "test:l2:ids", "test:l2:pickled")]
+
+    try:
+        restored, ids, pickled = asyncio.run(scenario())
+    finally:
+        asyncio.run(backend.close())
+    assert (restored.body, restored.etag, restored.headers) == (response.body, response.etag, response.headers)
+    assert restored.variants == response.variants and set(restored.variants) == {"br", "gzip"}
+    assert ids == frozenset({"1", "tower"})
+    assert pickled is None  # unreadable entries are misses, never unpickled
+    assert decode_value(encode_value(["row", 1])) == ["row", 1]
+
+
+def test_get_or_load_coalesces_concurrent_misses():
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ["row"]
+
+    async def scenario():
+        return await asyncio.gather(*[get_or_load("test:coalesce", loader, ttl=60) for _ in range(20)])
+
+    results = asyncio.run(scenario())
+    assert results == [["row"]] * 20
+    assert len(calls) == 1
+
+
+def test_get_or_load_serves_stale_while_refreshing(monkeypatch):
+    versions = iter(["v1", "v2"])
+
+    async def loader():
+        return next(versions)
+
+    async def scenario():
+        now = time.monotonic()
+        assert await get_or_load("test:swr", loader, ttl=10, stale_ttl=60) == "v1"
+
+        monkeypatch.setattr(time, "monotonic", lambda: now + 20)
+        assert await get_or_load("test:swr", loader, ttl=10, stale_ttl=60) == "v1"
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert await get_or_load("test:swr", loader, ttl=10, stale_ttl=60) == "v2"
+
+    asyncio.run(scenario())
+
+
+def test_commit_bumps_versions_of_touched_tables_only():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+
+    async def scenario():
+        projects_before = await table_version("projects")
+        team_before = await table_version("team_members")
+
+        with Session(engine) as session:
+            session.add(Project(title_en="Tower", description_en="BIM model"))
+            session.commit()
+        assert await table_version("projects") != projects_before
+        assert await table_version("team_members") == team_before
+
+        projects_before = await table_version("projects")
+        with Session(engine) as session:
+            session.add(Project(title_en="Bridge", description_en="Survey"))
+            session.flush()
+            session.rollback()
+        assert await table_version("projects") == projects_before
+
+    asyncio.run(scenario())
+
+
+def test_conditional_get_uses_key_etag_and_version_times():
+    from starlette.requests import Request
+
+    def request(**headers):
+        raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+        return Request({"type": "http", "method": "GET", "headers": raw})
+
+    assert abs(version_time(_new_version()) - time.time()) < 5
+    version = f"{int((time.time() - 60) * 1000):x}-abcdef"
+    modified = last_modified_of([version])
+    etag = key_etag("cache:projects:v:" + version)
+
+    assert not_modified(request(if_none_match=etag), etag, modified).status_code == 304
+    assert not_modified(request(if_none_match=etag[:-1] + '-br"'), etag, modified).headers["etag"] == etag[:-1] + '-br"'
+    assert not_modified(request(if_none_match='"other"'), etag, modified) is None
+    assert not_modified(request(if_modified_since="Sun, 01 Jan 2090 00:00:00 GMT"), etag, modified).status_code == 304
+    assert not_modified(request(if_modified_since="Mon, 01 Jan 2001 00:00:00 GMT"), etag, modified) is None
+
+
+def test_last_modified_is_withheld_during_the_version_second(monkeypatch):
+    served, written = f"{10200:x}-abcdef", f"{10800:x}-abcdef"  # versions created at 10.2s and 10.8s
+    monkeypatch.setattr(response_cache.time, "time", lambda: 10.3)
+    assert last_modified_of([served]) is None  # a write at 10.8s would share its whole second
+
+    monkeypatch.setattr(response_cache.time, "time", lambda: 11.5)
+    assert last_modified_of([written]) == 10.0
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for response compression (app/compression.py) and how its ETags
+revalidate against static files.
+
+Run with: python -m pytest -q test_compression.py
+"""
+import asyncio
+import gzip
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+
+from app.compression import CompressionMiddleware
+from app.static_files import FileCache, UploadFiles
+
+
+SVG = b"<svg xmlns='http://www.w3.org/2000/svg'>" + b"<rect width='1' height='1'/>" * 200 + b"</svg>"
+
+
+def make_app(tmp_path):
+    (tmp_path / "big.svg").write_bytes(SVG)
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    app.mount("/uploads", UploadFiles(str(tmp_path), FileCache()), name="uploads")
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/encoded")
+    async def encoded():
+        return Response(gzip.compress(SVG), media_type="image/svg+xml", headers={"Content-Encoding": "gzip"})
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(4):
+                yield b"x" * 1000
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return app
+
+
+def fetch(app, *requests):
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            return [await client.get(path, headers=headers) for path, headers in requests]
+
+    return asyncio.run(scenario())
+
+
+def test_compressed_static_file_revalidates(tmp_path):
+    app = make_app(tmp_path)
+    (first,) = fetch(app, ("/uploads/big.svg", {"Accept-Encoding": "gzip"}))
+    etag = first.headers["etag"]
+    assert first.headers["content-encoding"] == "gzip"
+    assert etag.startswith('"') and etag.endswith('-gzip"')
+    assert first.content == SVG  # httpx decodes
+
+    again, weak, plain = fetch(
+        app,
+        ("/uploads/big.svg", {"Accept-Encoding": "gzip", "If-None-Match": etag}),
+        ("/uploads/big.svg", {"Accept-Encoding": "gzip", "If-None-Match": "W/" + etag}),
+        ("/uploads/big.svg", {"Accept-Encoding": "identity", "If-None-Match": etag[:-len('-gzip"')] + '"'}),
+    )
+    assert again.status_code == 304 and again.headers["etag"] == etag
+    assert weak.status_code == 304
+    assert plain.status_code == 304 and "content-encoding" not in plain.headers
+
+
+def test_changed_file_is_sent_again(tmp_path):
+    (first,) = fetch(make_app(tmp_path), ("/uploads/big.svg", {"Accept-Encoding": "gzip"}))
+    app = make_app(tmp_path)
+    (tmp_path / "big.svg").write_bytes(SVG + b"\n")
+
+    (response,) = fetch(app, ("/uploads/big.svg", {
+        "Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"],
+    }))
+    assert response.status_code == 200
+    assert response.headers["etag"] != first.headers["etag"]
+
+
+def test_already_encoded_and_small_responses_pass_through(tmp_path):
+    app = make_app(tmp_path)
+    encoded, small = fetch(
+        app,
+        ("/encoded", {"Accept-Encoding": "br, gzip"}),
+        ("/small", {"Accept-Encoding": "gzip"}),
+    )
+    assert encoded.headers["content-encoding"] == "gzip"
+    assert encoded.content == SVG  # compressed once, not twice
+    assert "content-encoding" not in small.headers and small.text == "tiny"
+
+
+def test_streamed_responses_stay_streamed(tmp_path):
+    (response,) = fetch(make_app(tmp_path), ("/stream", {"Accept-Encoding": "gzip"}))
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content == b"x" * 4000
+
+
+def test_other_body_messages_follow_the_start_message():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.pathsend", "path": "/srv/report.txt"})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(CompressionMiddleware(app)(scope, receive, send))
+
+    assert [m["type"] for m in messages] == ["http.response.start", "http.response.pathsend"]
+    assert (b"content-encoding", b"gzip") not in messages[0]["headers"]
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Query-count regression tests for article relationship loading.
+
+Every article route must issue a fixed number of queries however many
+articles (and images) it returns: no per-row image SELECTs.
+
+Run with: python -m pytest -q test_eager_loading.py
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.models.models import Base, Article, ArticleImage
+from app.response_cache import render_json
+from app.routers.articles import get_article, get_articles
+from app.schemas.schemas import ArticleCard, ArticleResponse
+
+
+@pytest.fixture
+def database(tmp_path):
+    url = f"{tmp_path}/articles.db"
+    engine = create_engine(f"sqlite:///{url}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        for i in range(30):
+            article = Article(title_en=f"A{i}", slug=f"a{i}", summary_en="s", content_en="c",
+                              is_published=True, publish_date=datetime(2026, 1, 1) + timedelta(days=i))
+            article.images = [ArticleImage(image_url=f"/{i}/{j}.jpg") for j in range(3)]
+            db.add(article)
+        db.commit()
+    return f"sqlite+aiosqlite:///{url}"
+
+
+def count_queries(url, route, schema, **kwargs) -> int:
+    """Statements run by a route endpoint (without its response cache) plus rendering its response."""
+    async def run():
+        engine = create_async_engine(url)
+        statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            render_json(schema, await route.__wrapped__(db=db, **kwargs))
+        await engine.dispose()
+        return [s for s in statements if "count(*)" not in s]  # totals are cached per table version
+
+    return len(asyncio.run(run()))
+
+
+def list_queries(url, limit, fields):
+    schema = List[ArticleCard] if fields == "card" else List[ArticleResponse]
+    return count_queries(url, get_articles, schema, skip=0, limit=limit, cursor=None, tag=None,
+                         category=None, fields=fields)
+
+
+def test_article_list_query_count_does_not_grow_with_page_size(database):
+    assert [list_queries(database, limit, "full") for limit in (1, 10, 30)] == [2, 2, 2]  # articles + images
+    assert [list_queries(database, limit, "card") for limit in (1, 10, 30)] == [1, 1, 1]  # no relationships
+
+
+def test_article_detail_joins_its_images(database):
+    assert count_queries(database, get_article, ArticleResponse, article_id_or_slug="a5") == 1
+    assert count_queries(database, get_article, ArticleResponse, article_id_or_slug="7") == 1
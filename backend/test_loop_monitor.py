@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the event-loop lag monitor (app/loop_monitor.py).
+
+Run with: python -m pytest -q test_loop_monitor.py
+"""
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.loop_monitor import LoopMonitor, LoopMonitorMiddleware, route_name
+
+
+def blocking_handler_code():
+    time.sleep(0.25)
+
+
+def test_stall_is_attributed_to_route_with_stack():
+    monitor = LoopMonitor(threshold_ms=50)
+    app = FastAPI()
+    app.add_middleware(LoopMonitorMiddleware, monitor=monitor)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        blocking_handler_code()
+        return {"id": item_id}
+
+    @app.get("/fast")
+    async def fast():
+        await asyncio.sleep(0.05)
+        return {}
+
+    async def scenario():
+        await monitor.start()
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            assert (await client.get("/fast")).status_code == 200
+            assert (await client.get("/items/7")).status_code == 200
+            await asyncio.sleep(0.05)  # let the heartbeat record the stall
+        await monitor.stop()
+
+    asyncio.run(scenario())
+    stats = monitor.stats()
+
+    assert stats["stalls"] == 1
+    assert stats["routes"][0]["route"] == "GET /items/{item_id}"
+    assert stats["routes"][0]["max_ms"] >= 150
+    assert any("blocking_handler_code" in line for line in stats["recent"][0]["stack"])
+
+
+def test_blocking_callback_outside_requests_is_reported():
+    monitor = LoopMonitor(threshold_ms=50)
+
+    async def scenario():
+        await monitor.start()
+        asyncio.get_running_loop().call_soon(blocking_handler_code)
+        await asyncio.sleep(0.4)
+        await monitor.stop()
+
+    asyncio.run(scenario())
+    assert [s["route"] for s in monitor.stats()["routes"]] == ["(callback)"]
+
+    monitor.reset()
+    assert monitor.stats()["stalls"] == 0
+
+
+def test_stall_is_attributed_to_the_blocking_request_among_concurrent_ones():
+    monitor = LoopMonitor(threshold_ms=50)
+    app = FastAPI()
+    app.add_middleware(LoopMonitorMiddleware, monitor=monitor)
+
+    @app.get("/slow/{n}")
+    async def slow(n: int):
+        await asyncio.sleep(0.3)
+        return {}
+
+    @app.get("/blocking")
+    async def blocking():
+        await asyncio.sleep(0.05)
+        blocking_handler_code()
+        return {}
+
+    async def scenario():
+        await monitor.start()
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            responses = await asyncio.gather(
+                client.get("/slow/1"), client.get("/blocking"), client.get("/slow/2"),
+            )
+            await asyncio.sleep(0.05)
+        await monitor.stop()
+        return responses
+
+    assert all(r.status_code == 200 for r in asyncio.run(scenario()))
+    assert [s["route"] for s in monitor.stats()["routes"]] == ["GET /blocking"]
+    assert monitor._routes == {}  # finished requests are no longer tracked
+
+
+def test_route_name_falls_back_to_the_raw_path():
+    assert route_name({"method": "GET", "path": "/api/articles/intro"}) == "GET /api/articles/intro"
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for keyset pagination (app/pagination.py).
+
+Run with: python -m pytest -q test_pagination.py
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app import cache
+from app.models.models import Base, Project
+from app.pagination import Keyset, cached_count
+
+
+def test_cursor_walk_matches_full_order_with_ties_and_mixed_directions():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    keyset = Keyset(Project.order, Project.created_at.desc(), Project.id.desc())
+    start = datetime(2026, 1, 1)
+
+    with Session(engine) as db:
+        db.add_all(
+            Project(title_en=f"P{i}", description_en="d", order=i % 3, created_at=start + timedelta(hours=i // 4))
+            for i in range(20)
+        )
+        db.commit()
+
+        expected = [p.id for p in db.scalars(keyset.apply(select(Project)))]
+        seen, cursor = [], None
+        while True:
+            page = keyset.page(db.scalars(keyset.apply(select(Project), cursor, limit=6)).all(), limit=6)
+            seen += [p.id for p in page.items]
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+    assert seen == expected
+    assert len(set(seen)) == 20
+
+
+def test_cursor_walk_keeps_rows_with_null_sort_values():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    keyset = Keyset(Project.order, Project.created_at.desc(), Project.id.desc())
+    start = datetime(2026, 1, 1)
+
+    with Session(engine) as db:
+        db.add_all(
+            Project(title_en=f"P{i}", description_en="d", order=i % 2, created_at=start + timedelta(hours=i // 5))
+            for i in range(20)
+        )
+        db.flush()
+        # Column defaults replace None on insert: write the NULLs afterwards
+        db.execute(update(Project).where(Project.id % 3 == 0).values(order=None))
+        db.execute(update(Project).where(Project.id % 4 == 1).values(created_at=None))
+        db.commit()
+
+        expected = [p.id for p in db.scalars(keyset.apply(select(Project)))]
+        seen, cursor = [], None
+        while True:
+            page = keyset.page(db.scalars(keyset.apply(select(Project), cursor, limit=4)).all(), limit=4)
+            seen += [p.id for p in page.items]
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        orders = [db.get(Project, i).order for i in expected]
+
+    assert seen == expected and len(seen) == 20
+    assert orders.index(None) == len(orders) - orders.count(None)  # NULLs last
+
+
+def test_last_page_has_no_cursor_and_bad_cursors_are_rejected():
+    keyset = Keyset(Project.created_at.desc(), Project.id.desc())
+    assert keyset.page([object()] * 3, limit=3).next_cursor is None
+    assert keyset.page([], limit=None, total=0).headers == {"X-Total-Count": "0"}
+
+    for cursor in ("not-base64!", "WzFd", "e30"):  # garbage, [1], {}
+        with pytest.raises(HTTPException) as exc:
+            keyset.decode(cursor)
+        assert exc.value.status_code == 400
+
+
+def test_projection_without_sort_columns_still_pages():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    keyset = Keyset(Project.order, Project.created_at.desc(), Project.id.desc())
+    stmt = keyset.select(Project.id, Project.title_en)  # card columns, no order/created_at
+    assert [c.key for c in stmt.selected_columns] == ["id", "title_en", "order", "created_at"]
+
+    with Session(engine) as db:
+        db.add_all(Project(title_en=f"P{i}", description_en="d", order=i % 2) for i in range(5))
+        db.commit()
+        first = keyset.page(db.execute(keyset.apply(stmt, limit=3)).all(), limit=3)
+        rest = keyset.page(db.execute(keyset.apply(stmt, first.next_cursor, limit=3)).all(), limit=3)
+
+    assert len({row.id for row in first.items + rest.items}) == 5
+    assert rest.next_cursor is None
+
+
+def test_count_keys_do_not_collide_across_filters(tmp_path):
+    url = f"{tmp_path}/app.db"
+    engine = create_engine(f"sqlite:///{url}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(Project(title_en="Tower", description_en="d", category="BIM", is_featured=True))
+        db.commit()
+
+    async def counts():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{url}")
+        try:
+            async with AsyncSession(async_engine) as db:
+                async def count(category, featured=None):
+                    criteria = [Project.category == category]
+                    if featured is not None:
+                        criteria.append(Project.is_featured == featured)
+                    return await cached_count(db, Project, criteria, category=category, featured=featured)
+
+                return await count("BIM,featured=True"), await count("BIM", True)
+        finally:
+            await async_engine.dispose()
+
+    cache._cache.clear()
+    try:
+        assert asyncio.run(counts()) == (0, 1)
+    finally:
+        cache._cache.clear()
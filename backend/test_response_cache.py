@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Tests for cached routes (app/response_cache.py) and existence guards
+(app/existence.py), on a test app over a temporary database.
+
+Run with: python -m pytest -q test_response_cache.py
+"""
+import asyncio
+from email.utils import formatdate
+from typing import Any, Dict, List, Optional
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app import cache, existence, response_cache
+from app.existence import ExistenceIndex
+from app.models.models import Base, Project
+from app.response_cache import build_key, cached_route
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Test app with a cached list and a guarded detail route; app.state.queries counts SQL statements."""
+    url = f"{tmp_path}/app.db"
+    engine = create_engine(f"sqlite:///{url}")
+    Base.metadata.create_all(engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{url}")
+    sessions = async_sessionmaker(async_engine, expire_on_commit=False)
+    monkeypatch.setattr(response_cache, "AsyncSessionLocal", sessions)
+    monkeypatch.setattr(existence, "AsyncSessionLocal", sessions)
+    cache._cache.clear()
+
+    app = FastAPI()
+    app.state.engine = engine
+    app.state.queries = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: app.state.queries.append(statement))
+    index = ExistenceIndex("projects", Project.id)
+
+    @app.get("/projects")
+    @cached_route("projects", List[Dict[str, Any]], tables=("projects",))
+    async def list_projects(db=None):
+        rows = (await db.scalars(select(Project).order_by(Project.id))).all()
+        return [{"id": p.id, "title": p.title_en, "description": p.description_en} for p in rows]
+
+    @app.get("/projects/filtered")
+    @cached_route("projects", List[Dict[str, Any]], key_params=("category", "featured"), tables=("projects",))
+    async def filter_projects(category: Optional[str] = None, featured: Optional[bool] = None, db=None):
+        criteria = [] if category is None else [Project.category == category]
+        if featured is not None:
+            criteria.append(Project.is_featured == featured)
+        rows = (await db.scalars(select(Project).where(*criteria).order_by(Project.id))).all()
+        return [{"id": p.id, "title": p.title_en} for p in rows]
+
+    @app.get("/projects/{project_id}")
+    @cached_route("projects", Dict[str, Any], key_params=("project_id",), tables=("projects",),
+                  guard=index.guard("project_id", "Project not found"))
+    async def get_project(project_id: int, db=None):
+        project = await db.get(Project, project_id)
+        return {"id": project.id, "title": project.title_en}
+
+    yield app
+    cache._cache.clear()
+    asyncio.run(async_engine.dispose())
+
+
+def add_project(app, title, description="Survey", **fields):
+    with Session(app.state.engine) as db:
+        project = Project(title_en=title, description_en=description, **fields)
+        db.add(project)
+        db.commit()
+        return project.id
+
+
+def fetch(app, *requests):
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            return [await client.get(path, headers=headers) for path, headers in requests]
+
+    return asyncio.run(scenario())
+
+
+def test_commit_retires_cached_response(app):
+    add_project(app, "Tower")
+    first, second = fetch(app, ("/projects", {}), ("/projects", {}))
+    assert [p["title"] for p in first.json()] == ["Tower"]
+    queries = len(app.state.queries)
+    assert second.json() == first.json() and len(app.state.queries) == queries  # served from the cache
+
+    add_project(app, "Bridge")
+    (third,) = fetch(app, ("/projects", {}))
+    assert [p["title"] for p in third.json()] == ["Tower", "Bridge"]
+    assert third.headers["etag"] != first.headers["etag"]
+
+
+def test_conditional_requests_get_304(app, monkeypatch):
+    add_project(app, "Tower")
+    clock = response_cache.time.time
+    monkeypatch.setattr(response_cache.time, "time", lambda: clock() + 2)  # Last-Modified waits out its second
+    (first,) = fetch(app, ("/projects", {}))
+    etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+    queries = len(app.state.queries)
+
+    by_etag, by_date, weak, stale = fetch(
+        app,
+        ("/projects", {"If-None-Match": etag}),
+        ("/projects", {"If-Modified-Since": last_modified}),
+        ("/projects", {"If-None-Match": f'W/{etag}, "other"'}),
+        ("/projects", {"If-Modified-Since": formatdate(0, usegmt=True)}),
+    )
+    assert by_etag.status_code == by_date.status_code == weak.status_code == 304
+    assert by_etag.content == b"" and by_etag.headers["etag"] == etag
+    assert stale.status_code == 200
+    assert len(app.state.queries) == queries
+
+    add_project(app, "Bridge")
+    (changed,) = fetch(app, ("/projects", {"If-None-Match": etag}))
+    assert changed.status_code == 200
+
+
+def test_encoded_variants_have_their_own_etags(app):
+    for n in range(20):
+        add_project(app, f"Project {n}", description="A long description " * 5)
+    identity, br, gzip = fetch(
+        app,
+        ("/projects", {"Accept-Encoding": "identity"}),
+        ("/projects", {"Accept-Encoding": "br"}),
+        ("/projects", {"Accept-Encoding": "gzip"}),
+    )
+    base = identity.headers["etag"]
+    assert "content-encoding" not in identity.headers
+    assert br.headers["content-encoding"] == "br" and br.headers["etag"] == base[:-1] + '-br"'
+    assert gzip.headers["etag"] == base[:-1] + '-gzip"'
+    assert br.json() == gzip.json() == identity.json()
+
+    # A client holding any variant revalidates, whichever encoding it asks for now
+    held_br, held_gzip = fetch(
+        app,
+        ("/projects", {"Accept-Encoding": "gzip", "If-None-Match": br.headers["etag"]}),
+        ("/projects", {"Accept-Encoding": "gzip", "If-None-Match": gzip.headers["etag"]}),
+    )
+    assert held_br.status_code == held_gzip.status_code == 304
+    assert held_gzip.headers["etag"] == gzip.headers["etag"]
+
+
+def test_guard_answers_unknown_ids_without_the_database(app):
+    project_id = add_project(app, "Tower")
+    known, unknown_first = fetch(app, (f"/projects/{project_id}", {}), ("/projects/999", {}))
+    assert known.json() == {"id": project_id, "title": "Tower"}
+    assert unknown_first.status_code == 404 and unknown_first.json()["detail"] == "Project not found"
+
+    queries = len(app.state.queries)
+    (unknown,) = fetch(app, ("/projects/1000", {}))
+    assert unknown.status_code == 404
+    assert len(app.state.queries) == queries  # the index answered, no query ran
+
+    # A new row is in the index after its commit
+    created = add_project(app, "Bridge")
+    (found,) = fetch(app, (f"/projects/{created}", {}))
+    assert found.status_code == 200 and found.json()["title"] == "Bridge"
+
+
+def test_values_containing_separators_get_their_own_key(app):
+    assert build_key("projects", {"category": "BIM:featured:True"}) != \
+        build_key("projects", {"category": "BIM", "featured": True})
+    assert build_key("articles", {"tag": "a*"}) == "cache:articles:tag:a%2A"  # no glob characters either
+
+    add_project(app, "Tower", category="BIM", is_featured=True)
+    crafted, featured = fetch(
+        app,
+        ("/projects/filtered?category=BIM:featured:True", {}),
+        ("/projects/filtered?category=BIM&featured=true", {}),
+    )
+    assert crafted.json() == []
+    assert [p["title"] for p in featured.json()] == ["Tower"]
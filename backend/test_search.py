@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for full-text article search (app/search.py).
+
+Run with: python -m pytest -q test_search.py
+"""
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.models.models import Base, Article
+from app.search import canonical_query, ensure_search_index, match_expression, normalize, search_articles
+
+
+def make_article(slug, **fields):
+    fields = {"title_en": slug, "summary_en": "summary", "content_en": "content", "is_published": True, **fields}
+    return Article(slug=slug, publish_date=datetime(2026, 1, 1), **fields)
+
+
+def indexed_ids(db):
+    return [row[0] for row in db.execute(text("SELECT rowid FROM articles_fts ORDER BY rowid"))]
+
+
+def test_persian_and_arabic_spellings_normalize_alike():
+    assert normalize("مي‌خواهم") == normalize("میخواهم")  # Arabic ye, ZWNJ
+    assert normalize("كتاب") == normalize("کتاب")
+    assert normalize("مَدرسة") == normalize("مدرسه")
+    assert normalize("أحمد") == "احمد"
+    assert match_expression("BIM  مدل‌سازی") == '"BIM" "مدلسازی"*'
+    assert match_expression("<>&\"") is None
+
+
+def test_queries_that_search_alike_share_a_canonical_form():
+    assert canonical_query("  BIM  مدل‌سازي!! ") == canonical_query("bim مدلسازی") == "bim مدلسازی"
+    assert canonical_query("Revit, IFC") == "revit ifc"
+    assert canonical_query("<>&") == ""
+    assert match_expression(canonical_query("BIM  مدل‌سازی")) == match_expression("BIM  مدل‌سازی").lower()
+
+
+def test_index_follows_article_writes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/search.db")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(make_article("before-index"))
+        db.commit()
+    with engine.begin() as conn:
+        ensure_search_index(conn)  # catches up with rows written before the index existed
+
+    with Session(engine) as db:
+        draft = make_article("draft", is_published=False)
+        post = make_article("post")
+        db.add_all([draft, post])
+        db.commit()
+        assert indexed_ids(db) == [1, post.id]
+
+        draft.is_published = True
+        post.title_en = "renamed"
+        db.commit()
+        assert indexed_ids(db) == [1, draft.id, post.id]
+        assert db.execute(text("SELECT title_en FROM articles_fts WHERE rowid = :id"), {"id": post.id}).scalar() == "renamed"
+
+        db.delete(draft)
+        db.commit()
+        assert indexed_ids(db) == [1, post.id]
+
+
+def test_results_are_ranked_highlighted_and_paginated(tmp_path):
+    url = f"{tmp_path}/search.db"
+    engine = create_engine(f"sqlite:///{url}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        ensure_search_index(conn)
+    with Session(engine) as db:
+        db.add_all([
+            make_article("body", content_en="<p>Notes on <b>Revit</b> families</p>"),
+            make_article("title", title_en="Revit <basics>"),
+            make_article("persian", title_fa="مدل‌سازي اطلاعات ساختمان"),
+            make_article("hidden", title_en="Revit drafts", is_published=False),
+        ])
+        db.commit()
+
+    async def search(query, limit=10, offset=0):
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{url}")
+        async with AsyncSession(async_engine) as db:
+            result = await search_articles(db, query, limit, offset)
+        await async_engine.dispose()
+        return result
+
+    results, total = asyncio.run(search("revit"))
+    assert total == 2
+    assert [r["slug"] for r in results] == ["title", "body"]  # title matches outrank content
+    assert results[0]["title_en_highlight"] == "<mark>Revit</mark> &lt;basics&gt;"
+    assert results[1]["snippet"] == "Notes on <mark>Revit</mark> families"
+
+    results, total = asyncio.run(search("revit", limit=1, offset=1))
+    assert total == 2 and [r["slug"] for r in results] == ["body"]
+
+    results, _ = asyncio.run(search("مدلسازی"))
+    assert [r["slug"] for r in results] == ["persian"]
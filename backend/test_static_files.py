@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Tests for static file serving (app/static_files.py): byte ranges,
+If-Range, path traversal, precompressed variants and Cache-Control.
+
+Run with: python -m pytest -q test_static_files.py
+"""
+import asyncio
+import gzip
+import os
+
+import brotli
+import pytest
+
+from app.static_files import (
+    IMMUTABLE, REVALIDATE, FileCache, RangeNotSatisfiable, StaticIndex, UploadFiles,
+    cache_control_for, parse_range, precompress_directory, safe_join,
+)
+
+
+DATA = bytes(range(256)) * 4  # 1024 bytes
+SCRIPT = b"export const answer = 42;\n" * 100
+
+
+def call(app, path, headers=None, method="GET"):
+    """Run one request through an ASGI app with the path exactly as given (no URL normalization)."""
+    scope = {
+        "type": "http", "method": method, "path": path, "raw_path": path.encode(), "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = messages[0]
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, body
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    directory = tmp_path / "uploads"
+    directory.mkdir()
+    (directory / "data.bin").write_bytes(DATA)
+    (tmp_path / "secret.txt").write_text("secret")
+    return UploadFiles(str(directory), FileCache())
+
+
+@pytest.fixture
+def static(tmp_path):
+    directory = tmp_path / "static"
+    (directory / "assets").mkdir(parents=True)
+    (directory / "index.html").write_bytes(b"<!doctype html>" + b"<div></div>" * 200)
+    (directory / "assets" / "index-D8SgW7rf.js").write_bytes(SCRIPT)
+    (directory / "assets" / "hero-backdrop.png").write_bytes(b"\x89PNG" + DATA)
+    (tmp_path / "secret.txt").write_text("secret")
+    precompress_directory(str(directory))
+    return StaticIndex(str(directory), FileCache())
+
+
+def test_parse_range_forms():
+    assert parse_range("bytes=0-99", 1024) == (0, 99)
+    assert parse_range("bytes=1000-", 1024) == (1000, 1023)
+    assert parse_range("bytes=1000-5000", 1024) == (1000, 1023)
+    assert parse_range("bytes=-100", 1024) == (924, 1023)
+    assert parse_range("bytes=-5000", 1024) == (0, 1023)
+    # Ignored: the whole file is sent instead
+    for header in ("bytes=0-1,5-6", "items=0-1", "bytes=abc", "bytes=9-3", "bytes=-"):
+        assert parse_range(header, 1024) is None
+    for header in ("bytes=1024-", "bytes=-0"):
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range(header, 1024)
+
+
+def test_range_requests(uploads):
+    status, headers, body = call(uploads, "/data.bin", {"Range": "bytes=10-19"})
+    assert status == 206 and body == DATA[10:20]
+    assert headers["content-range"] == "bytes 10-19/1024" and headers["content-length"] == "10"
+
+    status, headers, body = call(uploads, "/data.bin", {"Range": "bytes=-4"})
+    assert status == 206 and body == DATA[-4:]
+
+    status, headers, _ = call(uploads, "/data.bin", {"Range": "bytes=2000-"})
+    assert status == 416 and headers["content-range"] == "bytes */1024"
+
+    status, headers, body = call(uploads, "/data.bin", {"Range": "bytes=0-1,4-5"})
+    assert status == 200 and body == DATA and headers["accept-ranges"] == "bytes"
+
+
+def test_if_range_with_stale_validator_sends_whole_file(uploads):
+    _, headers, _ = call(uploads, "/data.bin")
+    etag, last_modified = headers["etag"], headers["last-modified"]
+
+    for validator in (etag, last_modified):
+        status, _, body = call(uploads, "/data.bin", {"Range": "bytes=0-9", "If-Range": validator})
+        assert status == 206 and body == DATA[:10]
+    for validator in ('"0123456789abcdef"', "Thu, 01 Jan 1970 00:00:00 GMT"):
+        status, _, body = call(uploads, "/data.bin", {"Range": "bytes=0-9", "If-Range": validator})
+        assert status == 200 and body == DATA
+
+
+def test_conditional_get(uploads):
+    _, headers, _ = call(uploads, "/data.bin")
+    status, headers_304, body = call(uploads, "/data.bin", {"If-None-Match": headers["etag"]})
+    assert status == 304 and body == b"" and headers_304["etag"] == headers["etag"]
+    status, _, _ = call(uploads, "/data.bin", {"If-None-Match": '"other"'})
+    assert status == 200
+
+
+@pytest.mark.parametrize("path", [
+    "/../secret.txt",
+    "/sub/../../secret.txt",
+    "/./../secret.txt",
+    "//../secret.txt",
+    "/data.bin\0.png",
+])
+def test_traversal_is_not_found(uploads, static, path):
+    assert call(uploads, path)[0] == 404
+    assert static.get(path) is None
+
+
+def test_encoded_traversal_and_symlinks(uploads, static, tmp_path):
+    # Servers decode %2e%2e before routing (the cases above); left encoded it is only a name
+    assert call(uploads, "/%2e%2e/secret.txt")[0] == 404
+    assert static.get("..%2fsecret.txt") is None
+
+    os.symlink(tmp_path / "secret.txt", tmp_path / "uploads" / "link.txt")
+    assert call(uploads, "/link.txt")[0] == 404
+    assert safe_join(str(tmp_path / "uploads"), "/link.txt") is None
+    assert safe_join(str(tmp_path / "uploads"), "/data.bin") == os.path.realpath(tmp_path / "uploads" / "data.bin")
+
+    mount = static.mount("assets")
+    assert call(mount, "/../index.html")[0] == 200  # normalized inside the static root
+    assert call(mount, "/../../secret.txt")[0] == 404
+
+
+def test_precompressed_variant_selection(static):
+    mount = static.mount("assets")
+    path = "/index-D8SgW7rf.js"
+
+    status, headers, body = call(mount, path, {"Accept-Encoding": "gzip, br"})
+    assert status == 200 and headers["content-encoding"] == "br" and brotli.decompress(body) == SCRIPT
+    assert headers["vary"] == "Accept-Encoding"
+
+    _, headers, body = call(mount, path, {"Accept-Encoding": "gzip, br;q=0"})
+    assert headers["content-encoding"] == "gzip" and gzip.decompress(body) == SCRIPT
+
+    _, headers, body = call(mount, path, {"Accept-Encoding": "identity"})
+    assert "content-encoding" not in headers and body == SCRIPT
+    assert headers["accept-ranges"] == "bytes"
+
+    # Each variant has its own validator
+    etags = {call(mount, path, {"Accept-Encoding": coding})[1]["etag"] for coding in ("br", "gzip", "identity")}
+    assert len(etags) == 3
+
+    # Encoded variants are never sliced
+    status, headers, body = call(mount, path, {"Accept-Encoding": "br", "Range": "bytes=0-9"})
+    assert status == 200 and "content-range" not in headers
+
+
+def test_cache_control_per_path_class(static):
+    assert static.get("assets/index-D8SgW7rf.js").cache_control == IMMUTABLE
+    assert static.get("assets/hero-backdrop.png").cache_control == REVALIDATE
+    assert static.get("index.html").cache_control == REVALIDATE
+
+    assert cache_control_for("static/assets/index-D_VxFN8g.css") == IMMUTABLE
+    assert cache_control_for("static/assets/vendor-a1-b2c3d.js") == IMMUTABLE
+    for path in ("static/assets/logo-whitebg.png", "static/assets/site-background.png",
+                 "static/assets/app.js", "static/index-D8SgW7rf.js", "static/logo-foter-bim.png"):
+        assert cache_control_for(path) == REVALIDATE, path
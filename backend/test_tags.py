@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for normalized article tags (app/tags.py).
+
+Run with: python -m pytest -q test_tags.py
+"""
+from datetime import datetime
+
+from sqlalchemy import create_engine, delete, event, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.models import Base, Article, Tag, article_tags
+from app.tags import _link, ensure_tags, parse_tags, rebuild_tags, tagged
+
+
+def make_article(slug, tags, is_published=True):
+    return Article(title_en=slug, slug=slug, summary_en="s", content_en="c", tags=tags,
+                   is_published=is_published, publish_date=datetime(2026, 1, 1))
+
+
+def tag_counts(db):
+    return dict(db.execute(select(Tag.name, Tag.article_count).order_by(Tag.name)).all())
+
+
+def tagged_slugs(db, tag):
+    return sorted(db.scalars(select(Article.slug).where(tagged(tag))))
+
+
+def test_parse_tags_trims_and_deduplicates():
+    assert parse_tags(" BIM, AI-driven,,bim , ") == ["BIM", "AI-driven"]
+    assert parse_tags(None) == []
+
+
+def test_links_and_counts_follow_article_writes():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        first = make_article("first", "BIM, AI-driven")
+        second = make_article("second", "ai, Bim")
+        draft = make_article("draft", "AI", is_published=False)
+        db.add_all([first, second, draft])
+        db.commit()
+        assert tag_counts(db) == {"AI-driven": 1, "BIM": 2, "ai": 1}
+        assert tagged_slugs(db, "AI") == ["draft", "second"]  # exact, not a substring of "AI-driven"
+        assert tagged_slugs(db, "bim") == ["first", "second"]
+
+        draft.is_published = True
+        first.tags = "BIM"
+        db.commit()
+        assert tag_counts(db) == {"BIM": 2, "ai": 2}  # unused tags are dropped
+
+        db.delete(second)
+        db.commit()
+        assert tag_counts(db) == {"BIM": 1, "ai": 1}
+        assert tagged_slugs(db, "ai") == ["draft"]
+
+
+def test_rebuild_backfills_from_the_tags_column():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all([make_article("a", "Revit, IFC"), make_article("b", "ifc"), make_article("c", " , ")])
+        db.commit()
+        db.execute(delete(article_tags))
+        db.execute(delete(Tag))
+        db.commit()
+
+    with engine.begin() as conn:
+        ensure_tags(conn)
+    with Session(engine) as db:
+        assert tag_counts(db) == {"IFC": 2, "Revit": 1}
+        assert tagged_slugs(db, "IFC") == ["a", "b"]
+        assert rebuild_tags(db.connection()) == 2
+
+
+def test_tag_created_concurrently_is_reused(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/tags.db")
+    other_worker = create_engine(f"sqlite:///{tmp_path}/tags.db")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        post = make_article("post", None)
+        db.add(post)
+        db.commit()
+        post_id = post.id
+
+    created = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def create_tag_first(conn, cursor, statement, parameters, context, executemany):
+        # Between this worker's lookup and its insert, another one commits the same tag
+        if statement.startswith("INSERT INTO tags") and not created:
+            created.append(statement)
+            with other_worker.begin() as other:
+                other.execute(insert(Tag).values(name="BIM", key="bim", article_count=0))
+
+    with engine.begin() as conn:
+        _link(conn, {post_id: ["bim", "Revit"]})
+
+    assert created
+    with Session(engine) as db:
+        assert sorted(db.scalars(select(Tag.name))) == ["BIM", "Revit"]
+        assert tagged_slugs(db, "bim") == ["post"]
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for cache snapshots (app/warmup.py) and the table change counters
+they are checked against (app/table_versions.py).
+
+Run with: python -m pytest -q test_warmup.py
+"""
+import asyncio
+import fcntl
+import os
+import pickle
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app import cache, warmup
+from app.cache import get_cached, set_cache
+from app.models.models import Base, Project
+from app.response_cache import CachedResponse
+from app.table_versions import VERSION_KEY, change_counters, ensure_change_counters, table_version
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path}/app.db")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        ensure_change_counters(conn)
+    monkeypatch.setattr(warmup, "engine", engine)
+    cache._cache.clear()
+    yield engine
+    cache._cache.clear()
+
+
+def cached_state():
+    """Versions of projects and team_members, and a response cached under the projects version."""
+    async def scenario():
+        projects, team = await table_version("projects"), await table_version("team_members")
+        await set_cache(f"cache:projects:v:{projects}", CachedResponse(b"[]"), ttl=600)
+        return projects, team
+
+    return asyncio.run(scenario())
+
+
+def lookup(key):
+    return asyncio.run(get_cached(key))
+
+
+def test_counters_follow_every_write(engine):
+    with Session(engine) as db:
+        db.add(Project(title_en="Tower", description_en="BIM model"))
+        db.commit()
+    with engine.begin() as conn:
+        after_insert = change_counters(conn)
+        conn.execute(text("UPDATE projects SET title_en = 'Bridge'"))  # a script, no ORM events
+        after_update = change_counters(conn)
+        conn.execute(text("DELETE FROM projects"))
+        after_delete = change_counters(conn)
+
+    assert after_insert["projects"] == 1
+    assert after_update["projects"] == 2 and after_delete["projects"] == 3
+    assert after_delete["team_members"] == 0
+
+
+def test_snapshot_restores_entries_of_unchanged_tables(engine, tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    projects, team = cached_state()
+    warmup.save_snapshot(path)
+    cache._cache.clear()
+
+    assert warmup.restore_snapshot(path) == 3
+    assert lookup(VERSION_KEY.format(table="projects")) == projects
+    assert lookup(VERSION_KEY.format(table="team_members")) == team
+    assert lookup(f"cache:projects:v:{projects}").body == b"[]"
+
+
+def test_snapshot_retires_tables_written_while_down(engine, tmp_path):
+    with Session(engine) as db:
+        db.add(Project(title_en="Tower", description_en="BIM model"))
+        db.commit()
+    path = str(tmp_path / "snapshot.bin")
+    projects, team = cached_state()
+    warmup.save_snapshot(path)
+    cache._cache.clear()
+
+    with engine.begin() as conn:
+        # Same row count and updated_at (raw SQL skips onupdate): only the counter sees it
+        conn.execute(text("UPDATE projects SET title_en = 'Renamed'"))
+
+    assert warmup.restore_snapshot(path) == 3
+    assert lookup(VERSION_KEY.format(table="projects")) != projects
+    assert lookup(VERSION_KEY.format(table="team_members")) == team
+
+
+def test_unreadable_or_foreign_snapshots_are_rejected(engine, tmp_path):
+    path = tmp_path / "snapshot.bin"
+    assert warmup.restore_snapshot(str(path)) is None
+
+    path.write_bytes(pickle.dumps({"format": 1, "entries": []}))
+    assert warmup.restore_snapshot(str(path)) is None
+
+    cached_state()
+    warmup.save_snapshot(str(path))
+    path.write_bytes(path.read_bytes()[:-1])
+    cache._cache.clear()
+    assert warmup.restore_snapshot(str(path)) is None
+    assert len(cache._cache) == 0
+
+
+def test_snapshot_is_not_restored_without_counters(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path}/plain.db")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(warmup, "engine", engine)
+    path = str(tmp_path / "snapshot.bin")
+    cached_state()
+    warmup.save_snapshot(path)
+    cache._cache.clear()
+    assert warmup.restore_snapshot(path) is None
+    assert len(cache._cache) == 0
+
+
+def test_only_one_worker_claims_the_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(warmup, "_writer_lock", None)
+    path = str(tmp_path / "snapshot.bin")
+    other_worker = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT)
+    fcntl.flock(other_worker, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    try:
+        assert warmup.claim_snapshot(path) is False
+    finally:
+        os.close(other_worker)
+
+    assert warmup.claim_snapshot(path) is True
+    assert warmup.claim_snapshot(path) is True  # still the writer
+    os.close(warmup._writer_lock)
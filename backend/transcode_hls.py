@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Transcode a video into HLS renditions at several bitrates (needs ffmpeg).
+
+Renditions are written to media/hls/<name>/v<hash>/<height>p/, where
+<hash> identifies the source file, and media/hls/<name>/master.m3u8 is
+replaced last to point at them. The API serves them under
+/api/media/hls/<name>/master.m3u8; everything below v<hash>/ is cached
+by browsers for good.
+
+Usage:
+    python backend/transcode_hls.py backend/static/video-1080-2.mp4 --name hero
+    python backend/transcode_hls.py video.mp4 --name intro --heights 360,720 --prune
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+HLS_DIR = Path(__file__).parent / "media" / "hls"
+
+# height -> (video kbps, audio kbps)
+RENDITIONS = {
+    360: (800, 96),
+    480: (1400, 128),
+    720: (2800, 128),
+    1080: (5000, 160),
+}
+SEGMENT_SECONDS = 4
+
+
+def source_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:10]
+
+
+def probe(path: Path):
+    """Width, height and whether the source has audio (None, None, True if ffprobe is missing)."""
+    if not shutil.which("ffprobe"):
+        return None, None, True
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "stream=codec_type,width,height",
+         "-of", "json", str(path)],
+        capture_output=True, text=True, check=True,
+    )
+    streams = json.loads(result.stdout).get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    has_audio = any(s.get("codec_type") == "audio" for s in streams)
+    return video.get("width"), video.get("height"), has_audio
+
+
+def transcode(source: Path, out_dir: Path, height: int, video_kbps: int, audio_kbps: int, has_audio: bool):
+    out_dir.mkdir(parents=True, exist_ok=True)
+    command = [
+        "ffmpeg", "-y", "-v", "error", "-i", str(source),
+        "-map", "0:v:0",
+        "-vf", f"scale=-2:{height}",
+        "-c:v", "libx264", "-profile:v", "main", "-preset", "veryfast",
+        "-b:v", f"{video_kbps}k", "-maxrate", f"{int(video_kbps * 1.07)}k", "-bufsize", f"{video_kbps * 2}k",
+        # Keyframe at every segment boundary, whatever the frame rate
+        "-force_key_frames", f"expr:gte(t,n_forced*{SEGMENT_SECONDS})", "-sc_threshold", "0",
+    ]
+    if has_audio:
+        command += ["-map", "0:a:0?", "-c:a", "aac", "-b:a", f"{audio_kbps}k", "-ac", "2"]
+    command += [
+        "-f", "hls", "-hls_time", str(SEGMENT_SECONDS), "-hls_playlist_type", "vod",
+        "-hls_segment_filename", str(out_dir / "seg_%04d.ts"),
+        str(out_dir / "index.m3u8"),
+    ]
+    subprocess.run(command, check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcode a video into HLS renditions.")
+    parser.add_argument("source", type=Path)
+    parser.add_argument("--name", help="URL name of the video (default: source file stem)")
+    parser.add_argument("--heights", default=",".join(str(h) for h in RENDITIONS),
+                        help="comma-separated rendition heights (default: %(default)s)")
+    parser.add_argument("--prune", action="store_true", help="delete renditions of older sources")
+    args = parser.parse_args()
+
+    if not shutil.which("ffmpeg"):
+        print("ffmpeg not found on PATH; install it first (e.g. apt-get install ffmpeg).")
+        return False
+    if not args.source.is_file():
+        print(f"Source video not found: {args.source}")
+        return False
+
+    name = args.name or args.source.stem
+    version = f"v{source_hash(args.source)}"
+    video_dir = HLS_DIR / name
+    width, height, has_audio = probe(args.source)
+
+    heights = sorted(int(h) for h in args.heights.split(","))
+    # Never upscale: keep renditions up to the source height (at least the smallest one)
+    if height:
+        heights = [h for h in heights if h <= height] or heights[:1]
+
+    variants = []
+    for h in heights:
+        video_kbps, audio_kbps = RENDITIONS.get(h, (h * 5, 128))
+        print(f"→ {h}p ({video_kbps} kbps)")
+        transcode(args.source, video_dir / version / f"{h}p", h, video_kbps, audio_kbps, has_audio)
+        bandwidth = (video_kbps + (audio_kbps if has_audio else 0)) * 1000
+        resolution = f",RESOLUTION={round(width * h / height / 2) * 2}x{h}" if width and height else ""
+        variants.append(f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth}{resolution}\n{version}/{h}p/index.m3u8")
+
+    master = "#EXTM3U\n#EXT-X-VERSION:3\n" + "\n".join(variants) + "\n"
+    tmp_path = video_dir / f"master.m3u8.{os.getpid()}.tmp"
+    tmp_path.write_text(master)
+    os.replace(tmp_path, video_dir / "master.m3u8")
+    print(f"✓ {len(variants)} renditions ready: /api/media/hls/{name}/master.m3u8")
+
+    if args.prune:
+        for old in video_dir.iterdir():
+            if old.is_dir() and old.name != version:
+                shutil.rmtree(old)
+                print(f"✓ Removed old renditions {old.name}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)